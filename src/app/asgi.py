@@ -9,8 +9,9 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
-
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Dev')
+
+from configurations.asgi import get_asgi_application
 
 application = get_asgi_application()
@@ -16,6 +16,7 @@ from datetime import timedelta
 from pathlib import Path
 
 from configurations import Configuration
+from django.core.exceptions import ImproperlyConfigured
 
 
 class Base(Configuration):
@@ -54,10 +55,34 @@ class Base(Configuration):
         'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(minutes=int(os.getenv('REFRESH_TOKEN_LIFETIME_MIN', 360)))
     }
 
+    # Подпись jwt: HS256 с ACCESS_TOKEN_SIGNING_KEY или асимметричный алгоритм (RS256, ES256, EdDSA).
+    # Для асимметричного алгоритма в JWT_KEYS_DIR лежат ключи <kid>.pem, токены подписываются закрытым ключом
+    # JWT_SIGNING_KEY_ID, открытые ключи всех файлов публикуются в /.well-known/jwks.json.
+    # Ротация: добавить новый ключ, через JWKS_CACHE_SECONDS сменить JWT_SIGNING_KEY_ID,
+    # старый ключ удалить после истечения подписанных им токенов
+    JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+    JWT_KEYS_DIR = os.getenv('JWT_KEYS_DIR', str(BASE_DIR / 'keys'))
+    JWT_SIGNING_KEY_ID = os.getenv('JWT_SIGNING_KEY_ID', '')
+    JWKS_CACHE_SECONDS = int(os.getenv('JWKS_CACHE_SECONDS', 3600))
+
+    # Отозванные при ротации и выходе jti токенов в redis, пустая строка - отзыв отключен.
+    # С USER_TOKEN_DENY_LIST_LOCAL процесс проверяет отзыв по своей копии списка, обновляемой через pub/sub
+    USER_TOKEN_DENY_LIST = os.getenv('USER_TOKEN_DENY_LIST', 'user.revocation.TokenDenyList')
+    USER_TOKEN_DENY_LIST_LOCAL = int(os.getenv('USER_TOKEN_DENY_LIST_LOCAL', 1))
+    USER_TOKEN_DENY_LIST_RETRY_SECONDS = int(os.getenv('USER_TOKEN_DENY_LIST_RETRY_SECONDS', 5))
+    # Интервал PING соединения подписки и таймаут чтения ответа redis
+    USER_TOKEN_DENY_LIST_HEALTH_CHECK_SECONDS = int(os.getenv('USER_TOKEN_DENY_LIST_HEALTH_CHECK_SECONDS', 30))
+    USER_TOKEN_DENY_LIST_SOCKET_TIMEOUT_SECONDS = int(os.getenv('USER_TOKEN_DENY_LIST_SOCKET_TIMEOUT_SECONDS', 5))
+
+    # Максимальное количество токенов в одном запросе пакетной проверки
+    USER_TOKEN_VERIFY_BATCH_MAX_SIZE = int(os.getenv('USER_TOKEN_VERIFY_BATCH_MAX_SIZE', 100))
+
     # Confirm code
     LENGTH_CONFIRM_CODE = int(os.getenv('LENGTH_CONFIRM_CODE', 6))
 
     # Phone CONFIRM
+    # Количество номеров телефонов в кеше нормализации
+    PHONE_NORMALIZATION_CACHE_SIZE = int(os.getenv('PHONE_NORMALIZATION_CACHE_SIZE', 10000))
     PHONEL_TEST_CONFIRM_CODE = int(os.getenv('PHONEL_TEST_CONFIRM_CODE', 0))
     PHONE_VER_TTL_HOURS = int(os.getenv('PHONE_VER_TTL_HOURS', 6))
     # Количество секунд для повторной отправки
@@ -103,15 +128,89 @@ class Base(Configuration):
     CELERY_BROKER_URL = f'redis://{REDIS_HOST}:6379'
     CELERY_RESULT_BACKEND = f'redis://{REDIS_HOST}:6379'
 
-    # from datetime import timedelta
-    # from celery.schedules import crontab
-
-    # CELERY_BEAT_SCHEDULE = {
-    #     'sample_task': {
-    #         'task': 'user.tasks.sample_task',
-    #         'schedule': timedelta(seconds=3),
-    #     },
-    # }
+    # Хранилище объектов подтверждения:
+    # confirm.storages.orm.OrmConfirmStorage - таблицы ConfirmEmail и ConfirmPhone
+    # confirm.storages.redis.RedisConfirmStorage - хеши redis, удаляемые по EXPIRE
+    CONFIRM_STORAGE = os.getenv('CONFIRM_STORAGE', 'confirm.storages.orm.OrmConfirmStorage')
+    CONFIRM_REDIS_URL = f'redis://{REDIS_HOST}:6379/1'
+    # Сколько секунд хранить истекший объект подтверждения в redis, что бы отвечать ConfirmCodeExpired
+    CONFIRM_REDIS_KEEP_EXPIRED_SECONDS = int(os.getenv('CONFIRM_REDIS_KEEP_EXPIRED_SECONDS', 3600))
+    # Количество строк в одной пачке массового создания объектов подтверждения
+    CONFIRM_BULK_CHUNK_SIZE = int(os.getenv('CONFIRM_BULK_CHUNK_SIZE', 1000))
+    # Асинхронные представления confirm, включать при запуске через app/asgi.py
+    CONFIRM_ASYNC_VIEWS = int(os.getenv('CONFIRM_ASYNC_VIEWS', 0))
+    # Ограничитель отправок кода подтверждения на номер телефона
+    CONFIRM_PHONE_THROTTLE = 'confirm.throttle.PhoneSendThrottle'
+    # Количество объектов подтверждения, удаляемых одним запросом
+    CONFIRM_PURGE_BATCH_SIZE = int(os.getenv('CONFIRM_PURGE_BATCH_SIZE', 1000))
+    # Сколько секунд может длиться один запуск удаления истекших объектов подтверждения
+    CONFIRM_PURGE_TIME_BUDGET_SECONDS = int(os.getenv('CONFIRM_PURGE_TIME_BUDGET_SECONDS', 30))
+
+    CELERY_BEAT_SCHEDULE = {
+        'purge_expired_confirmations': {
+            'task': 'confirm.tasks.task_purge_expired_confirmations',
+            'schedule': timedelta(seconds=int(os.getenv('CONFIRM_PURGE_INTERVAL_SECONDS', 600))),
+        },
+        'rebuild_user_bloom': {
+            'task': 'user.tasks.task_rebuild_user_bloom',
+            'schedule': timedelta(seconds=int(os.getenv('USER_BLOOM_REBUILD_INTERVAL_SECONDS', 86400))),
+        },
+        # Фильтр, отмеченный непостроенным после ошибки добавления, перестраивается не дожидаясь rebuild_user_bloom
+        'build_missing_user_bloom': {
+            'task': 'user.tasks.task_build_missing_user_bloom',
+            'schedule': timedelta(seconds=int(os.getenv('USER_BLOOM_CHECK_INTERVAL_SECONDS', 300))),
+        },
+    }
+    USER_REDIS_URL = f'redis://{REDIS_HOST}:6379/2'
+    # Фильтр Блума email и телефонов пользователей для проверки наличия пользователя без запроса к БД,
+    # пустая строка - фильтр отключен
+    USER_BLOOM_FILTER = os.getenv('USER_BLOOM_FILTER', 'user.bloom.UserBloomFilter')
+    # Ожидаемое количество пользователей и допустимая доля ложноположительных ответов, по ним считается размер фильтра
+    USER_BLOOM_CAPACITY = int(os.getenv('USER_BLOOM_CAPACITY', 1000000))
+    USER_BLOOM_ERROR_RATE = float(os.getenv('USER_BLOOM_ERROR_RATE', 0.01))
+    USER_BLOOM_REBUILD_BATCH_SIZE = int(os.getenv('USER_BLOOM_REBUILD_BATCH_SIZE', 5000))
+    # Пользователи, созданные за столько секунд до начала перестроения, читаются повторно
+    USER_BLOOM_REBUILD_CATCHUP_SECONDS = int(os.getenv('USER_BLOOM_REBUILD_CATCHUP_SECONDS', 300))
+    USER_BLOOM_REBUILD_LOCK_SECONDS = int(os.getenv('USER_BLOOM_REBUILD_LOCK_SECONDS', 3600))
+
+    # Кеш учетных данных для входа (id, хеш пароля, is_active) по email и телефону, пустая строка - кеш отключен
+    USER_CREDENTIALS_CACHE = os.getenv('USER_CREDENTIALS_CACHE', 'user.credentials.CredentialsCache')
+    USER_CREDENTIALS_TTL_SECONDS = int(os.getenv('USER_CREDENTIALS_TTL_SECONDS', 300))
+    # Локальный кеш процесса не сбрасывается из других процессов, поэтому время жизни короткое
+    USER_CREDENTIALS_LOCAL_TTL_SECONDS = int(os.getenv('USER_CREDENTIALS_LOCAL_TTL_SECONDS', 5))
+    USER_CREDENTIALS_LOCAL_MAX_SIZE = int(os.getenv('USER_CREDENTIALS_LOCAL_MAX_SIZE', 10000))
+
+    # Ограничение попыток входа по email или телефону и по IP, пустая строка - ограничение отключено
+    USER_LOGIN_LIMITER = os.getenv('USER_LOGIN_LIMITER', 'user.attempts.LoginAttemptLimiter')
+    USER_LOGIN_ATTEMPTS_PER_IDENTIFIER = int(os.getenv('USER_LOGIN_ATTEMPTS_PER_IDENTIFIER', 5))
+    USER_LOGIN_ATTEMPTS_PER_IP = int(os.getenv('USER_LOGIN_ATTEMPTS_PER_IP', 50))
+    USER_LOGIN_ATTEMPTS_WINDOW_SECONDS = int(os.getenv('USER_LOGIN_ATTEMPTS_WINDOW_SECONDS', 300))
+    # Первая блокировка, каждая следующая в серии вдвое длиннее, но не дольше USER_LOGIN_LOCKOUT_MAX_SECONDS
+    USER_LOGIN_LOCKOUT_SECONDS = int(os.getenv('USER_LOGIN_LOCKOUT_SECONDS', 60))
+    USER_LOGIN_LOCKOUT_MAX_SECONDS = int(os.getenv('USER_LOGIN_LOCKOUT_MAX_SECONDS', 3600))
+    # IP клиента для ограничения попыток входа: пустая строка - REMOTE_ADDR, иначе ключ заголовка в request.META,
+    # например HTTP_X_FORWARDED_FOR. Из списка адресов в заголовке берется адрес, добавленный первым
+    # из USER_TRUSTED_PROXY_COUNT доверенных прокси перед приложением, адреса левее может подделать клиент
+    USER_CLIENT_IP_HEADER = os.getenv('USER_CLIENT_IP_HEADER', '')
+    USER_TRUSTED_PROXY_COUNT = int(os.getenv('USER_TRUSTED_PROXY_COUNT', 1))
+
+    # Кеш is_active, версии токенов и групп пользователя для аутентификации по claims токена,
+    # пустая строка - кеш отключен
+    USER_CLAIMS_CACHE = os.getenv('USER_CLAIMS_CACHE', 'user.claims.ClaimsCache')
+    USER_CLAIMS_TTL_SECONDS = int(os.getenv('USER_CLAIMS_TTL_SECONDS', 3600))
+
+    # Кеш групп пользователей в памяти процесса для проверки прав при аутентификации без claims токена
+    USER_GROUPS_CACHE_TTL_SECONDS = int(os.getenv('USER_GROUPS_CACHE_TTL_SECONDS', 60))
+    USER_GROUPS_CACHE_MAX_SIZE = int(os.getenv('USER_GROUPS_CACHE_MAX_SIZE', 10000))
+
+    # Количество пользователей в одной пачке команды import_users
+    USER_IMPORT_CHUNK_SIZE = int(os.getenv('USER_IMPORT_CHUNK_SIZE', 1000))
+
+    # Размер страницы списка пользователей для персонала по умолчанию и максимальный
+    USER_LIST_PAGE_SIZE = int(os.getenv('USER_LIST_PAGE_SIZE', 50))
+    USER_LIST_MAX_PAGE_SIZE = int(os.getenv('USER_LIST_MAX_PAGE_SIZE', 500))
+    # Начиная с какого оценочного количества строк админка не считает пользователей через COUNT(*)
+    USER_ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('USER_ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000))
 
     MIDDLEWARE = [
         'corsheaders.middleware.CorsMiddleware',
@@ -122,6 +221,7 @@ class Base(Configuration):
         'django.contrib.auth.middleware.AuthenticationMiddleware',
         'django.contrib.messages.middleware.MessageMiddleware',
         'django.middleware.clickjacking.XFrameOptionsMiddleware',
+        'confirm.middleware.ConfirmIdentityMapMiddleware',
     ]
 
     ROOT_URLCONF = 'app.urls'
@@ -144,6 +244,9 @@ class Base(Configuration):
 
     WSGI_APPLICATION = 'app.wsgi.application'
 
+    # Тесты не обращаются к redis из настроек, компоненты на redis отключены или работают на fakeredis
+    TEST_RUNNER = 'tests.runner.TestRunner'
+
     # Password validation
     # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -164,6 +267,34 @@ class Base(Configuration):
 
     AUTH_USER_MODEL = 'user.User'
 
+    # Профиль хеширования паролей: алгоритм и стоимость, 0 - значение Django по умолчанию.
+    # Стоимость: pbkdf2_sha256 - итерации, scrypt - work_factor, argon2 - time_cost, bcrypt_sha256 - rounds.
+    # Хеши другого алгоритма или стоимости пересчитываются при входе, подобрать стоимость - benchmark_password_hashers
+    PASSWORD_HASHER_ALGORITHM = os.getenv('PASSWORD_HASHER_ALGORITHM', 'pbkdf2_sha256')
+    PASSWORD_HASHER_COST = int(os.getenv('PASSWORD_HASHER_COST', 0))
+    password_hashers = {
+        'pbkdf2_sha256': 'user.hashers.PBKDF2PasswordHasher',
+        'scrypt': 'user.hashers.ScryptPasswordHasher',
+        'argon2': 'user.hashers.Argon2PasswordHasher',
+        'bcrypt_sha256': 'user.hashers.BCryptSHA256PasswordHasher',
+    }
+    if PASSWORD_HASHER_ALGORITHM not in password_hashers:
+        raise ImproperlyConfigured(
+            f'Неизвестный PASSWORD_HASHER_ALGORITHM {PASSWORD_HASHER_ALGORITHM}, '
+            f'доступны: {", ".join(password_hashers)}'
+        )
+    PASSWORD_HASHERS = [
+        password_hashers.pop(PASSWORD_HASHER_ALGORITHM),
+        *password_hashers.values(),
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    ]
+    del password_hashers
+
+    # Количество процессов для хеширования и проверки паролей, 0 - хеширование в потоке запроса
+    PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', 2))
+    # Сколько задач хеширования может ждать свободный процесс, при заполненной очереди ответ 503
+    PASSWORD_HASHING_QUEUE_SIZE = int(os.getenv('PASSWORD_HASHING_QUEUE_SIZE', 16))
+
     # Internationalization
     # https://docs.djangoproject.com/en/4.1/topics/i18n/
 
@@ -196,7 +327,7 @@ class Base(Configuration):
             'rest_framework.parsers.MultiPartParser'
         ],
         'DEFAULT_AUTHENTICATION_CLASSES': (
-            'rest_framework_simplejwt.authentication.JWTAuthentication',
+            'user.authentication.ClaimsJWTAuthentication',
             'rest_framework.authentication.SessionAuthentication',
         ),
         'DEFAULT_PERMISSION_CLASSES': (
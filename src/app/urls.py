@@ -19,7 +19,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAdminUser
-from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
+
+from user.views import token
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -36,10 +37,14 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='swagger'),
     path('token/', include([
-        path('verify/', TokenVerifyView.as_view(), name='verify_token'),
-        path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+        path('verify/', token.verify, name='verify_token'),
+        path('verify/batch/', token.verify_batch, name='verify_token_batch'),
+        path('refresh/', token.refresh, name='token_refresh'),
+        path('logout/', token.logout, name='logout'),
     ])),
 
+    path('.well-known/jwks.json', token.jwks, name='jwks'),
+
     path('confirm/', include('confirm.urls')),
     path('user/', include('user.urls')),
 ]
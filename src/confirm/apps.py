@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ConfirmConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'confirm'
+
+    def ready(self):
+        from confirm.utils import preload_phone_metadata
+
+        preload_phone_metadata()
@@ -0,0 +1,205 @@
+import csv
+import json
+import logging
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+
+import exceptions
+import http_exceptions
+from confirm import utils
+from confirm.choices import BulkFileFormat
+from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.serializers import CreateConfirmEmailSerializer, CreateConfirmPhoneSerializer
+from confirm.storages import get_storage
+from confirm.throttle import get_phone_send_throttle
+from notification.emails.tasks import task_send_confirm_code_email_many
+from notification.sms.tasks import task_send_confirm_code_phone_many
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def read_rows(lines: Iterable[Union[bytes, str]], file_format: BulkFileFormat) -> Iterator[Union[dict, str]]:
+    """
+    Чтение строк для массового создания объектов подтверждения
+
+    :param lines: Строки JSON Lines или CSV с заголовком
+    :param file_format: Формат строк
+    :return: Словари с данными строк, нераспознанная строка JSON Lines возвращается как есть
+    """
+
+    lines = (line.decode() if isinstance(line, bytes) else line for line in lines)
+
+    if file_format == BulkFileFormat.CSV:
+        yield from csv.DictReader(lines)
+        return
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield line
+
+
+def error_result(number: int, error: http_exceptions.BaseErrorResponse) -> dict:
+    return {'row': number, **error.detail}
+
+
+def conflict_result(number: int, exc: exceptions.BaseException) -> dict:
+    return error_result(number, http_exceptions.Conflict(
+        detail=exc.message, code=exc.code, payload_data=getattr(exc, 'payload_data', None)
+    ))
+
+
+def create_confirm_chunk(chunk: List[Tuple[int, Union[dict, str]]]) -> List[dict]:
+    """
+    Создание объектов подтверждения для пачки строк: одна проверка пользователей и одна запись
+    в хранилище на каждый тип объекта подтверждения
+
+    :param chunk: Список пар (номер строки, данные строки)
+    :return: Результаты по каждой строке в порядке chunk
+    """
+
+    results = {}
+    identifiers = {ConfirmEmail: {}, ConfirmPhone: {}}
+
+    for number, row in chunk:
+        model = ConfirmEmail if isinstance(row, dict) and row.get('email') else ConfirmPhone
+        serializer_class = CreateConfirmEmailSerializer if model is ConfirmEmail else CreateConfirmPhoneSerializer
+
+        serializer = serializer_class(data=row)
+        if not serializer.is_valid():
+            results[number] = error_result(number, http_exceptions.Validate(validation_errors=serializer.errors))
+            continue
+
+        data = serializer.validated_data
+        try:
+            if model is ConfirmEmail:
+                identifier = data['email']
+            else:
+                identifier = utils.normalization_phone_number(data['phone'], data['region'])
+
+            if identifier in identifiers[model]:
+                raise exceptions.DuplicateInBatch
+        except (exceptions.IncorrectPhone, exceptions.DuplicateInBatch) as e:
+            results[number] = conflict_result(number, e)
+            continue
+
+        identifiers[model][identifier] = (number, data['type_confirm'])
+
+    for model, items in identifiers.items():
+        if not items:
+            continue
+
+        field = model.identifier_field
+        existing = set(
+            str(value) for value in
+            User.objects.filter(**{f'{field}__in': list(items)}).values_list(field, flat=True)
+        )
+
+        confirm_codes = iter(utils.confirm_code_generator.generate_many(len(items)))
+        confirm_data = {}
+        for identifier, (number, type_confirm) in items.items():
+            try:
+                utils.check_type_confirm_available(type_confirm, identifier in existing)
+            except (exceptions.UserAlreadyExist, exceptions.UserNotFound) as e:
+                results[number] = conflict_result(number, e)
+                continue
+
+            confirm_data[identifier] = utils.generate_confirm_data(type_confirm, next(confirm_codes))
+
+        if model is ConfirmEmail:
+            test_confirm_code = settings.EMAIL_TEST_CONFIRM_CODE
+        else:
+            test_confirm_code = settings.PHONEL_TEST_CONFIRM_CODE
+            sends = [(identifier, data['created_at']) for identifier, data in confirm_data.items()]
+            counts = get_phone_send_throttle().hit_many(sends)
+            for (identifier, _), count_send in zip(sends, counts):
+                if isinstance(count_send, exceptions.BaseException):
+                    results[items[identifier][0]] = conflict_result(items[identifier][0], count_send)
+                    del confirm_data[identifier]
+                else:
+                    confirm_data[identifier]['count_send'] = count_send
+
+        if test_confirm_code:
+            for data in confirm_data.values():
+                data['confirm_code'] = '111111'
+
+        confirm_objs = get_storage().bulk_update_or_create(model, list(confirm_data.items()))
+
+        messages = []
+        for identifier, confirm_obj in zip(confirm_data, confirm_objs):
+            number = items[identifier][0]
+            results[number] = {
+                'row': number,
+                'status': status.HTTP_201_CREATED,
+                field: identifier,
+                'secret_code': confirm_obj.secret_code,
+            }
+            messages.append((identifier, confirm_obj.confirm_code))
+
+        if messages:
+            task = task_send_confirm_code_email_many if model is ConfirmEmail else task_send_confirm_code_phone_many
+            task.delay(messages)
+
+    return [results[number] for number, _ in chunk]
+
+
+def create_confirm(rows: Iterable[Union[dict, str]], chunk_size: int = None) -> Iterator[dict]:
+    """
+    Массовое создание объектов подтверждения email и телефона.
+    Каждая строка содержит type_confirm и email, либо phone и region.
+    Результаты отдаются потоком после начала ответа, поэтому ошибки не выбрасываются, а записываются в результаты:
+    ошибка обработки пачки - по каждой строке пачки, обработка продолжается со следующей пачки,
+    ошибка чтения файла - одной записью с номером первой непрочитанной строки, обработка прекращается
+
+    :param rows: Данные строк
+    :param chunk_size: Размер пачки, по умолчанию CONFIRM_BULK_CHUNK_SIZE
+    :return: Результаты по каждой строке, по мере обработки пачек
+    """
+
+    chunk_size = chunk_size or settings.CONFIRM_BULK_CHUNK_SIZE
+    rows = enumerate(rows, start=1)
+    last_number = 0
+
+    while True:
+        try:
+            chunk = list(islice(rows, chunk_size))
+        except (UnicodeDecodeError, csv.Error) as e:
+            logger.warning(f'Файл массового создания объектов подтверждения не распознан: {e}')
+            exc = exceptions.BulkFileInvalid()
+            yield error_result(last_number + 1, http_exceptions.Validate(detail=exc.message, code=exc.code))
+            return
+
+        if not chunk:
+            return
+        last_number = chunk[-1][0]
+
+        try:
+            results = create_confirm_chunk(chunk)
+        except Exception:
+            logger.exception(f'Не удалось обработать строки {chunk[0][0]}-{last_number} массового создания')
+            exc = exceptions.BulkChunkFailed()
+            results = [
+                error_result(number, http_exceptions.ServiceUnavailable(detail=exc.message, code=exc.code))
+                for number, _ in chunk
+            ]
+
+        yield from results
+
+
+def dump_results(results: Iterable[dict]) -> Iterator[str]:
+    """
+    Результаты в формате JSON Lines
+    """
+
+    for result in results:
+        yield json.dumps(result, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
@@ -16,3 +16,8 @@ class PhoneRegion(models.TextChoices):
     # ISO 3166-1 Alpha-2
     RUSSIAN = 'RU'
     UZBEKISTAN = 'UZ'
+
+
+class BulkFileFormat(models.TextChoices):
+    JSONL = 'jsonl'
+    CSV = 'csv'
@@ -2,10 +2,11 @@ from uuid import UUID
 
 from django.conf import settings
 
-import exceptions
 from confirm import utils
 from confirm.choices import TypeConfirm, ObjConfirm, PhoneRegion
 from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.storages import get_storage
+from confirm.throttle import get_phone_send_throttle
 
 
 def create_confirm_email(email: str, type_confirm: TypeConfirm) -> ConfirmEmail:
@@ -27,10 +28,7 @@ def create_confirm_email(email: str, type_confirm: TypeConfirm) -> ConfirmEmail:
     if settings.EMAIL_TEST_CONFIRM_CODE:
         confirm_data['confirm_code'] = '111111'
 
-    confirmation_email = ConfirmEmail.objects.update_or_create(
-        email=email,
-        defaults=confirm_data
-    )[0]
+    confirmation_email = get_storage().update_or_create(ConfirmEmail, email, confirm_data)
 
     return confirmation_email
 
@@ -55,31 +53,9 @@ def create_confirm_phone(phone: str, region: PhoneRegion, type_confirm: TypeConf
     if settings.PHONEL_TEST_CONFIRM_CODE:
         confirm_data['confirm_code'] = '111111'
 
-    confirmation_phone, is_created = ConfirmPhone.objects.get_or_create(
-        phone=phone,
-        defaults=confirm_data
-    )
+    confirm_data['count_send'] = get_phone_send_throttle().hit(phone, confirm_data['created_at'])
 
-    if is_created:
-        return confirmation_phone
-
-    count_sec_wait_renewal_sending = confirmation_phone.count_sec_wait_renewal_sending
-
-    if count_sec_wait_renewal_sending == 0:
-        confirm_data['count_send'] = 1
-        ConfirmPhone.objects.filter(id=confirmation_phone.id).update(**confirm_data)
-        return ConfirmPhone.objects.get(id=confirmation_phone.id)
-
-    if confirmation_phone.count_send >= settings.PHONE_CONFIRM_CODE_COUNT_SEND:
-        raise exceptions.ConfirmPhoneExcMaxCountSend(count_sec_wait_renewal_sending)
-
-    sec_resend = confirmation_phone.sec_resend
-    if sec_resend != 0:
-        raise exceptions.ConfirmPhoneWaitBeforeSending(sec_resend)
-
-    confirm_data['count_send'] = confirmation_phone.count_send + 1
-    ConfirmPhone.objects.filter(id=confirmation_phone.id).update(**confirm_data)
-    return ConfirmPhone.objects.get(id=confirmation_phone.id)
+    return get_storage().update_or_create(ConfirmPhone, phone, confirm_data)
 
 
 def confirm_obj(secret_code: UUID, confirm_code: str, object_confirmation: ObjConfirm):
@@ -92,17 +68,62 @@ def confirm_obj(secret_code: UUID, confirm_code: str, object_confirmation: ObjCo
     """
 
     confirm_model = ConfirmEmail if object_confirmation == ObjConfirm.EMAIL else ConfirmPhone
+    get_storage().confirm(confirm_model, secret_code, confirm_code)
+
+
+async def acreate_confirm_email(email: str, type_confirm: TypeConfirm) -> ConfirmEmail:
+    """
+    Асинхронное создание/обновление объекта подтверждения email
+
+    :param email: Email
+    :param type_confirm: Тип подтверждения email
+
+    :return: Созданный или обновленный объект подтверждения email
+    """
+
+    email = email.lower()
+
+    await utils.atype_confirm_is_available_for_user(type_confirm, {'email': email})
+
+    confirm_data = utils.generate_confirm_data(type_confirm)
+    if settings.EMAIL_TEST_CONFIRM_CODE:
+        confirm_data['confirm_code'] = '111111'
 
-    confirmation_obj = confirm_model.objects.filter(
-        secret_code=secret_code, confirm_code=confirm_code, confirmed=False
-    )
-    if not confirmation_obj.exists():
-        raise exceptions.ConfirmObjNotFound
+    return await get_storage().aupdate_or_create(ConfirmEmail, email, confirm_data)
 
-    confirmation_obj = confirmation_obj.get()
 
-    if confirmation_obj.is_expired:
-        raise exceptions.ConfirmCodeExpired
+async def acreate_confirm_phone(phone: str, region: PhoneRegion, type_confirm: TypeConfirm) -> ConfirmPhone:
+    """
+    Асинхронное создание/обновление объекта подтверждения телефона
 
-    confirmation_obj.confirmed = True
-    confirmation_obj.save()
+    :param phone: Номер телефона без кода страны
+    :param region: Регион номера телефона ISO 3166-1 Alpha-2
+    :param type_confirm: Тип подтверждения телефона
+
+    :return: Созданный или обновленный объект подтверждения телефона
+    """
+
+    phone = utils.normalization_phone_number(phone, region)
+
+    await utils.atype_confirm_is_available_for_user(type_confirm, {'phone': phone})
+
+    confirm_data = utils.generate_confirm_data(type_confirm)
+    if settings.PHONEL_TEST_CONFIRM_CODE:
+        confirm_data['confirm_code'] = '111111'
+
+    confirm_data['count_send'] = await get_phone_send_throttle().ahit(phone, confirm_data['created_at'])
+
+    return await get_storage().aupdate_or_create(ConfirmPhone, phone, confirm_data)
+
+
+async def aconfirm_obj(secret_code: UUID, confirm_code: str, object_confirmation: ObjConfirm):
+    """
+    Асинхронное подтверждение объекта подтверждения номера телефона или email
+
+    :param secret_code: Секретный код объекта подтверждения
+    :param confirm_code: Код подтверждения объекта подтверждения
+    :param object_confirmation: Тип объекта подтверждения
+    """
+
+    confirm_model = ConfirmEmail if object_confirmation == ObjConfirm.EMAIL else ConfirmPhone
+    await get_storage().aconfirm(confirm_model, secret_code, confirm_code)
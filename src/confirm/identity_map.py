@@ -0,0 +1,71 @@
+from contextvars import ContextVar, Token
+from typing import Hashable, Optional
+
+from django.db import models
+
+_identity_map: ContextVar[Optional[dict]] = ContextVar('confirm_identity_map', default=None)
+
+
+def activate() -> Token:
+    """
+    Включение карты загруженных объектов подтверждения для текущего запроса
+
+    :return: Токен для последующего отключения карты
+    """
+
+    return _identity_map.set({})
+
+
+def deactivate(token: Token):
+    """
+    Отключение карты загруженных объектов подтверждения
+
+    :param token: Токен, полученный при включении карты
+    """
+
+    _identity_map.reset(token)
+
+
+def get(key: Hashable) -> Optional[models.Model]:
+    """
+    Получение ранее загруженного объекта подтверждения.
+    Удаленные объекты (pk is None) не возвращаются
+
+    :param key: Ключ объекта
+    :return: Объект подтверждения или None
+    """
+
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return None
+
+    obj = identity_map.get(key)
+    if obj is None or obj.pk is None:
+        return None
+
+    return obj
+
+
+def store(key: Hashable, obj: models.Model):
+    """
+    Сохранение загруженного объекта подтверждения, если карта включена
+
+    :param key: Ключ объекта
+    :param obj: Объект подтверждения
+    """
+
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        identity_map[key] = obj
+
+
+def discard(key: Hashable):
+    """
+    Удаление объекта подтверждения из карты, если карта включена
+
+    :param key: Ключ объекта
+    """
+
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        identity_map.pop(key, None)
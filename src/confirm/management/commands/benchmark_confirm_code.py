@@ -0,0 +1,37 @@
+import random
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from confirm.utils import CONFIRM_CODE_ALPHABET, ConfirmCodeGenerator
+
+
+def legacy_generate_confirm_code() -> str:
+    """
+    Прежняя генерация кода подтверждения через random.choice, только для сравнения
+    """
+
+    return ''.join(random.choice(CONFIRM_CODE_ALPHABET) for _ in range(settings.LENGTH_CONFIRM_CODE))
+
+
+class Command(BaseCommand):
+    help = 'Сравнение скорости генерации кодов подтверждения: random.choice, по одному коду и generate_many'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000, help='Количество кодов в одном замере')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество замеров, берется лучший')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        generator = ConfirmCodeGenerator(CONFIRM_CODE_ALPHABET)
+
+        cases = {
+            'random.choice': lambda: [legacy_generate_confirm_code() for _ in range(count)],
+            'urandom, по одному': lambda: [generator.generate_many(1)[0] for _ in range(count)],
+            'urandom, generate_many': lambda: generator.generate_many(count),
+        }
+
+        for name, case in cases.items():
+            seconds = min(timeit.repeat(case, number=1, repeat=options['repeat']))
+            self.stdout.write(f'{name}: {seconds:.4f} s, {count / seconds:,.0f} кодов/с')
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from confirm import bulk
+from confirm.choices import BulkFileFormat
+
+
+class Command(BaseCommand):
+    help = (
+        'Массовое создание кодов подтверждения email и phone из JSON Lines или CSV. '
+        'Результат по каждой строке выводится в формате JSON Lines'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу, - для чтения из stdin')
+        parser.add_argument('--format', choices=BulkFileFormat.values, default=BulkFileFormat.JSONL)
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.create_confirm(sys.stdin, options)
+            return
+
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            self.create_confirm(file, options)
+
+    def create_confirm(self, lines, options):
+        rows = bulk.read_rows(lines, options['format'])
+        for line in bulk.dump_results(bulk.create_confirm(rows, options['chunk_size'])):
+            self.stdout.write(line, ending='')
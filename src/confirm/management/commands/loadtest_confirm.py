@@ -0,0 +1,64 @@
+import json
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+from confirm.choices import TypeConfirm
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест создания кода подтверждения email на запущенном сервере. '
+        'Для сравнения WSGI и ASGI запустить на одном процессе сервера с CONFIRM_ASYNC_VIEWS=0 и 1 '
+        'и сравнить при какой конкурентности растут задержки и появляются ошибки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Адрес create_confirm_email, например http://localhost:8000/confirm/email/create/')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 100, 200, 400])
+        parser.add_argument('--requests', type=int, default=1000, help='Количество запросов на каждую конкурентность')
+        parser.add_argument('--timeout', type=float, default=10)
+
+    def handle(self, *args, **options):
+        for concurrency in options['concurrency']:
+            self.run(options['url'], concurrency, options['requests'], options['timeout'])
+
+    def run(self, url: str, concurrency: int, count: int, timeout: float):
+        def send(_):
+            body = json.dumps({
+                'type_confirm': TypeConfirm.REGISTRATION,
+                'email': f'loadtest-{uuid.uuid4().hex}@example.com',
+            }).encode()
+            request = Request(url, data=body, headers={'Content-Type': 'application/json'}, method='POST')
+
+            started = time.perf_counter()
+            try:
+                with urlopen(request, timeout=timeout) as response:
+                    result = response.status
+            except HTTPError as e:
+                result = e.code
+            except (URLError, OSError) as e:
+                result = type(e).__name__
+
+            return result, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(send, range(count)))
+        seconds = time.perf_counter() - started
+
+        statuses = Counter(result for result, _ in results)
+        latencies = sorted(latency for _, latency in results)
+        quantiles = statistics.quantiles(latencies, n=100)
+
+        self.stdout.write(
+            f'concurrency={concurrency}: {count / seconds:.0f} rps, '
+            f'p50={quantiles[49] * 1000:.0f} ms, p95={quantiles[94] * 1000:.0f} ms, '
+            f'p99={quantiles[98] * 1000:.0f} ms, statuses={dict(statuses)}'
+        )
@@ -1,24 +1,133 @@
-from django.db import models
+from django.db import connections, models
+from django.utils import timezone
+
 import exceptions
+from confirm import identity_map
 
 
 class ConfirmBaseManager(models.Manager):
     def get_confirmed(self, secret_code: str, type_confirm: str):
-        confirm_obj = super().get_queryset().filter(
-            secret_code=secret_code,
-            type_confirm=type_confirm
-        )
+        """
+        Получение подтвержденного объекта одним запросом.
+        В рамках запроса повторный вызов с тем же secret_code возвращает уже загруженный объект
 
-        if not confirm_obj.exists():
-            raise exceptions.ConfirmObjNotFound
+        :param secret_code: Секретный код объекта подтверждения
+        :param type_confirm: Тип подтверждения
+        """
+
+        key = (self.model._meta.label, str(secret_code), type_confirm)
+        confirm_obj = identity_map.get(key)
 
-        confirm_obj = confirm_obj.get()
+        if confirm_obj is None:
+            try:
+                confirm_obj = super().get_queryset().get(
+                    secret_code=secret_code,
+                    type_confirm=type_confirm
+                )
+            except self.model.DoesNotExist:
+                raise exceptions.ConfirmObjNotFound
+
+            identity_map.store(key, confirm_obj)
 
         if not confirm_obj.confirmed:
             raise exceptions.ConfirmObjNotConfirmed
 
         return confirm_obj
 
+    def confirm(self, secret_code: str, confirm_code: str):
+        """
+        Подтверждение объекта одним запросом UPDATE ... RETURNING.
+        У истекшего объекта confirmed остается false, так по результату отличаем истекший код от ненайденного.
+        Параллельный запрос с тем же кодом ждет блокировку строки и уже не проходит условие confirmed = false.
+
+        :param secret_code: Секретный код объекта подтверждения
+        :param confirm_code: Код подтверждения объекта подтверждения
+        """
+
+        connection = connections[self.db]
+        opts = self.model._meta
+        quote_name = connection.ops.quote_name
+
+        def column(name):
+            return quote_name(opts.get_field(name).column)
+
+        deadline = timezone.now() - self.model.ttl()
+        sql = (
+            f'UPDATE {quote_name(opts.db_table)} '
+            f'SET {column("confirmed")} = ({column("created_at")} > %s) '
+            f'WHERE {column("secret_code")} = %s AND {column("confirm_code")} = %s AND {column("confirmed")} = %s '
+            f'RETURNING {column("confirmed")}'
+        )
+        params = [
+            opts.get_field('created_at').get_db_prep_value(deadline, connection),
+            opts.get_field('secret_code').get_db_prep_value(secret_code, connection),
+            confirm_code,
+            False,
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        if row is None:
+            raise exceptions.ConfirmObjNotFound
+
+        if not row[0]:
+            raise exceptions.ConfirmCodeExpired
+
+    def consume_confirmed(self, secret_code: str, type_confirm: str):
+        """
+        Получение и удаление подтвержденного объекта одним запросом DELETE ... RETURNING.
+        Параллельный запрос с тем же кодом ждет блокировку строки и уже не находит объект.
+        Только если объект не удален, вторым запросом отличаем неподтвержденный объект от ненайденного
+
+        :param secret_code: Секретный код объекта подтверждения
+        :param type_confirm: Тип подтверждения
+        """
+
+        connection = connections[self.db]
+        opts = self.model._meta
+        quote_name = connection.ops.quote_name
+
+        def column(name):
+            return quote_name(opts.get_field(name).column)
+
+        columns = ', '.join(quote_name(field.column) for field in opts.concrete_fields)
+        sql = (
+            f'DELETE FROM {quote_name(opts.db_table)} '
+            f'WHERE {column("secret_code")} = %s AND {column("type_confirm")} = %s AND {column("confirmed")} = %s '
+            f'RETURNING {columns}'
+        )
+        params = [
+            opts.get_field('secret_code').get_db_prep_value(secret_code, connection),
+            type_confirm,
+            True,
+        ]
+
+        # raw приводит значения колонок к типам полей модели
+        confirm_objs = list(self.raw(sql, params))
+        identity_map.discard((opts.label, str(secret_code), type_confirm))
+
+        if confirm_objs:
+            return confirm_objs[0]
+
+        if self.filter(secret_code=secret_code, type_confirm=type_confirm).exists():
+            raise exceptions.ConfirmObjNotConfirmed
+
+        raise exceptions.ConfirmObjNotFound
+
+    def purge_expired(self, batch_size: int) -> int:
+        """
+        Удаление одной пачки истекших объектов подтверждения, самых старых по created_at
+
+        :param batch_size: Максимальное количество удаляемых объектов
+        :return: Количество удаленных объектов
+        """
+
+        deadline = timezone.now() - self.model.ttl()
+        expired_ids = self.filter(created_at__lt=deadline).order_by('created_at').values('id')[:batch_size]
+        return self.filter(id__in=expired_ids).delete()[0]
+
 
 class ConfirmEmailManager(ConfirmBaseManager):
     pass
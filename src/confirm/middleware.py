@@ -0,0 +1,37 @@
+import asyncio
+
+from confirm import identity_map
+
+
+class ConfirmIdentityMapMiddleware:
+    """
+    Объекты подтверждения, загруженные через get_confirmed, переиспользуются в рамках одного запроса.
+    Под ASGI с асинхронной цепочкой обработчиков работает асинхронно, без переключения в поток,
+    карта включается в контексте задачи запроса
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Как в MiddlewareMixin: экземпляр помечается корутинной функцией, если цепочка асинхронная
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        token = identity_map.activate()
+        try:
+            return self.get_response(request)
+        finally:
+            identity_map.deactivate(token)
+
+    async def __acall__(self, request):
+        token = identity_map.activate()
+        try:
+            return await self.get_response(request)
+        finally:
+            identity_map.deactivate(token)
@@ -0,0 +1,54 @@
+# Generated by Django 4.1.3 on 2026-10-18 15:51
+
+from django.db import migrations, models
+
+# Имена индексов, которые AlterField с db_index=True создал бы сам
+INDEXES = [
+    ('confirm_confirmemail', 'confirm_confirmemail_created_at_5ae1d457'),
+    ('confirm_confirmphone', 'confirm_confirmphone_created_at_56f2b58f'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    # В PostgreSQL индекс строится без блокировки записи в таблицы подтверждений, поэтому миграция не атомарная
+    concurrently = 'CONCURRENTLY ' if schema_editor.connection.vendor == 'postgresql' else ''
+    quote_name = schema_editor.quote_name
+    for table, name in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX {concurrently}IF NOT EXISTS {quote_name(name)} ON {quote_name(table)} '
+            f'({quote_name("created_at")})'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    concurrently = 'CONCURRENTLY ' if schema_editor.connection.vendor == 'postgresql' else ''
+    for _, name in INDEXES:
+        schema_editor.execute(f'DROP INDEX {concurrently}IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('confirm', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='confirmemail',
+                    name='created_at',
+                    field=models.DateTimeField(db_index=True, verbose_name='Дата создания кода подтверждения'),
+                ),
+                migrations.AlterField(
+                    model_name='confirmphone',
+                    name='created_at',
+                    field=models.DateTimeField(db_index=True, verbose_name='Дата создания кода подтверждения'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+        ),
+    ]
@@ -10,7 +10,7 @@ from confirm.managers import ConfirmEmailManager, ConfirmPhoneManager
 class BaseConfirmation(models.Model):
     secret_code = models.UUIDField(verbose_name=_('Секретный код'), unique=True)
     confirm_code = models.CharField(verbose_name=_('Код подтверждения'), max_length=128)
-    created_at = models.DateTimeField(verbose_name=_('Дата создания кода подтверждения'))
+    created_at = models.DateTimeField(verbose_name=_('Дата создания кода подтверждения'), db_index=True)
     confirmed = models.BooleanField(verbose_name=_('Подтвержден?'))
     type_confirm = models.CharField(verbose_name=_('Тип'), choices=TypeConfirm.choices, max_length=16)
 
@@ -22,6 +22,8 @@ class ConfirmEmail(BaseConfirmation):
     email = models.EmailField(verbose_name=_('Email'), unique=True)
     objects = ConfirmEmailManager()
 
+    identifier_field = 'email'
+
     class Meta:
         verbose_name = _('Подтверждение email')
         verbose_name_plural = _('Подтверждения emails')
@@ -29,10 +31,17 @@ class ConfirmEmail(BaseConfirmation):
     def __str__(self):
         return f'{self.email}'
 
+    @staticmethod
+    def ttl() -> timezone.timedelta:
+        """
+        Время, в течение которого можно подтвердить email
+        """
+
+        return timezone.timedelta(hours=settings.EMAIL_VER_TTL_HOURS)
+
     @property
     def is_expired(self) -> bool:
-        ttl_hours = settings.EMAIL_VER_TTL_HOURS
-        if self.created_at + timezone.timedelta(hours=ttl_hours) < timezone.now():
+        if self.created_at + self.ttl() < timezone.now():
             return True
 
         return False
@@ -43,6 +52,8 @@ class ConfirmPhone(BaseConfirmation):
     count_send = models.PositiveIntegerField(verbose_name='Количество отправок', default=1)
     objects = ConfirmPhoneManager()
 
+    identifier_field = 'phone'
+
     class Meta:
         verbose_name = _('Подтверждение телефона')
         verbose_name_plural = _('Подтверждения телефонов')
@@ -82,10 +93,17 @@ class ConfirmPhone(BaseConfirmation):
         count_sec = settings.PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS - passed_seconds_after_sending
         return 0 if count_sec < 0 else count_sec
 
+    @staticmethod
+    def ttl() -> timezone.timedelta:
+        """
+        Время, в течение которого можно подтвердить телефон
+        """
+
+        return timezone.timedelta(hours=settings.PHONE_VER_TTL_HOURS)
+
     @property
     def is_expired(self) -> bool:
-        ttl_hours = settings.PHONE_VER_TTL_HOURS
-        if self.created_at + timezone.timedelta(hours=ttl_hours) < timezone.now():
+        if self.created_at + self.ttl() < timezone.now():
             return True
 
         return False
@@ -0,0 +1,23 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from confirm.storages.base import BaseConfirmStorage
+
+
+@lru_cache(maxsize=None)
+def get_storage() -> BaseConfirmStorage:
+    """
+    Хранилище объектов подтверждения, заданное в settings.CONFIRM_STORAGE
+    """
+
+    return import_string(settings.CONFIRM_STORAGE)()
+
+
+@receiver(setting_changed)
+def reset_storage(setting, **kwargs):
+    if setting.startswith('CONFIRM_'):
+        get_storage.cache_clear()
@@ -0,0 +1,98 @@
+from typing import List, Tuple, Type, Union
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from confirm.models import ConfirmEmail, ConfirmPhone
+
+ConfirmModel = Type[Union[ConfirmEmail, ConfirmPhone]]
+ConfirmObj = Union[ConfirmEmail, ConfirmPhone]
+
+
+class BaseConfirmStorage:
+    """
+    Хранилище объектов подтверждения email и телефона.
+    Объекты подтверждения всегда возвращаются как экземпляры ConfirmEmail или ConfirmPhone
+    """
+
+    def save(self, confirm_obj: ConfirmObj) -> ConfirmObj:
+        """
+        Сохранение объекта подтверждения целиком
+        """
+
+        raise NotImplementedError
+
+    def delete(self, confirm_obj: ConfirmObj):
+        """
+        Удаление объекта подтверждения
+        """
+
+        raise NotImplementedError
+
+    def delete_on_commit(self, confirm_obj: ConfirmObj):
+        """
+        Удаление объекта подтверждения вместе с текущей транзакцией БД. По умолчанию удаление после фиксации,
+        что бы при откате транзакции объект остался и его можно было использовать повторно.
+        Хранилище в БД удаляет объект в самой транзакции
+        """
+
+        transaction.on_commit(lambda: self.delete(confirm_obj))
+
+    def update_or_create(self, model: ConfirmModel, identifier: str, defaults: dict) -> ConfirmObj:
+        """
+        Создание или обновление объекта подтверждения
+
+        :param model: Модель объекта подтверждения
+        :param identifier: Email или номер телефона в формате E164
+        :param defaults: Данные объекта подтверждения
+        """
+
+        raise NotImplementedError
+
+    def bulk_update_or_create(self, model: ConfirmModel, items: List[Tuple[str, dict]]) -> List[ConfirmObj]:
+        """
+        Создание или обновление пачки объектов подтверждения
+
+        :param model: Модель объектов подтверждения
+        :param items: Список пар (email или номер телефона в формате E164, данные объекта подтверждения)
+        :return: Объекты подтверждения в порядке items
+        """
+
+        raise NotImplementedError
+
+    def confirm(self, model: ConfirmModel, secret_code: UUID, confirm_code: str):
+        """
+        Подтверждение объекта, вызывает ConfirmObjNotFound или ConfirmCodeExpired
+        """
+
+        raise NotImplementedError
+
+    async def aupdate_or_create(self, model: ConfirmModel, identifier: str, defaults: dict) -> ConfirmObj:
+        """
+        Асинхронный update_or_create, по умолчанию выполняет синхронный метод через sync_to_async
+        """
+
+        return await sync_to_async(self.update_or_create)(model, identifier, defaults)
+
+    async def aconfirm(self, model: ConfirmModel, secret_code: UUID, confirm_code: str):
+        """
+        Асинхронный confirm, по умолчанию выполняет синхронный метод через sync_to_async
+        """
+
+        await sync_to_async(self.confirm)(model, secret_code, confirm_code)
+
+    def get_confirmed(self, model: ConfirmModel, secret_code: UUID, type_confirm: str) -> ConfirmObj:
+        """
+        Получение подтвержденного объекта, вызывает ConfirmObjNotFound или ConfirmObjNotConfirmed
+        """
+
+        raise NotImplementedError
+
+    def consume_confirmed(self, model: ConfirmModel, secret_code: UUID, type_confirm: str) -> ConfirmObj:
+        """
+        Получение и удаление подтвержденного объекта одной атомарной операцией,
+        вызывает ConfirmObjNotFound или ConfirmObjNotConfirmed. Объект может использовать только один запрос
+        """
+
+        raise NotImplementedError
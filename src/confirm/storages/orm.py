@@ -0,0 +1,56 @@
+from typing import List, Tuple
+from uuid import UUID
+
+from confirm.storages.base import BaseConfirmStorage, ConfirmModel, ConfirmObj
+
+
+class OrmConfirmStorage(BaseConfirmStorage):
+    """
+    Хранение объектов подтверждения в таблицах ConfirmEmail и ConfirmPhone
+    """
+
+    def save(self, confirm_obj: ConfirmObj) -> ConfirmObj:
+        confirm_obj.save()
+        return confirm_obj
+
+    def delete(self, confirm_obj: ConfirmObj):
+        confirm_obj.delete()
+
+    def delete_on_commit(self, confirm_obj: ConfirmObj):
+        confirm_obj.delete()
+
+    def update_or_create(self, model: ConfirmModel, identifier: str, defaults: dict) -> ConfirmObj:
+        return model.objects.update_or_create(
+            defaults=defaults,
+            **{model.identifier_field: identifier}
+        )[0]
+
+    async def aupdate_or_create(self, model: ConfirmModel, identifier: str, defaults: dict) -> ConfirmObj:
+        return (await model.objects.aupdate_or_create(
+            defaults=defaults,
+            **{model.identifier_field: identifier}
+        ))[0]
+
+    def bulk_update_or_create(self, model: ConfirmModel, items: List[Tuple[str, dict]]) -> List[ConfirmObj]:
+        if not items:
+            return []
+
+        update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.name != model.identifier_field
+        ]
+        return model.objects.bulk_create(
+            [model(**{model.identifier_field: identifier}, **data) for identifier, data in items],
+            update_conflicts=True,
+            unique_fields=[model.identifier_field],
+            update_fields=update_fields,
+        )
+
+    def confirm(self, model: ConfirmModel, secret_code: UUID, confirm_code: str):
+        model.objects.confirm(secret_code, confirm_code)
+
+    def get_confirmed(self, model: ConfirmModel, secret_code: UUID, type_confirm: str) -> ConfirmObj:
+        return model.objects.get_confirmed(secret_code, type_confirm)
+
+    def consume_confirmed(self, model: ConfirmModel, secret_code: UUID, type_confirm: str) -> ConfirmObj:
+        return model.objects.consume_confirmed(secret_code, type_confirm)
@@ -0,0 +1,244 @@
+from datetime import datetime, timezone as dt_timezone
+from typing import List, Tuple
+from uuid import UUID
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+import exceptions
+from confirm.models import ConfirmPhone
+from confirm.storages.base import BaseConfirmStorage, ConfirmModel, ConfirmObj
+
+# KEYS[1] - ключ объекта, KEYS[2] - ключ секретного кода
+# ARGV[1] - префикс ключей секретных кодов, ARGV[2] - идентификатор объекта,
+# ARGV[3] - время жизни ключей в секундах, ARGV[4..] - поля и значения объекта
+SAVE_SCRIPT = """
+local old_secret_code = redis.call('HGET', KEYS[1], 'secret_code')
+if old_secret_code then
+    redis.call('DEL', ARGV[1] .. old_secret_code)
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+"""
+
+# KEYS[1] - ключ секретного кода
+# ARGV[1] - префикс ключей объектов
+GET_BY_SECRET_CODE_SCRIPT = """
+local identifier = redis.call('GET', KEYS[1])
+if not identifier then
+    return {}
+end
+return redis.call('HGETALL', ARGV[1] .. identifier)
+"""
+
+# KEYS[1] - ключ секретного кода
+# ARGV[1] - префикс ключей объектов, ARGV[2] - секретный код, ARGV[3] - код подтверждения,
+# ARGV[4] - timestamp, созданные раньше которого объекты считаются истекшими
+# Возвращает 1 - подтвержден, 0 - не найден, -1 - время подтверждения истекло
+CONFIRM_SCRIPT = """
+local identifier = redis.call('GET', KEYS[1])
+if not identifier then
+    return 0
+end
+local key = ARGV[1] .. identifier
+local obj = redis.call('HMGET', key, 'secret_code', 'confirm_code', 'confirmed', 'created_at')
+if obj[1] ~= ARGV[2] or obj[2] ~= ARGV[3] or obj[3] ~= '0' then
+    return 0
+end
+if tonumber(obj[4]) <= tonumber(ARGV[4]) then
+    return -1
+end
+redis.call('HSET', key, 'confirmed', '1')
+return 1
+"""
+
+# KEYS[1] - ключ секретного кода
+# ARGV[1] - префикс ключей объектов, ARGV[2] - секретный код, ARGV[3] - тип подтверждения
+# Возвращает поля и значения удаленного объекта, 0 - не найден, -1 - не подтвержден
+CONSUME_SCRIPT = """
+local identifier = redis.call('GET', KEYS[1])
+if not identifier then
+    return 0
+end
+local key = ARGV[1] .. identifier
+local obj = redis.call('HMGET', key, 'secret_code', 'type_confirm', 'confirmed')
+if obj[1] ~= ARGV[2] or obj[2] ~= ARGV[3] then
+    return 0
+end
+if obj[3] ~= '1' then
+    return -1
+end
+local data = redis.call('HGETALL', key)
+redis.call('DEL', key, KEYS[1])
+return data
+"""
+
+
+class RedisConfirmStorage(BaseConfirmStorage):
+    """
+    Хранение объектов подтверждения в хешах redis.
+    Ключи удаляются самим redis по EXPIRE, после истечения времени подтверждения
+    """
+
+    def __init__(self):
+        self.redis = self.get_client()
+        self.save_script = self.redis.register_script(SAVE_SCRIPT)
+        self.get_by_secret_code_script = self.redis.register_script(GET_BY_SECRET_CODE_SCRIPT)
+        self.confirm_script = self.redis.register_script(CONFIRM_SCRIPT)
+        self.consume_script = self.redis.register_script(CONSUME_SCRIPT)
+
+    def get_client(self) -> redis.Redis:
+        return redis.Redis.from_url(settings.CONFIRM_REDIS_URL, decode_responses=True)
+
+    @staticmethod
+    def obj_prefix(model: ConfirmModel) -> str:
+        return f'confirm:{model._meta.model_name}:obj:'
+
+    @staticmethod
+    def secret_code_prefix(model: ConfirmModel) -> str:
+        return f'confirm:{model._meta.model_name}:secret_code:'
+
+    @staticmethod
+    def expire_seconds(model: ConfirmModel) -> int:
+        """
+        Время жизни ключей: истекший объект хранится еще CONFIRM_REDIS_KEEP_EXPIRED_SECONDS,
+        что бы отличать истекший код от несуществующего. Для телефона ключ живет не меньше
+        PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS, иначе сбросится счетчик отправок
+        """
+
+        seconds = model.ttl().total_seconds() + settings.CONFIRM_REDIS_KEEP_EXPIRED_SECONDS
+        if model is ConfirmPhone:
+            seconds = max(seconds, settings.PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS)
+
+        return int(seconds)
+
+    @staticmethod
+    def dump(confirm_obj: ConfirmObj) -> List[str]:
+        """
+        Преобразование объекта подтверждения в список полей и значений для HSET
+        """
+
+        data = []
+        for field in confirm_obj._meta.concrete_fields:
+            if field.primary_key:
+                continue
+
+            value = field.value_from_object(confirm_obj)
+            if field.get_internal_type() == 'DateTimeField':
+                value = repr(value.timestamp())
+            elif field.get_internal_type() == 'BooleanField':
+                value = int(value)
+
+            data += [field.name, str(value)]
+
+        return data
+
+    @staticmethod
+    def load(model: ConfirmModel, data: List[str]) -> ConfirmObj:
+        """
+        Создание объекта подтверждения из результата HGETALL
+        """
+
+        data = dict(zip(data[::2], data[1::2]))
+
+        fields = {}
+        for field in model._meta.concrete_fields:
+            if field.name not in data:
+                continue
+
+            value = data[field.name]
+            if field.get_internal_type() == 'DateTimeField':
+                value = datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+            else:
+                value = field.to_python(value)
+
+            fields[field.name] = value
+
+        return model(**fields)
+
+    def save(self, confirm_obj: ConfirmObj, client: redis.Redis = None) -> ConfirmObj:
+        model = confirm_obj.__class__
+        identifier = str(getattr(confirm_obj, model.identifier_field))
+
+        self.save_script(
+            keys=[
+                self.obj_prefix(model) + identifier,
+                self.secret_code_prefix(model) + str(confirm_obj.secret_code),
+            ],
+            args=[
+                self.secret_code_prefix(model),
+                identifier,
+                self.expire_seconds(model),
+                *self.dump(confirm_obj),
+            ],
+            client=client
+        )
+
+        return confirm_obj
+
+    def delete(self, confirm_obj: ConfirmObj):
+        model = confirm_obj.__class__
+        self.redis.delete(
+            self.obj_prefix(model) + str(getattr(confirm_obj, model.identifier_field)),
+            self.secret_code_prefix(model) + str(confirm_obj.secret_code),
+        )
+
+    def update_or_create(self, model: ConfirmModel, identifier: str, defaults: dict) -> ConfirmObj:
+        return self.save(model(**{model.identifier_field: identifier}, **defaults))
+
+    def bulk_update_or_create(self, model: ConfirmModel, items: List[Tuple[str, dict]]) -> List[ConfirmObj]:
+        pipeline = self.redis.pipeline(transaction=False)
+        confirm_objs = [
+            self.save(model(**{model.identifier_field: identifier}, **data), client=pipeline)
+            for identifier, data in items
+        ]
+        pipeline.execute()
+
+        return confirm_objs
+
+    def confirm(self, model: ConfirmModel, secret_code: UUID, confirm_code: str):
+        deadline = timezone.now() - model.ttl()
+        result = self.confirm_script(
+            keys=[self.secret_code_prefix(model) + str(secret_code)],
+            args=[self.obj_prefix(model), str(secret_code), confirm_code, repr(deadline.timestamp())]
+        )
+
+        if result == 0:
+            raise exceptions.ConfirmObjNotFound
+
+        if result == -1:
+            raise exceptions.ConfirmCodeExpired
+
+    def get_confirmed(self, model: ConfirmModel, secret_code: UUID, type_confirm: str) -> ConfirmObj:
+        data = self.get_by_secret_code_script(
+            keys=[self.secret_code_prefix(model) + str(secret_code)],
+            args=[self.obj_prefix(model)]
+        )
+        if not data:
+            raise exceptions.ConfirmObjNotFound
+
+        confirm_obj = self.load(model, data)
+        if confirm_obj.type_confirm != type_confirm:
+            raise exceptions.ConfirmObjNotFound
+
+        if not confirm_obj.confirmed:
+            raise exceptions.ConfirmObjNotConfirmed
+
+        return confirm_obj
+
+    def consume_confirmed(self, model: ConfirmModel, secret_code: UUID, type_confirm: str) -> ConfirmObj:
+        result = self.consume_script(
+            keys=[self.secret_code_prefix(model) + str(secret_code)],
+            args=[self.obj_prefix(model), str(secret_code), type_confirm]
+        )
+
+        if result == 0:
+            raise exceptions.ConfirmObjNotFound
+
+        if result == -1:
+            raise exceptions.ConfirmObjNotConfirmed
+
+        return self.load(model, result)
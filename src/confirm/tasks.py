@@ -0,0 +1,35 @@
+import logging
+import time
+
+from django.conf import settings
+
+from app.celery import app
+from confirm.models import ConfirmEmail, ConfirmPhone
+
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def task_purge_expired_confirmations() -> dict:
+    """
+    Удаление истекших объектов подтверждения пачками по CONFIRM_PURGE_BATCH_SIZE,
+    пока не закончатся истекшие объекты или не выйдет CONFIRM_PURGE_TIME_BUDGET_SECONDS
+    """
+
+    batch_size = settings.CONFIRM_PURGE_BATCH_SIZE
+    started_at = time.monotonic()
+
+    purged = {}
+    for model in (ConfirmEmail, ConfirmPhone):
+        purged[model._meta.model_name] = 0
+
+        while time.monotonic() - started_at < settings.CONFIRM_PURGE_TIME_BUDGET_SECONDS:
+            count = model.objects.purge_expired(batch_size)
+            purged[model._meta.model_name] += count
+            if count < batch_size:
+                break
+
+    seconds = round(time.monotonic() - started_at, 3)
+    logger.info(f'Удалено истекших объектов подтверждения: {purged}, за {seconds} сек.')
+
+    return {'purged': purged, 'seconds': seconds}
@@ -0,0 +1,147 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Tuple, Union
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+import exceptions
+
+# KEYS[1] - ключ счетчика отправок на номер
+# ARGV[1] - текущее время (timestamp), ARGV[2] - PHONE_CONFIRM_STEP_WAITING_SECONDS,
+# ARGV[3] - PHONE_CONFIRM_CODE_COUNT_SEND, ARGV[4] - PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS
+# Возвращает {1, номер отправки} если отправка разрешена,
+# {0, 'wait', секунды} или {0, 'max_count', секунды} если нет
+HIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local step_seconds = tonumber(ARGV[2])
+local max_count = tonumber(ARGV[3])
+local reset_seconds = tonumber(ARGV[4])
+
+local count_send = 1
+local state = redis.call('HMGET', KEYS[1], 'count_send', 'sent_at')
+if state[1] then
+    local count = tonumber(state[1])
+    local passed_seconds = math.floor(now - tonumber(state[2]))
+    local wait_renewal_seconds = math.max(reset_seconds - passed_seconds, 0)
+
+    if wait_renewal_seconds ~= 0 then
+        if count >= max_count then
+            return {0, 'max_count', wait_renewal_seconds}
+        end
+
+        local sec_resend = math.max(step_seconds * count - passed_seconds, 0)
+        if sec_resend ~= 0 then
+            return {0, 'wait', sec_resend}
+        end
+
+        count_send = count + 1
+    end
+end
+
+redis.call('HSET', KEYS[1], 'count_send', count_send, 'sent_at', ARGV[1])
+redis.call('EXPIRE', KEYS[1], reset_seconds)
+return {1, count_send}
+"""
+
+
+class PhoneSendThrottle:
+    """
+    Ограничение отправок кода подтверждения на номер телефона.
+    Проверка и учет отправки выполняются одним скриптом redis, поэтому параллельные запросы
+    на один номер не могут отправить больше PHONE_CONFIRM_CODE_COUNT_SEND кодов
+    """
+
+    def __init__(self):
+        self.redis = self.get_client()
+        self.hit_script = self.redis.register_script(HIT_SCRIPT)
+
+    def get_client(self) -> redis.Redis:
+        return redis.Redis.from_url(settings.CONFIRM_REDIS_URL, decode_responses=True)
+
+    @staticmethod
+    def key(phone: str) -> str:
+        return f'confirm:phone_send:{phone}'
+
+    def hit(self, phone: str, sent_at: datetime) -> int:
+        """
+        Учет отправки кода подтверждения на номер
+
+        :param phone: Номер телефона в формате E164
+        :param sent_at: Время отправки, совпадает с created_at объекта подтверждения
+        :return: Номер отправки с начала периода PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS
+        """
+
+        return self.count_send(self.hit_script(**self.hit_params(phone, sent_at)))
+
+    async def ahit(self, phone: str, sent_at: datetime) -> int:
+        """
+        Асинхронный hit, запрос к redis выполняется в потоке через sync_to_async
+        """
+
+        return await sync_to_async(self.hit, thread_sensitive=False)(phone, sent_at)
+
+    def hit_many(self, sends: List[Tuple[str, datetime]]) -> List[Union[int, exceptions.BaseException]]:
+        """
+        Учет пачки отправок одним обращением к redis
+
+        :param sends: Список пар (номер телефона в формате E164, время отправки)
+        :return: Для каждой отправки номер отправки или исключение, если отправка запрещена
+        """
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for phone, sent_at in sends:
+            self.hit_script(**self.hit_params(phone, sent_at), client=pipeline)
+
+        counts = []
+        for result in pipeline.execute():
+            try:
+                counts.append(self.count_send(result))
+            except (exceptions.ConfirmPhoneExcMaxCountSend, exceptions.ConfirmPhoneWaitBeforeSending) as e:
+                counts.append(e)
+
+        return counts
+
+    def hit_params(self, phone: str, sent_at: datetime) -> dict:
+        return {
+            'keys': [self.key(phone)],
+            'args': [
+                repr(sent_at.timestamp()),
+                settings.PHONE_CONFIRM_STEP_WAITING_SECONDS,
+                settings.PHONE_CONFIRM_CODE_COUNT_SEND,
+                settings.PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS,
+            ]
+        }
+
+    @staticmethod
+    def count_send(result: list) -> int:
+        """
+        Номер отправки из результата скрипта, или исключение, если отправка запрещена
+        """
+
+        if result[0] == 1:
+            return int(result[1])
+
+        if result[1] == 'max_count':
+            raise exceptions.ConfirmPhoneExcMaxCountSend(int(result[2]))
+
+        raise exceptions.ConfirmPhoneWaitBeforeSending(int(result[2]))
+
+
+@lru_cache(maxsize=None)
+def get_phone_send_throttle() -> PhoneSendThrottle:
+    """
+    Ограничитель отправок, заданный в settings.CONFIRM_PHONE_THROTTLE
+    """
+
+    return import_string(settings.CONFIRM_PHONE_THROTTLE)()
+
+
+@receiver(setting_changed)
+def reset_phone_send_throttle(setting, **kwargs):
+    if setting.startswith('CONFIRM_'):
+        get_phone_send_throttle.cache_clear()
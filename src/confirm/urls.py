@@ -1,15 +1,26 @@
+from django.conf import settings
 from django.urls import path, include
 
 from confirm import views
 
 app_name = 'confirm'
 
+if settings.CONFIRM_ASYNC_VIEWS:
+    confirm, create_confirm_email, create_confirm_phone = (
+        views.aconfirm, views.acreate_confirm_email, views.acreate_confirm_phone
+    )
+else:
+    confirm, create_confirm_email, create_confirm_phone = (
+        views.confirm, views.create_confirm_email, views.create_confirm_phone
+    )
+
 urlpatterns = [
-    path('', views.confirm, name='confirm'),
+    path('', confirm, name='confirm'),
+    path('bulk/', views.bulk_create_confirm, name='bulk_create_confirm'),
     path('email/', include([
-        path('create/', views.create_confirm_email, name='create_confirm_email'),
+        path('create/', create_confirm_email, name='create_confirm_email'),
     ])),
     path('phone/', include([
-        path('create/', views.create_confirm_phone, name='create_confirm_phone'),
+        path('create/', create_confirm_phone, name='create_confirm_phone'),
     ])),
 ]
@@ -1,7 +1,11 @@
-import random
+import os
 import string
+import threading
 import uuid
+from functools import lru_cache
+from typing import List, Optional
 
+import phonenumbers
 from django.conf import settings
 from django.utils import timezone
 from phonenumber_field.phonenumber import PhoneNumber
@@ -10,7 +14,59 @@ from phonenumbers.phonenumberutil import NumberParseException
 import exceptions
 from confirm.choices import PhoneRegion
 from confirm.choices import TypeConfirm
-from user.models import User
+from user.bloom import auser_exists, user_exists
+
+
+CONFIRM_CODE_ALPHABET = string.ascii_uppercase + string.digits
+
+
+class ConfirmCodeGenerator:
+    """
+    Генерация кодов подтверждения из os.urandom, случайные байты запрашиваются блоками.
+    Байты >= limit отбрасываются, поэтому символы алфавита равновероятны
+    """
+
+    def __init__(self, alphabet: str, block_size: int = 4096):
+        self.block_size = block_size
+        self.limit = 256 - 256 % len(alphabet)
+        self.table = bytes(ord(alphabet[byte % len(alphabet)]) for byte in range(256))
+        self.rejected = bytes(range(self.limit, 256))
+        self.buffer = b''
+        self.lock = threading.Lock()
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        """
+        Сброс буфера, что бы дочерние процессы не выдали одинаковые коды
+        """
+
+        self.lock = threading.Lock()
+        self.buffer = b''
+
+    def generate_many(self, count: int, length: int = None) -> List[str]:
+        """
+        Генерация пачки кодов подтверждения
+
+        :param count: Количество кодов
+        :param length: Длина кода, по умолчанию LENGTH_CONFIRM_CODE
+        :return: Список кодов подтверждения
+        """
+
+        length = length or settings.LENGTH_CONFIRM_CODE
+        size = count * length
+
+        with self.lock:
+            while len(self.buffer) < size:
+                block = os.urandom(max(self.block_size, size - len(self.buffer)))
+                self.buffer += block.translate(self.table, self.rejected)
+
+            chars, self.buffer = self.buffer[:size], self.buffer[size:]
+
+        chars = chars.decode('ascii')
+        return [chars[i:i + length] for i in range(0, size, length)]
+
+
+confirm_code_generator = ConfirmCodeGenerator(CONFIRM_CODE_ALPHABET)
 
 
 def generate_confirm_code() -> str:
@@ -20,15 +76,15 @@ def generate_confirm_code() -> str:
     :return: Код подтверждения
     """
 
-    length = settings.LENGTH_CONFIRM_CODE
-    return ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(length))
+    return confirm_code_generator.generate_many(1)[0]
 
 
-def generate_confirm_data(type_confirm: TypeConfirm) -> dict:
+def generate_confirm_data(type_confirm: TypeConfirm, confirm_code: str = None) -> dict:
     """
     Генерация данных для создания кода подтверждения
 
     :param type_confirm: Тип кода подтверждения
+    :param confirm_code: Заранее сгенерированный код подтверждения, например из generate_many
     :return: Словарь с данными кода подтверждения
         - secret_code uuid - секретный код
         - confirm_code str - код подтверждения
@@ -40,7 +96,7 @@ def generate_confirm_data(type_confirm: TypeConfirm) -> dict:
 
     return {
         'secret_code': uuid.uuid4(),
-        'confirm_code': generate_confirm_code(),
+        'confirm_code': confirm_code or generate_confirm_code(),
         'created_at': timezone.now(),
         'confirmed': False,
         'type_confirm': type_confirm
@@ -58,18 +114,44 @@ def type_confirm_is_available_for_user(type_confirm: TypeConfirm, user_filter_da
 
     """
 
+    check_user_filter_data(user_filter_data)
+
+    check_type_confirm_available(type_confirm, user_exists(user_filter_data))
+
+
+async def atype_confirm_is_available_for_user(type_confirm: TypeConfirm, user_filter_data: dict):
+    """
+    Асинхронная версия type_confirm_is_available_for_user
+
+    :param type_confirm: Тип подтверждения
+    :param user_filter_data: {'email': example@mail.ru} или {'phone': '+7xxxxxxxxxx'}
+    """
+
+    check_user_filter_data(user_filter_data)
+
+    check_type_confirm_available(type_confirm, await auser_exists(user_filter_data))
+
+
+def check_user_filter_data(user_filter_data: dict):
     if len(user_filter_data.keys()) != 1:
         raise ValueError('Должен быть один элемент фильтра')
 
     if 'phone' not in user_filter_data and 'email' not in user_filter_data:
         raise ValueError('Параметр фильтра должен быть phone или email')
 
-    user = User.objects.filter(**user_filter_data).exists()
 
-    if type_confirm in [TypeConfirm.REGISTRATION, TypeConfirm.CHANGE] and user:
+def check_type_confirm_available(type_confirm: TypeConfirm, user_exists: bool):
+    """
+    Проверка доступности типа подтверждения по уже известному наличию пользователя
+
+    :param type_confirm: Тип подтверждения
+    :param user_exists: Есть ли в системе пользователь с таким email или телефоном
+    """
+
+    if type_confirm in [TypeConfirm.REGISTRATION, TypeConfirm.CHANGE] and user_exists:
         raise exceptions.UserAlreadyExist
 
-    if type_confirm == TypeConfirm.RESET_PASS and not user:
+    if type_confirm == TypeConfirm.RESET_PASS and not user_exists:
         raise exceptions.UserNotFound
 
 
@@ -83,12 +165,37 @@ def normalization_phone_number(phone: str, region: PhoneRegion) -> str:
     если на вход подать phone - 9231234345 и region - RU, метод преобразует его к виду +79231234345
     """
 
+    phone = parse_phone_number(phone, region)
+    if phone is None:
+        raise exceptions.IncorrectPhone
+
+    return phone
+
+
+@lru_cache(maxsize=settings.PHONE_NORMALIZATION_CACHE_SIZE)
+def parse_phone_number(phone: str, region: str) -> Optional[str]:
+    """
+    Разбор номера телефона с кешированием по (phone, region), некорректные номера тоже кешируются.
+    Счетчики попаданий и промахов - parse_phone_number.cache_info()
+
+    :return: Телефон в формате E164 или None, если номер некорректный
+    """
+
     try:
         phone = PhoneNumber.from_string(phone, region=region)
     except NumberParseException:
-        raise exceptions.IncorrectPhone
+        return None
 
     if not phone.is_valid():
-        raise exceptions.IncorrectPhone
+        return None
 
     return phone.as_e164
+
+
+def preload_phone_metadata():
+    """
+    Загрузка метаданных phonenumbers для регионов PhoneRegion, которые иначе загружаются при первом разборе номера
+    """
+
+    for region in PhoneRegion.values:
+        phonenumbers.is_valid_number(phonenumbers.example_number(region))
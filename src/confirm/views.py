@@ -1,11 +1,15 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
 import exceptions
 import http_exceptions
-from confirm import handlers, serializers
+from confirm import bulk, handlers, serializers
+from confirm.choices import BulkFileFormat
 from notification.emails.tasks import task_send_confirm_code_email
 from notification.sms.tasks import task_send_confirm_code_phone
 
@@ -108,3 +112,110 @@ def confirm(request):
         raise http_exceptions.Conflict(detail=e.message, code=e.code)
 
     return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_id='bulk_create_confirm',
+    operation_summary='Массовое создание кодов подтверждения email и phone.',
+    operation_description=(
+        'Тело запроса - JSON Lines, или CSV с заголовком при Content-Type: text/csv. '
+        'Каждая строка содержит type_confirm и email, либо phone и region. '
+        'Ответ - JSON Lines с результатом по каждой строке, в том числе с ошибкой, '
+        'если пачку строк не удалось обработать или файл не распознан'
+    ),
+    responses={status.HTTP_200_OK: ''}
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def bulk_create_confirm(request):
+    file_format = BulkFileFormat.CSV if request.content_type == 'text/csv' else BulkFileFormat.JSONL
+    rows = bulk.read_rows(request.stream or [], file_format)
+
+    return StreamingHttpResponse(
+        bulk.dump_results(bulk.create_confirm(rows)),
+        content_type='application/x-ndjson'
+    )
+
+
+@http_exceptions.async_api_view
+async def acreate_confirm_email(request, data):
+    """
+    Асинхронная версия create_confirm_email
+    """
+
+    serializer = serializers.CreateConfirmEmailSerializer(data=data)
+    if not serializer.is_valid():
+        raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+    try:
+        confirm_email = await handlers.acreate_confirm_email(
+            serializer.validated_data['email'], serializer.validated_data['type_confirm']
+        )
+    except (exceptions.UserAlreadyExist, exceptions.UserNotFound) as e:
+        raise http_exceptions.Conflict(detail=e.message, code=e.code)
+
+    await sync_to_async(task_send_confirm_code_email.delay, thread_sensitive=False)(
+        confirm_email.email, confirm_email.confirm_code
+    )
+
+    return JsonResponse(serializers.EmailSecretCodeSerializer(confirm_email).data, status=status.HTTP_201_CREATED)
+
+
+@http_exceptions.async_api_view
+async def acreate_confirm_phone(request, data):
+    """
+    Асинхронная версия create_confirm_phone
+    """
+
+    serializer = serializers.CreateConfirmPhoneSerializer(data=data)
+    if not serializer.is_valid():
+        raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+    try:
+        confirm_phone = await handlers.acreate_confirm_phone(
+            serializer.validated_data['phone'],
+            serializer.validated_data['region'],
+            serializer.validated_data['type_confirm']
+        )
+
+    except (
+            exceptions.ConfirmPhoneWaitBeforeSending,
+            exceptions.ConfirmPhoneExcMaxCountSend
+    ) as e:
+        raise http_exceptions.Conflict(detail=e.message, code=e.code, payload_data=e.payload_data)
+
+    except (
+            exceptions.IncorrectPhone,
+            exceptions.UserAlreadyExist,
+            exceptions.UserNotFound,
+    ) as e:
+        raise http_exceptions.Conflict(detail=e.message, code=e.code)
+
+    await sync_to_async(task_send_confirm_code_phone.delay, thread_sensitive=False)(
+        confirm_phone.phone.as_e164, confirm_phone.confirm_code
+    )
+
+    return JsonResponse(serializers.PhoneSecretCodeSerializer(confirm_phone).data, status=status.HTTP_201_CREATED)
+
+
+@http_exceptions.async_api_view
+async def aconfirm(request, data):
+    """
+    Асинхронная версия confirm
+    """
+
+    serializer = serializers.ConfirmSerializer(data=data)
+    if not serializer.is_valid():
+        raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+    try:
+        await handlers.aconfirm_obj(
+            serializer.validated_data['secret_code'],
+            serializer.validated_data['confirm_code'],
+            serializer.validated_data['object_confirm'],
+        )
+    except (exceptions.ConfirmObjNotFound, exceptions.ConfirmCodeExpired) as e:
+        raise http_exceptions.Conflict(detail=e.message, code=e.code)
+
+    return HttpResponse(status=status.HTTP_204_NO_CONTENT)
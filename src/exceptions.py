@@ -59,3 +59,46 @@ class ConfirmPhoneWaitBeforeSending(BaseException):
         self.message = _(f'Отправить код подтверждения невозможно, попробуйте позже')
         self.code = self.__class__.__name__
         self.payload_data = {'wait_seconds': count_sec}
+
+
+class DuplicateInBatch(BaseException):
+    def __init__(self):
+        self.message = _('Повторяющийся email или телефон в пачке')
+        self.code = self.__class__.__name__
+
+
+class BulkChunkFailed(BaseException):
+    def __init__(self):
+        self.message = _('Не удалось обработать пачку строк, повторите эти строки позже')
+        self.code = self.__class__.__name__
+
+
+class BulkFileInvalid(BaseException):
+    def __init__(self):
+        self.message = _('Файл не распознан, строки начиная с этой не обработаны')
+        self.code = self.__class__.__name__
+
+
+class LoginAttemptsExceeded(BaseException):
+    def __init__(self, count_sec: int):
+        self.message = _('Превышено количество попыток входа, попробуйте позже')
+        self.code = self.__class__.__name__
+        self.payload_data = {'wait_seconds': count_sec}
+
+
+class TokenRevocationUnavailable(BaseException):
+    def __init__(self):
+        self.message = _('Не удалось отозвать токены, попробуйте позже')
+        self.code = self.__class__.__name__
+
+
+class PasswordHashingBusy(BaseException):
+    def __init__(self):
+        self.message = _('Сервис перегружен, попробуйте позже')
+        self.code = self.__class__.__name__
+
+
+class InvalidCursor(BaseException):
+    def __init__(self):
+        self.message = _('Некорректный курсор')
+        self.code = self.__class__.__name__
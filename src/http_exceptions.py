@@ -1,5 +1,8 @@
+import json
+from functools import wraps
+
 from django.core.exceptions import PermissionDenied
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from rest_framework import status, exceptions
 from rest_framework.exceptions import APIException
 from rest_framework.response import Response
@@ -40,6 +43,10 @@ class Conflict(BaseErrorResponse):
     status_code = status.HTTP_409_CONFLICT
 
 
+class ServiceUnavailable(BaseErrorResponse):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
 def custom_exception_handler(exc, context):
     """Custom error handler"""
 
@@ -79,3 +86,47 @@ def custom_exception_handler(exc, context):
             return Response(data, status=exc.status_code, headers=headers)
 
         return None
+
+
+def error_response(status_code: int, detail=None, validation_errors=None, code=None) -> JsonResponse:
+    return JsonResponse({
+        'status': status_code,
+        'detail': detail,
+        'validation_errors': validation_errors,
+        'code': code,
+        'payload_data': None,
+    }, status=status_code)
+
+
+def async_api_view(view):
+    """
+    Асинхронное представление без DRF, DRF не поддерживает async def.
+    Принимает только POST с JSON телом или данными формы, данные передаются в view вторым аргументом.
+    Ошибки отдаются в том же формате, что и в custom_exception_handler
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return error_response(
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                detail=f'Method "{request.method}" not allowed.',
+                code=exceptions.MethodNotAllowed.__name__
+            )
+
+        try:
+            data = json.loads(request.body or b'{}') if request.content_type == 'application/json' else request.POST
+        except ValueError as e:
+            return error_response(
+                status.HTTP_400_BAD_REQUEST,
+                validation_errors=f'JSON parse error - {e}',
+                code=exceptions.ParseError.__name__
+            )
+
+        try:
+            return await view(request, data, *args, **kwargs)
+        except BaseErrorResponse as e:
+            return JsonResponse(e.detail, status=e.status_code)
+
+    wrapper.csrf_exempt = True
+    return wrapper
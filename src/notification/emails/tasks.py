@@ -8,3 +8,13 @@ logger = logging.getLogger(__name__)
 @app.task
 def task_send_confirm_code_email(to: str, confirm_code: str):
     logger.info(f'Email. На {to} отправлен код {confirm_code}')
+
+
+@app.task
+def task_send_confirm_code_email_many(messages: list):
+    """
+    :param messages: Список пар (получатель, код подтверждения)
+    """
+
+    for to, confirm_code in messages:
+        task_send_confirm_code_email(to, confirm_code)
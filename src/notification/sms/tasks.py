@@ -8,3 +8,12 @@ logger = logging.getLogger(__name__)
 def task_send_confirm_code_phone(to: str, confirm_code: str):
     logger.info(f'СМС. На {to} отправлен код {confirm_code}')
 
+
+@app.task
+def task_send_confirm_code_phone_many(messages: list):
+    """
+    :param messages: Список пар (получатель, код подтверждения)
+    """
+
+    for to, confirm_code in messages:
+        task_send_confirm_code_phone(to, confirm_code)
@@ -0,0 +1,106 @@
+import json
+import uuid
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.test import AsyncRequestFactory
+from faker import Faker
+from rest_framework import status
+
+import exceptions
+from confirm import views
+from confirm.choices import TypeConfirm, ObjConfirm, PhoneRegion
+from tests.confirm.factories import ConfirmEmailFactory
+from tests.utils import (
+    BaseE2ETest, create_base_user, rand_mobile_phone, RedisConfirmStorageMixin, FakePhoneSendThrottleMixin
+)
+
+faker = Faker()
+
+
+class AsyncConfirmViewsE2ETest(FakePhoneSendThrottleMixin, BaseE2ETest):
+    """
+    Асинхронные представления confirm: те же ответы и формат ошибок, что и у синхронных
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.user = create_base_user(email=faker.email(), phone=rand_mobile_phone()['phone'])
+
+    async def call(self, view, request):
+        response = await view(request)
+        # Как в тестовом клиенте Django, что бы работали проверки BaseE2ETest
+        response.json = lambda: json.loads(response.content)
+        return response
+
+    async def post(self, view, data):
+        return await self.call(view, self.factory.post('/', json.dumps(data), content_type='application/json'))
+
+    @patch('confirm.views.task_send_confirm_code_email')
+    async def test_create_confirm_email(self, task_send_confirm_code_email):
+        email = faker.email()
+        response = await self.post(views.acreate_confirm_email, {
+            'type_confirm': TypeConfirm.REGISTRATION, 'email': email
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('secret_code', response.json())
+        task_send_confirm_code_email.delay.assert_called_once()
+        self.assertEqual(task_send_confirm_code_email.delay.call_args.args[0], email.lower())
+
+        response = await self.post(views.acreate_confirm_email, {
+            'type_confirm': TypeConfirm.REGISTRATION, 'email': self.user.email
+        })
+        self.conflict_response(response, exceptions.UserAlreadyExist)
+
+    @patch('confirm.views.task_send_confirm_code_phone')
+    async def test_create_confirm_phone(self, task_send_confirm_code_phone):
+        phone = rand_mobile_phone()
+        request_data = {'type_confirm': TypeConfirm.REGISTRATION, 'phone': phone['number'], 'region': PhoneRegion.RUSSIAN}
+
+        response = await self.post(views.acreate_confirm_phone, request_data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response_data = response.json()
+        self.assertEqual(response_data['count_resend'], settings.PHONE_CONFIRM_CODE_COUNT_SEND - 1)
+        task_send_confirm_code_phone.delay.assert_called_once()
+
+        response = await self.post(views.acreate_confirm_phone, request_data)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response_data = response.json()
+        self.assertEqual(response_data['code'], exceptions.ConfirmPhoneWaitBeforeSending.__name__)
+        self.assertIn('wait_seconds', response_data['payload_data'])
+
+    async def test_confirm(self):
+        confirm_email = await sync_to_async(ConfirmEmailFactory)()
+        request_data = {
+            'secret_code': str(confirm_email.secret_code),
+            'confirm_code': confirm_email.confirm_code,
+            'object_confirm': ObjConfirm.EMAIL,
+        }
+
+        response = await self.post(views.aconfirm, request_data)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = await self.post(views.aconfirm, {**request_data, 'secret_code': str(uuid.uuid4())})
+        self.conflict_response(response, exceptions.ConfirmObjNotFound)
+
+    async def test_errors(self):
+        response = await self.post(views.aconfirm, {'object_confirm': ObjConfirm.EMAIL})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('secret_code', response.json()['validation_errors'])
+
+        request = self.factory.post('/', 'not json', content_type='application/json')
+        response = await self.call(views.aconfirm, request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['code'], 'ParseError')
+
+        response = await self.call(views.aconfirm, self.factory.get('/'))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class AsyncConfirmViewsRedisE2ETest(RedisConfirmStorageMixin, AsyncConfirmViewsE2ETest):
+    pass
@@ -0,0 +1,53 @@
+import json
+from unittest.mock import patch
+
+from django.urls import reverse
+from faker import Faker
+from rest_framework import status
+
+from confirm.choices import TypeConfirm
+from confirm.models import ConfirmEmail
+from tests.utils import BaseE2ETest, create_base_user, FakePhoneSendThrottleMixin
+
+faker = Faker()
+
+
+@patch('confirm.bulk.task_send_confirm_code_phone_many')
+@patch('confirm.bulk.task_send_confirm_code_email_many')
+class BulkCreateConfirmE2ETest(FakePhoneSendThrottleMixin, BaseE2ETest):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('confirm:bulk_create_confirm')
+
+    def post(self, body: str, content_type: str):
+        response_data = self.client.generic('POST', self.url, body, content_type=content_type)
+        self.assertEqual(response_data.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_data['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response_data.streaming_content).decode().splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_success(self, task_email, task_phone):
+        self.set_bearer_credentials(create_base_user(email=faker.email(), is_staff=True))
+        emails = [faker.unique.email() for _ in range(3)]
+
+        # JSON Lines
+        body = '\n'.join(json.dumps({'email': email, 'type_confirm': TypeConfirm.REGISTRATION}) for email in emails)
+        results = self.post(body, 'application/x-ndjson')
+        self.assertEqual([result['email'] for result in results], emails)
+        self.assertEqual(ConfirmEmail.objects.filter(email__in=emails).count(), 3)
+
+        # CSV
+        email = faker.unique.email()
+        results = self.post(f'email,type_confirm\n{email},{TypeConfirm.REGISTRATION}\n', 'text/csv')
+        self.assertEqual(results[0]['status'], status.HTTP_201_CREATED)
+        self.assertTrue(ConfirmEmail.objects.filter(email=email).exists())
+
+    def test_fail(self, task_email, task_phone):
+        # Без авторизации
+        response_data = self.client.post(self.url, '', content_type='text/csv')
+        self.unauthorized_response(response_data)
+
+        # Пользователь не сотрудник
+        self.set_bearer_credentials(create_base_user(email=faker.email()))
+        response_data = self.client.post(self.url, '', content_type='text/csv')
+        self.assertEqual(response_data.status_code, status.HTTP_403_FORBIDDEN)
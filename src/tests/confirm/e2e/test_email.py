@@ -10,7 +10,7 @@ from rest_framework import status
 import exceptions
 from confirm.choices import TypeConfirm, ObjConfirm
 from tests.confirm.factories import ConfirmEmailFactory
-from tests.utils import BaseE2ETest, create_base_user
+from tests.utils import BaseE2ETest, create_base_user, RedisConfirmStorageMixin
 
 faker = Faker()
 
@@ -129,3 +129,11 @@ class ConfirmEmailE2ETest(BaseE2ETest):
         request_data = self.get_request_data(confirm_obj.secret_code, confirm_obj.confirm_code)
         response_data = self.client.post(self.url, request_data)
         self.conflict_response(response_data, exceptions.ConfirmCodeExpired)
+
+
+class CreateConfirmEmailRedisE2ETest(RedisConfirmStorageMixin, CreateConfirmEmailE2ETest):
+    pass
+
+
+class ConfirmEmailRedisE2ETest(RedisConfirmStorageMixin, ConfirmEmailE2ETest):
+    pass
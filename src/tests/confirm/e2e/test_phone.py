@@ -9,14 +9,18 @@ from rest_framework import status
 
 import exceptions
 from confirm.choices import TypeConfirm, ObjConfirm, PhoneRegion
+from confirm.throttle import get_phone_send_throttle
 from tests.confirm.factories import ConfirmPhoneFactory
-from tests.utils import BaseE2ETest, create_base_user, rand_mobile_phone
+from tests.utils import (
+    BaseE2ETest, create_base_user, rand_mobile_phone, RedisConfirmStorageMixin, FakePhoneSendThrottleMixin
+)
 
 faker = Faker()
 
 
-class CreateConfirmPhoneE2ETest(BaseE2ETest):
+class CreateConfirmPhoneE2ETest(FakePhoneSendThrottleMixin, BaseE2ETest):
     def setUp(self):
+        super().setUp()
         self.url = reverse('confirm:create_confirm_phone')
 
     @staticmethod
@@ -88,6 +92,7 @@ class CreateConfirmPhoneE2ETest(BaseE2ETest):
         # n-е кол-во секунд для следующей отправки
         phone = rand_mobile_phone()
         confirm_obj = ConfirmPhoneFactory(phone=phone['phone'])
+        get_phone_send_throttle().sync(confirm_obj)
         request_data = self.get_request_data(TypeConfirm.REGISTRATION, phone['number'])
         response_data = self.client.post(self.url, request_data)
         self.assertEqual(response_data.status_code, status.HTTP_409_CONFLICT)
@@ -99,7 +104,8 @@ class CreateConfirmPhoneE2ETest(BaseE2ETest):
 
         # Невозможно отправить код подтверждения, так как количество попыток истекло
         phone = rand_mobile_phone()
-        ConfirmPhoneFactory(phone=phone['phone'], count_send=settings.PHONE_CONFIRM_CODE_COUNT_SEND)
+        confirm_obj = ConfirmPhoneFactory(phone=phone['phone'], count_send=settings.PHONE_CONFIRM_CODE_COUNT_SEND)
+        get_phone_send_throttle().sync(confirm_obj)
         request_data = self.get_request_data(TypeConfirm.REGISTRATION, phone['number'])
         response_data = self.client.post(self.url, request_data)
         self.assertEqual(response_data.status_code, status.HTTP_409_CONFLICT)
@@ -160,3 +166,11 @@ class ConfirmPhoneE2ETest(BaseE2ETest):
         request_data = self.get_request_data(confirm_obj.secret_code, confirm_obj.confirm_code)
         response_data = self.client.post(self.url, request_data)
         self.conflict_response(response_data, exceptions.ConfirmCodeExpired)
+
+
+class CreateConfirmPhoneRedisE2ETest(RedisConfirmStorageMixin, CreateConfirmPhoneE2ETest):
+    pass
+
+
+class ConfirmPhoneRedisE2ETest(RedisConfirmStorageMixin, ConfirmPhoneE2ETest):
+    pass
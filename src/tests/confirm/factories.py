@@ -7,6 +7,7 @@ from faker import Faker
 
 from confirm.choices import TypeConfirm
 from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.storages import get_storage
 from confirm.utils import generate_confirm_code
 from tests.utils import rand_mobile_phone
 
@@ -20,6 +21,10 @@ class BaseConfirmFactory(DjangoModelFactory):
     type_confirm = TypeConfirm.REGISTRATION
     created_at = factory.LazyAttribute(lambda _: timezone.now())
 
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        return get_storage().save(model_class(*args, **kwargs))
+
 
 class ConfirmEmailFactory(BaseConfirmFactory):
     class Meta:
@@ -130,3 +130,22 @@ class ConfirmEmailHandlersTest(TestCase):
         ttl_hours = settings.EMAIL_VER_TTL_HOURS
         confirm_obj = ConfirmEmailFactory(created_at=timezone.now() - timezone.timedelta(hours=ttl_hours + 1))
         self.check_fail(confirm_obj.secret_code, confirm_obj.confirm_code, exceptions.ConfirmCodeExpired)
+
+    def test_confirm_email_one_query(self):
+        """
+        Подтверждение, истечение и отсутствие объекта определяются одним запросом
+        """
+
+        confirm_obj = ConfirmEmailFactory()
+        with self.assertNumQueries(1):
+            handlers.confirm_obj(confirm_obj.secret_code, confirm_obj.confirm_code, ObjConfirm.EMAIL)
+
+        # Повторное подтверждение того же кода не проходит
+        with self.assertNumQueries(1), self.assertRaises(exceptions.ConfirmObjNotFound):
+            handlers.confirm_obj(confirm_obj.secret_code, confirm_obj.confirm_code, ObjConfirm.EMAIL)
+
+        ttl_hours = settings.EMAIL_VER_TTL_HOURS
+        confirm_obj = ConfirmEmailFactory(created_at=timezone.now() - timezone.timedelta(hours=ttl_hours + 1))
+        with self.assertNumQueries(1), self.assertRaises(exceptions.ConfirmCodeExpired):
+            handlers.confirm_obj(confirm_obj.secret_code, confirm_obj.confirm_code, ObjConfirm.EMAIL)
+        self.assertFalse(ConfirmEmail.objects.get(id=confirm_obj.id).confirmed)
@@ -8,14 +8,15 @@ from faker import Faker
 import exceptions
 from confirm import handlers
 from confirm.models import ConfirmPhone
+from confirm.throttle import get_phone_send_throttle
 from confirm.choices import TypeConfirm, ObjConfirm, PhoneRegion
 from tests.confirm.factories import ConfirmPhoneFactory
-from tests.utils import create_base_user, rand_mobile_phone
+from tests.utils import create_base_user, rand_mobile_phone, FakePhoneSendThrottleMixin
 
 faker = Faker()
 
 
-class CreateConfirmPhoneHandlersTest(TestCase):
+class CreateConfirmPhoneHandlersTest(FakePhoneSendThrottleMixin, TestCase):
     def check_success(self, number_phone: str, type_confirm: TypeConfirm):
         """
         Проверка создания/обновления кода подтверждения телефона с использованием всех попыток
@@ -50,6 +51,8 @@ class CreateConfirmPhoneHandlersTest(TestCase):
             wait_second = timezone.timedelta(seconds=confirm_phone_db.sec_resend)
             wait_next_sending = confirm_phone_db.created_at - wait_second
             ConfirmPhone.objects.filter(id=confirm_phone_db.id).update(created_at=wait_next_sending)
+            confirm_phone_db.created_at = wait_next_sending
+            get_phone_send_throttle().sync(confirm_phone_db)
 
     def check_fail(self, phone, type_confirm, exception):
         with self.assertRaises(exception):
@@ -82,6 +85,7 @@ class CreateConfirmPhoneHandlersTest(TestCase):
         wait_next_sending = confirm_obj.created_at - wait_second
         confirm_obj.created_at = wait_next_sending
         ConfirmPhone.objects.filter(id=confirm_obj.id).update(created_at=wait_next_sending)
+        get_phone_send_throttle().sync(confirm_obj)
         self.check_success(phone['number'], type_confirm)
 
     def test_fail(self):
@@ -112,7 +116,9 @@ class CreateConfirmPhoneHandlersTest(TestCase):
         phone = rand_mobile_phone()
         type_confirm = TypeConfirm.REGISTRATION
         confirm_obj = ConfirmPhoneFactory(phone=phone['phone'], type_confirm=type_confirm)
-        self.check_fail(phone['number'], type_confirm, exceptions.ConfirmPhoneWaitBeforeSending)
+        get_phone_send_throttle().sync(confirm_obj)
+        with self.assertNumQueries(1):
+            self.check_fail(phone['number'], type_confirm, exceptions.ConfirmPhoneWaitBeforeSending)
         # Объект подтверждения не должен обновиться
         confirm_obj = ConfirmPhone.objects.filter(
             id=confirm_obj.id, secret_code=confirm_obj.secret_code, confirm_code=confirm_obj.confirm_code
@@ -126,7 +132,9 @@ class CreateConfirmPhoneHandlersTest(TestCase):
         confirm_obj = ConfirmPhoneFactory(
             phone=phone['phone'], type_confirm=type_confirm, count_send=settings.PHONE_CONFIRM_CODE_COUNT_SEND
         )
-        self.check_fail(phone['number'], type_confirm, exceptions.ConfirmPhoneExcMaxCountSend)
+        get_phone_send_throttle().sync(confirm_obj)
+        with self.assertNumQueries(1):
+            self.check_fail(phone['number'], type_confirm, exceptions.ConfirmPhoneExcMaxCountSend)
         # Объект подтверждения не должен обновиться
         confirm_obj = ConfirmPhone.objects.filter(
             id=confirm_obj.id,
@@ -180,3 +188,22 @@ class ConfirmPhoneHandlersTest(TestCase):
         ttl_hours = settings.PHONE_VER_TTL_HOURS
         confirm_obj = ConfirmPhoneFactory(created_at=timezone.now() - timezone.timedelta(hours=ttl_hours + 1))
         self.check_fail(confirm_obj.secret_code, confirm_obj.confirm_code, exceptions.ConfirmCodeExpired)
+
+    def test_confirm_phone_one_query(self):
+        """
+        Подтверждение, истечение и отсутствие объекта определяются одним запросом
+        """
+
+        confirm_obj = ConfirmPhoneFactory()
+        with self.assertNumQueries(1):
+            handlers.confirm_obj(confirm_obj.secret_code, confirm_obj.confirm_code, ObjConfirm.PHONE)
+
+        # Повторное подтверждение того же кода не проходит
+        with self.assertNumQueries(1), self.assertRaises(exceptions.ConfirmObjNotFound):
+            handlers.confirm_obj(confirm_obj.secret_code, confirm_obj.confirm_code, ObjConfirm.PHONE)
+
+        ttl_hours = settings.PHONE_VER_TTL_HOURS
+        confirm_obj = ConfirmPhoneFactory(created_at=timezone.now() - timezone.timedelta(hours=ttl_hours + 1))
+        with self.assertNumQueries(1), self.assertRaises(exceptions.ConfirmCodeExpired):
+            handlers.confirm_obj(confirm_obj.secret_code, confirm_obj.confirm_code, ObjConfirm.PHONE)
+        self.assertFalse(ConfirmPhone.objects.get(id=confirm_obj.id).confirmed)
@@ -0,0 +1,139 @@
+import io
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from faker import Faker
+from rest_framework import status
+
+import exceptions
+from confirm import bulk
+from confirm.choices import TypeConfirm, PhoneRegion, BulkFileFormat
+from confirm.models import ConfirmEmail, ConfirmPhone
+from tests.utils import create_base_user, rand_mobile_phone, FakePhoneSendThrottleMixin
+
+faker = Faker()
+
+
+@patch('confirm.bulk.task_send_confirm_code_phone_many')
+@patch('confirm.bulk.task_send_confirm_code_email_many')
+class BulkCreateConfirmTest(FakePhoneSendThrottleMixin, TestCase):
+    def test_success(self, task_email, task_phone):
+        emails = [faker.unique.email() for _ in range(5)]
+        phones = [rand_mobile_phone() for _ in range(3)]
+        rows = [{'email': email.upper(), 'type_confirm': TypeConfirm.REGISTRATION} for email in emails]
+        rows += [
+            {'phone': phone['number'], 'region': PhoneRegion.RUSSIAN, 'type_confirm': TypeConfirm.REGISTRATION}
+            for phone in phones
+        ]
+
+        results = list(bulk.create_confirm(rows, chunk_size=3))
+
+        self.assertEqual([result['row'] for result in results], list(range(1, len(rows) + 1)))
+        self.assertTrue(all(result['status'] == status.HTTP_201_CREATED for result in results))
+        self.assertEqual([result['email'] for result in results[:5]], emails)
+        self.assertEqual(ConfirmEmail.objects.filter(email__in=emails).count(), 5)
+        self.assertEqual(ConfirmPhone.objects.filter(phone__in=[phone['phone'] for phone in phones]).count(), 3)
+
+        # Уведомления отправляются одной задачей на пачку
+        self.assertEqual(task_email.delay.call_count, 2)
+        self.assertEqual(task_phone.delay.call_count, 2)
+
+        # Повторная загрузка обновляет объекты подтверждения email
+        secret_codes = {result['email']: result['secret_code'] for result in results[:5]}
+        results = list(bulk.create_confirm(rows[:5]))
+        for result in results:
+            confirm_email = ConfirmEmail.objects.get(email=result['email'])
+            self.assertEqual(confirm_email.secret_code, result['secret_code'])
+            self.assertNotEqual(confirm_email.secret_code, secret_codes[result['email']])
+
+    def test_chunk_queries(self, task_email, task_phone):
+        rows = [{'email': faker.unique.email(), 'type_confirm': TypeConfirm.REGISTRATION} for _ in range(10)]
+
+        # Проверка пользователей и запись объектов подтверждения - по одному запросу на пачку
+        with self.assertNumQueries(2):
+            list(bulk.create_confirm(rows, chunk_size=10))
+
+    def test_fail(self, task_email, task_phone):
+        email = faker.email()
+        create_base_user(email=email)
+        phone = rand_mobile_phone()
+
+        rows = [
+            {'email': email, 'type_confirm': TypeConfirm.REGISTRATION},
+            {'email': faker.email(), 'type_confirm': TypeConfirm.RESET_PASS},
+            {'email': 'not email', 'type_confirm': TypeConfirm.REGISTRATION},
+            {'phone': '3453455', 'region': PhoneRegion.RUSSIAN, 'type_confirm': TypeConfirm.REGISTRATION},
+            {'phone': phone['number'], 'region': PhoneRegion.RUSSIAN, 'type_confirm': TypeConfirm.REGISTRATION},
+            {'phone': phone['number'], 'region': PhoneRegion.RUSSIAN, 'type_confirm': TypeConfirm.REGISTRATION},
+            'not json',
+        ]
+        results = list(bulk.create_confirm(rows))
+
+        self.assertEqual(results[0]['code'], exceptions.UserAlreadyExist().code)
+        self.assertEqual(results[1]['code'], exceptions.UserNotFound().code)
+        self.assertEqual(results[2]['status'], status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', results[2]['validation_errors'])
+        self.assertEqual(results[3]['code'], exceptions.IncorrectPhone().code)
+        self.assertEqual(results[4]['status'], status.HTTP_201_CREATED)
+        self.assertEqual(results[5]['code'], exceptions.DuplicateInBatch().code)
+        self.assertEqual(results[6]['status'], status.HTTP_400_BAD_REQUEST)
+
+        # Ограничение повторной отправки на номер действует и для массовой загрузки
+        results = list(bulk.create_confirm(rows[4:5]))
+        self.assertEqual(results[0]['code'], exceptions.ConfirmPhoneWaitBeforeSending(0).code)
+        self.assertIn('wait_seconds', results[0]['payload_data'])
+
+    def test_chunk_failed(self, task_email, task_phone):
+        """
+        Ошибка пачки записывается в результаты ее строк, следующие пачки обрабатываются
+        """
+
+        rows = [{'email': faker.unique.email(), 'type_confirm': TypeConfirm.REGISTRATION} for _ in range(3)]
+        create_confirm_chunk = bulk.create_confirm_chunk
+
+        def fail_first_chunk(chunk):
+            if chunk[0][0] == 1:
+                raise ConnectionError
+            return create_confirm_chunk(chunk)
+
+        with patch('confirm.bulk.create_confirm_chunk', side_effect=fail_first_chunk):
+            results = list(bulk.create_confirm(rows, chunk_size=2))
+
+        self.assertEqual([result['row'] for result in results], [1, 2, 3])
+        self.assertEqual([result['status'] for result in results], [
+            status.HTTP_503_SERVICE_UNAVAILABLE, status.HTTP_503_SERVICE_UNAVAILABLE, status.HTTP_201_CREATED
+        ])
+        self.assertEqual(results[0]['code'], exceptions.BulkChunkFailed().code)
+
+    def test_file_invalid(self, task_email, task_phone):
+        email = faker.email()
+        lines = [b'email,type_confirm\n', f'{email},{TypeConfirm.REGISTRATION}\n'.encode(), b'\xff\n']
+
+        results = list(bulk.create_confirm(bulk.read_rows(lines, BulkFileFormat.CSV), chunk_size=1))
+
+        self.assertEqual(results[0]['status'], status.HTTP_201_CREATED)
+        self.assertEqual(results[1]['row'], 2)
+        self.assertEqual(results[1]['code'], exceptions.BulkFileInvalid().code)
+
+    def test_read_rows(self, task_email, task_phone):
+        email = faker.email()
+        lines = ['email,phone,region,type_confirm\n', f'{email},,,{TypeConfirm.REGISTRATION}\n']
+        rows = list(bulk.read_rows(lines, BulkFileFormat.CSV))
+        self.assertEqual(rows[0]['email'], email)
+
+        lines = [json.dumps({'email': email}).encode() + b'\n', b'\n', b'{bad\n']
+        rows = list(bulk.read_rows(lines, BulkFileFormat.JSONL))
+        self.assertEqual(rows, [{'email': email}, '{bad'])
+
+    def test_command(self, task_email, task_phone):
+        stdout = io.StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as file:
+            file.write(json.dumps({'email': faker.email(), 'type_confirm': TypeConfirm.REGISTRATION}) + '\n')
+            file.flush()
+            call_command('bulk_create_confirm', file.name, stdout=stdout)
+
+        result = json.loads(stdout.getvalue())
+        self.assertEqual(result['status'], status.HTTP_201_CREATED)
@@ -0,0 +1,63 @@
+import uuid
+
+from django.test import TestCase
+
+import exceptions
+from confirm import identity_map
+from confirm.choices import TypeConfirm
+from confirm.models import ConfirmEmail, ConfirmPhone
+from tests.confirm.factories import ConfirmEmailFactory, ConfirmPhoneFactory
+
+
+class GetConfirmedTest(TestCase):
+    def check_success(self, factory, model):
+        confirm_obj = factory(confirmed=True)
+
+        with self.assertNumQueries(1):
+            confirm_obj_db = model.objects.get_confirmed(confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+        self.assertEqual(confirm_obj_db.id, confirm_obj.id)
+
+    def check_fail(self, factory, model):
+        # Объект не найден
+        with self.assertNumQueries(1), self.assertRaises(exceptions.ConfirmObjNotFound):
+            model.objects.get_confirmed(uuid.uuid4(), TypeConfirm.REGISTRATION)
+
+        # Объект не подтвержден
+        confirm_obj = factory(confirmed=False)
+        with self.assertNumQueries(1), self.assertRaises(exceptions.ConfirmObjNotConfirmed):
+            model.objects.get_confirmed(confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+
+    def check_identity_map(self, factory, model):
+        confirm_obj = factory(confirmed=True)
+
+        token = identity_map.activate()
+        try:
+            with self.assertNumQueries(1):
+                first = model.objects.get_confirmed(confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+                second = model.objects.get_confirmed(confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+            self.assertIs(first, second)
+
+            # Удаленный объект не переиспользуется
+            first.delete()
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                model.objects.get_confirmed(confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+        finally:
+            identity_map.deactivate(token)
+
+        # Вне запроса объекты не запоминаются
+        confirm_obj = factory(confirmed=True)
+        with self.assertNumQueries(2):
+            model.objects.get_confirmed(confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+            model.objects.get_confirmed(confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+
+    def test_success(self):
+        self.check_success(ConfirmEmailFactory, ConfirmEmail)
+        self.check_success(ConfirmPhoneFactory, ConfirmPhone)
+
+    def test_fail(self):
+        self.check_fail(ConfirmEmailFactory, ConfirmEmail)
+        self.check_fail(ConfirmPhoneFactory, ConfirmPhone)
+
+    def test_identity_map(self):
+        self.check_identity_map(ConfirmEmailFactory, ConfirmEmail)
+        self.check_identity_map(ConfirmPhoneFactory, ConfirmPhone)
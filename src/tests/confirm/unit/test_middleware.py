@@ -0,0 +1,54 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from confirm import identity_map
+from confirm.middleware import ConfirmIdentityMapMiddleware
+
+
+class ConfirmIdentityMapMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.maps = []
+
+    def store(self):
+        identity_map.store('key', self.request)
+        self.maps.append(identity_map._identity_map.get())
+
+    def test_sync(self):
+        def get_response(request):
+            self.store()
+            return HttpResponse()
+
+        middleware = ConfirmIdentityMapMiddleware(get_response)
+        self.assertFalse(asyncio.iscoroutinefunction(middleware))
+
+        middleware(self.request)
+        middleware(self.request)
+
+        self.assertEqual(self.maps, [{'key': self.request}] * 2)
+        self.assertIsNot(self.maps[0], self.maps[1])
+        self.assertIsNone(identity_map._identity_map.get())
+
+    def test_async(self):
+        """
+        Асинхронная цепочка обрабатывается без переключения в поток, карта сбрасывается после запроса
+        """
+
+        async def get_response(request):
+            await asyncio.sleep(0)
+            self.store()
+            return HttpResponse()
+
+        middleware = ConfirmIdentityMapMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+
+        async def handle():
+            await asyncio.gather(middleware(self.request), middleware(self.request))
+            return identity_map._identity_map.get()
+
+        self.assertIsNone(async_to_sync(handle)())
+        self.assertEqual(self.maps, [{'key': self.request}] * 2)
+        self.assertIsNot(self.maps[0], self.maps[1])
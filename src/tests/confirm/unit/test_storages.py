@@ -0,0 +1,125 @@
+import uuid
+
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+from faker import Faker
+
+import exceptions
+from confirm import utils
+from confirm.choices import TypeConfirm
+from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.storages import get_storage
+from confirm.storages.orm import OrmConfirmStorage
+from tests.confirm.factories import ConfirmEmailFactory, ConfirmPhoneFactory
+from tests.utils import RedisConfirmStorageMixin, rand_mobile_phone, FakeRedisConfirmStorage
+
+faker = Faker()
+
+
+class ConfirmStorageTestMixin:
+    """
+    Общие тесты хранилищ объектов подтверждения
+    """
+
+    storage_class = None
+
+    def setUp(self):
+        super().setUp()
+        self.storage = get_storage()
+        self.assertIsInstance(self.storage, self.storage_class)
+
+    def test_update_or_create(self):
+        email = faker.email()
+        confirm_data = utils.generate_confirm_data(TypeConfirm.REGISTRATION)
+        confirm_obj = self.storage.update_or_create(ConfirmEmail, email, confirm_data)
+        self.assertIsInstance(confirm_obj, ConfirmEmail)
+        self.assertEqual(confirm_obj.secret_code, confirm_data['secret_code'])
+
+        # Повторный вызов заменяет секретный код, старый код больше не действует
+        new_confirm_data = utils.generate_confirm_data(TypeConfirm.REGISTRATION)
+        confirm_obj = self.storage.update_or_create(ConfirmEmail, email, new_confirm_data)
+        self.assertEqual(confirm_obj.secret_code, new_confirm_data['secret_code'])
+        with self.assertRaises(exceptions.ConfirmObjNotFound):
+            self.storage.confirm(ConfirmEmail, confirm_data['secret_code'], confirm_data['confirm_code'])
+        self.storage.confirm(ConfirmEmail, new_confirm_data['secret_code'], new_confirm_data['confirm_code'])
+
+    def test_confirm(self):
+        for factory, model, ttl_hours in [
+            (ConfirmEmailFactory, ConfirmEmail, settings.EMAIL_VER_TTL_HOURS),
+            (ConfirmPhoneFactory, ConfirmPhone, settings.PHONE_VER_TTL_HOURS),
+        ]:
+            confirm_obj = factory()
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.confirm(model, confirm_obj.secret_code, 'A' * settings.LENGTH_CONFIRM_CODE)
+
+            self.storage.confirm(model, confirm_obj.secret_code, confirm_obj.confirm_code)
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.confirm(model, confirm_obj.secret_code, confirm_obj.confirm_code)
+
+            confirm_obj = factory(created_at=timezone.now() - timezone.timedelta(hours=ttl_hours + 1))
+            with self.assertRaises(exceptions.ConfirmCodeExpired):
+                self.storage.confirm(model, confirm_obj.secret_code, confirm_obj.confirm_code)
+
+    def test_get_confirmed(self):
+        for factory, model in [(ConfirmEmailFactory, ConfirmEmail), (ConfirmPhoneFactory, ConfirmPhone)]:
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.get_confirmed(model, uuid.uuid4(), TypeConfirm.REGISTRATION)
+
+            confirm_obj = factory()
+            with self.assertRaises(exceptions.ConfirmObjNotConfirmed):
+                self.storage.get_confirmed(model, confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+
+            self.storage.confirm(model, confirm_obj.secret_code, confirm_obj.confirm_code)
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.get_confirmed(model, confirm_obj.secret_code, TypeConfirm.CHANGE)
+
+            confirm_obj_db = self.storage.get_confirmed(model, confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+            self.assertIsInstance(confirm_obj_db, model)
+            self.assertTrue(confirm_obj_db.confirmed)
+            self.assertEqual(confirm_obj_db.secret_code, confirm_obj.secret_code)
+
+            self.storage.delete(confirm_obj_db)
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.get_confirmed(model, confirm_obj.secret_code, TypeConfirm.REGISTRATION)
+
+    def test_consume_confirmed(self):
+        for factory, model in [(ConfirmEmailFactory, ConfirmEmail), (ConfirmPhoneFactory, ConfirmPhone)]:
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.consume_confirmed(model, uuid.uuid4(), TypeConfirm.CHANGE)
+
+            confirm_obj = factory(type_confirm=TypeConfirm.CHANGE)
+            with self.assertRaises(exceptions.ConfirmObjNotConfirmed):
+                self.storage.consume_confirmed(model, confirm_obj.secret_code, TypeConfirm.CHANGE)
+
+            self.storage.confirm(model, confirm_obj.secret_code, confirm_obj.confirm_code)
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.consume_confirmed(model, confirm_obj.secret_code, TypeConfirm.RESET_PASS)
+
+            consumed_obj = self.storage.consume_confirmed(model, confirm_obj.secret_code, TypeConfirm.CHANGE)
+            self.assertIsInstance(consumed_obj, model)
+            self.assertTrue(consumed_obj.confirmed)
+            self.assertEqual(consumed_obj.secret_code, confirm_obj.secret_code)
+            self.assertEqual(
+                getattr(consumed_obj, model.identifier_field), getattr(confirm_obj, model.identifier_field)
+            )
+
+            # Объект подтверждения используется только один раз
+            with self.assertRaises(exceptions.ConfirmObjNotFound):
+                self.storage.consume_confirmed(model, confirm_obj.secret_code, TypeConfirm.CHANGE)
+
+
+class OrmConfirmStorageTest(ConfirmStorageTestMixin, TestCase):
+    storage_class = OrmConfirmStorage
+
+
+class RedisConfirmStorageTest(ConfirmStorageTestMixin, RedisConfirmStorageMixin, TestCase):
+    storage_class = FakeRedisConfirmStorage
+
+    def test_expire(self):
+        confirm_obj = ConfirmPhoneFactory()
+        key = self.storage.obj_prefix(ConfirmPhone) + str(confirm_obj.phone)
+        self.assertEqual(self.storage.redis.ttl(key), self.storage.expire_seconds(ConfirmPhone))
+        self.assertGreaterEqual(
+            self.storage.expire_seconds(ConfirmPhone), settings.PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS
+        )
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.tasks import task_purge_expired_confirmations
+from tests.confirm.factories import ConfirmEmailFactory, ConfirmPhoneFactory
+
+
+class PurgeExpiredConfirmationsTaskTest(TestCase):
+    def setUp(self):
+        email_expired_at = timezone.now() - timezone.timedelta(hours=settings.EMAIL_VER_TTL_HOURS + 1)
+        phone_expired_at = timezone.now() - timezone.timedelta(hours=settings.PHONE_VER_TTL_HOURS + 1)
+
+        self.expired_ids = {
+            ConfirmEmail: [ConfirmEmailFactory(created_at=email_expired_at).id for _ in range(5)],
+            ConfirmPhone: [ConfirmPhoneFactory(created_at=phone_expired_at, confirmed=True).id for _ in range(3)],
+        }
+        self.actual_ids = {
+            ConfirmEmail: [ConfirmEmailFactory().id],
+            ConfirmPhone: [ConfirmPhoneFactory(confirmed=True).id],
+        }
+
+    @override_settings(CONFIRM_PURGE_BATCH_SIZE=2)
+    def test_success(self):
+        result = task_purge_expired_confirmations()
+        self.assertEqual(result['purged'], {'confirmemail': 5, 'confirmphone': 3})
+
+        for model in (ConfirmEmail, ConfirmPhone):
+            self.assertFalse(model.objects.filter(id__in=self.expired_ids[model]).exists())
+            self.assertEqual(model.objects.filter(id__in=self.actual_ids[model]).count(), 1)
+
+    @override_settings(CONFIRM_PURGE_BATCH_SIZE=2)
+    def test_batch_query(self):
+        # Одна пачка - один запрос на удаление
+        with self.assertNumQueries(1):
+            self.assertEqual(ConfirmEmail.objects.purge_expired(2), 2)
+
+    @override_settings(CONFIRM_PURGE_TIME_BUDGET_SECONDS=0)
+    def test_time_budget(self):
+        result = task_purge_expired_confirmations()
+        self.assertEqual(result['purged'], {'confirmemail': 0, 'confirmphone': 0})
+        self.assertEqual(ConfirmEmail.objects.count(), 6)
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+
+import exceptions
+from confirm.throttle import get_phone_send_throttle
+from tests.utils import FakePhoneSendThrottleMixin, rand_mobile_phone
+
+
+class PhoneSendThrottleTest(FakePhoneSendThrottleMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.throttle = get_phone_send_throttle()
+        self.phone = rand_mobile_phone()['phone']
+        self.now = timezone.now()
+
+    def hit(self, passed_seconds: int) -> int:
+        return self.throttle.hit(self.phone, self.now + timezone.timedelta(seconds=passed_seconds))
+
+    def test_success(self):
+        """
+        Отправки с ожиданием PHONE_CONFIRM_STEP_WAITING_SECONDS * номер отправки между ними
+        """
+
+        passed_seconds = 0
+        for number_send in range(1, settings.PHONE_CONFIRM_CODE_COUNT_SEND + 1):
+            self.assertEqual(self.hit(passed_seconds), number_send)
+            passed_seconds += settings.PHONE_CONFIRM_STEP_WAITING_SECONDS * number_send
+
+        # Период сброса счетчика прошел
+        passed_seconds += settings.PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS
+        self.assertEqual(self.hit(passed_seconds), 1)
+
+    def test_fail(self):
+        self.hit(0)
+
+        # Нужно подождать перед повторной отправкой
+        with self.assertRaises(exceptions.ConfirmPhoneWaitBeforeSending) as e:
+            self.hit(10)
+        self.assertEqual(e.exception.payload_data, {'wait_seconds': settings.PHONE_CONFIRM_STEP_WAITING_SECONDS - 10})
+
+        # Потрачены все попытки
+        passed_seconds = 0
+        for number_send in range(1, settings.PHONE_CONFIRM_CODE_COUNT_SEND):
+            passed_seconds += settings.PHONE_CONFIRM_STEP_WAITING_SECONDS * number_send
+            self.hit(passed_seconds)
+
+        with self.assertRaises(exceptions.ConfirmPhoneExcMaxCountSend) as e:
+            self.hit(passed_seconds + 5)
+        self.assertEqual(
+            e.exception.payload_data, {'wait_seconds': settings.PHONE_CONFIRM_RESET_COUNT_SEND_SECONDS - 5}
+        )
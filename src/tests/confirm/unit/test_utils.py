@@ -23,6 +23,44 @@ class ConfirmUtilsTest(TestCase):
         self.assertIsInstance(confirm_code, str)
         self.assertEqual(len(confirm_code), settings.LENGTH_CONFIRM_CODE)
 
+    def test_generate_many(self):
+        """
+        Пачка кодов нужной длины из символов алфавита
+        """
+
+        confirm_codes = utils.confirm_code_generator.generate_many(1000)
+
+        self.assertEqual(len(confirm_codes), 1000)
+        for confirm_code in confirm_codes:
+            self.assertEqual(len(confirm_code), settings.LENGTH_CONFIRM_CODE)
+            self.assertTrue(set(confirm_code) <= set(utils.CONFIRM_CODE_ALPHABET))
+
+    def test_generate_many_without_bias(self):
+        """
+        Байты за границей кратной длине алфавита отбрасываются, каждый символ получает одинаковое число байтов
+        """
+
+        generator = utils.ConfirmCodeGenerator(utils.CONFIRM_CODE_ALPHABET)
+        accepted = bytes(range(256)).translate(generator.table, generator.rejected).decode()
+
+        self.assertEqual(generator.limit, 252)
+        for char in utils.CONFIRM_CODE_ALPHABET:
+            self.assertEqual(accepted.count(char), 7)
+
+    def test_generate_many_reset(self):
+        """
+        После сброса буфера (как в дочернем процессе после fork) коды генерируются заново
+        """
+
+        generator = utils.ConfirmCodeGenerator(utils.CONFIRM_CODE_ALPHABET, block_size=64)
+        generator.generate_many(1, length=4)
+        self.assertTrue(generator.buffer)
+
+        generator.reset()
+
+        self.assertEqual(generator.buffer, b'')
+        self.assertEqual(len(generator.generate_many(10, length=8)), 10)
+
     def test_generate_confirm_data(self):
         """
         Проверка генерации данных для создания кода подтверждения
@@ -90,6 +128,9 @@ class TypeConfirmIsAvailableForUserTest(TestCase):
 
 
 class NormalizationPhoneNumberTest(TestCase):
+    def setUp(self):
+        utils.parse_phone_number.cache_clear()
+
     def test_success(self):
         phone_number = '9234322345'
         phone = utils.normalization_phone_number(phone_number, PhoneRegion.RUSSIAN)
@@ -99,3 +140,17 @@ class NormalizationPhoneNumberTest(TestCase):
         phone_number = 'daw32332'
         with self.assertRaises(exceptions.IncorrectPhone):
             utils.normalization_phone_number(phone_number, PhoneRegion.RUSSIAN)
+
+    def test_cache(self):
+        phone_number = '9234322345'
+        utils.normalization_phone_number(phone_number, PhoneRegion.RUSSIAN)
+        self.assertEqual(utils.normalization_phone_number(phone_number, 'RU'), f'+7{phone_number}')
+
+        # Некорректный номер тоже кешируется
+        for _ in range(2):
+            with self.assertRaises(exceptions.IncorrectPhone):
+                utils.normalization_phone_number('daw32332', PhoneRegion.RUSSIAN)
+
+        cache_info = utils.parse_phone_number.cache_info()
+        self.assertEqual(cache_info.hits, 2)
+        self.assertEqual(cache_info.misses, 2)
@@ -0,0 +1,28 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Необязательные компоненты на redis отключены, обязательный ограничитель отправок работает на fakeredis.
+# Тесты включают компоненты на fakeredis миксинами из tests.utils
+REDIS_TEST_SETTINGS = {
+    'CONFIRM_PHONE_THROTTLE': 'tests.utils.FakeRedisPhoneSendThrottle',
+    'USER_BLOOM_FILTER': '',
+    'USER_CREDENTIALS_CACHE': '',
+    'USER_CLAIMS_CACHE': '',
+    'USER_LOGIN_LIMITER': '',
+    'USER_TOKEN_DENY_LIST': '',
+}
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Запуск тестов без redis из настроек
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.redis_settings = override_settings(**REDIS_TEST_SETTINGS)
+        self.redis_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.redis_settings.disable()
+        super().teardown_test_environment(**kwargs)
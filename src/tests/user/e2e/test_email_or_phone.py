@@ -7,7 +7,7 @@ from rest_framework import status
 import exceptions
 from confirm.choices import TypeConfirm, ObjConfirm
 from tests.confirm.factories import ConfirmEmailFactory, ConfirmPhoneFactory
-from tests.utils import BaseE2ETest, create_base_user, rand_mobile_phone
+from tests.utils import BaseE2ETest, create_base_user, rand_mobile_phone, RedisConfirmStorageMixin
 
 faker = Faker()
 
@@ -86,3 +86,7 @@ class ChangeEmailOrPhone2ETest(BaseE2ETest):
         create_base_user(phone=confirm_obj.phone)
         request_data = self.get_request_data(confirm_obj.secret_code, ObjConfirm.PHONE)
         self.check_fail(request_data, exceptions.UserAlreadyExist)
+
+
+class ChangeEmailOrPhoneRedisE2ETest(RedisConfirmStorageMixin, ChangeEmailOrPhone2ETest):
+    pass
@@ -1,10 +1,14 @@
+from unittest.mock import patch
+
+from django.test import override_settings
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
 
 import exceptions
 from confirm.choices import PhoneRegion
-from tests.utils import BaseE2ETest, create_base_user, rand_mobile_phone
+from user.credentials import get_credentials
+from tests.utils import BaseE2ETest, FakeLoginAttemptLimiterMixin, create_base_user, rand_mobile_phone
 
 faker = Faker()
 
@@ -27,6 +31,21 @@ class LoginByEmailE2ETest(BaseE2ETest):
         self.assertIn('access', response_data)
         self.assertIn('refresh', response_data)
 
+    @patch('user.hashing.pool.submit', side_effect=exceptions.PasswordHashingBusy)
+    def test_hashing_busy(self, submit):
+        """
+        Очередь хеширования паролей заполнена
+        """
+
+        password = faker.password()
+        email = faker.email()
+        create_base_user(email=email, password=password)
+
+        response_data = self.client.post(self.url, {'email': email, 'password': password})
+
+        self.assertEqual(response_data.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response_data.json()['code'], exceptions.PasswordHashingBusy.__name__)
+
     def test_fail(self):
         # Передан неверный email
         password = faker.password()
@@ -80,3 +99,73 @@ class LoginByPhoneE2ETest(BaseE2ETest):
         request_data = {'phone': phone['number'], 'region': PhoneRegion.RUSSIAN, 'password': 'ADaw323dawd'}
         response_data = self.client.post(self.url, request_data)
         self.conflict_response(response_data, exceptions.UserNotFound)
+
+
+@override_settings(USER_LOGIN_ATTEMPTS_PER_IDENTIFIER=2, USER_LOGIN_LOCKOUT_SECONDS=30)
+class LoginAttemptsE2ETest(FakeLoginAttemptLimiterMixin, BaseE2ETest):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('user:login_by_email')
+
+    def login_from(self, forwarded_for: str):
+        return self.client.post(
+            self.url, {'email': faker.email(), 'password': faker.password()}, HTTP_X_FORWARDED_FOR=forwarded_for
+        )
+
+    @patch('user.handlers.login.get_credentials', wraps=get_credentials)
+    def test_lockout(self, credentials):
+        """
+        Заблокированная попытка входа отклоняется без обращения к БД и проверки пароля
+        """
+
+        password = faker.password()
+        email = faker.email()
+        create_base_user(email=email, password=password)
+        request_data = {'email': email, 'password': password}
+
+        for _ in range(2):
+            response_data = self.client.post(self.url, {'email': email, 'password': faker.password()})
+            self.conflict_response(response_data, exceptions.UserNotFound)
+        self.assertEqual(credentials.call_count, 2)
+
+        response_data = self.client.post(self.url, request_data)
+        self.assertEqual(response_data.status_code, status.HTTP_409_CONFLICT)
+        response_data = response_data.json()
+        self.assertEqual(response_data['code'], exceptions.LoginAttemptsExceeded.__name__)
+        self.assertEqual(response_data['payload_data'], {'wait_seconds': 30})
+        self.assertEqual(credentials.call_count, 2)
+
+    @override_settings(USER_LOGIN_ATTEMPTS_PER_IP=2)
+    def test_ip_lockout(self):
+        """
+        Без USER_CLIENT_IP_HEADER все клиенты за шлюзом делят лимит по REMOTE_ADDR шлюза
+        """
+
+        for client_ip in ('1.1.1.1', '2.2.2.2'):
+            response_data = self.login_from(client_ip)
+            self.conflict_response(response_data, exceptions.UserNotFound)
+
+        response_data = self.login_from('3.3.3.3')
+        self.assertEqual(response_data.json()['code'], exceptions.LoginAttemptsExceeded.__name__)
+
+    @override_settings(
+        USER_LOGIN_ATTEMPTS_PER_IP=2, USER_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR', USER_TRUSTED_PROXY_COUNT=1
+    )
+    def test_ip_lockout_behind_proxy(self):
+        """
+        IP клиента из заголовка доверенного прокси: лимит у каждого клиента свой
+        """
+
+        for _ in range(2):
+            response_data = self.login_from('1.1.1.1')
+            self.conflict_response(response_data, exceptions.UserNotFound)
+
+        response_data = self.login_from('1.1.1.1')
+        self.assertEqual(response_data.json()['code'], exceptions.LoginAttemptsExceeded.__name__)
+
+        # Адрес, подставленный клиентом левее, не влияет на лимит
+        response_data = self.login_from('9.9.9.9, 1.1.1.1')
+        self.assertEqual(response_data.json()['code'], exceptions.LoginAttemptsExceeded.__name__)
+
+        response_data = self.login_from('2.2.2.2')
+        self.conflict_response(response_data, exceptions.UserNotFound)
@@ -7,7 +7,7 @@ from rest_framework import status
 import exceptions
 from confirm.choices import TypeConfirm, ObjConfirm
 from tests.confirm.factories import ConfirmEmailFactory, ConfirmPhoneFactory
-from tests.utils import BaseE2ETest, create_base_user
+from tests.utils import BaseE2ETest, create_base_user, RedisConfirmStorageMixin
 
 faker = Faker()
 
@@ -132,3 +132,32 @@ class ChangePasswordConfirmE2ETest(BaseE2ETest):
         request_data = self.get_request_data(confirm_obj.secret_code, ObjConfirm.PHONE)
         self.check_fail(request_data, exceptions.UserNotFound)
 
+
+class RevokeTokensByResetPasswordE2ETest(BaseE2ETest):
+    def test_revoke(self):
+        """
+        Сброс пароля через объект подтверждения отзывает выданные токены
+        """
+
+        confirm_obj = ConfirmEmailFactory(confirmed=True, type_confirm=TypeConfirm.RESET_PASS)
+        user = create_base_user(email=confirm_obj.email)
+        self.set_bearer_credentials(user)
+
+        new_password = 'ADw323AfwwqqqADW22'
+        with self.captureOnCommitCallbacks(execute=True):
+            response_data = self.client.patch(reverse('user:change_password_by_confirm'), data={
+                'secret_code': confirm_obj.secret_code,
+                'password': new_password,
+                'confirm_password': new_password,
+                'object_confirm': ObjConfirm.EMAIL
+            })
+        self.assertEqual(response_data.status_code, status.HTTP_204_NO_CONTENT)
+
+        response_data = self.client.patch(reverse('user:change_password'), data={
+            'password': new_password, 'confirm_password': new_password
+        })
+        self.assertEqual(response_data.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ChangePasswordConfirmRedisE2ETest(RedisConfirmStorageMixin, ChangePasswordConfirmE2ETest):
+    pass
@@ -9,7 +9,7 @@ import exceptions
 from confirm.choices import TypeConfirm, ObjConfirm
 from confirm.models import ConfirmEmail, ConfirmPhone
 from tests.confirm.factories import ConfirmEmailFactory, ConfirmPhoneFactory
-from tests.utils import BaseE2ETest, create_base_user
+from tests.utils import BaseE2ETest, create_base_user, RedisConfirmStorageMixin
 
 faker = Faker()
 
@@ -108,3 +108,7 @@ class RegistrationE2ETest(BaseE2ETest):
         request_data = self.generate_request_data(confirm_obj.secret_code, ObjConfirm.PHONE)
         response_data = self.client.post(self.url, request_data)
         self.conflict_response(response_data, exceptions.UserAlreadyExist)
+
+
+class RegistrationRedisE2ETest(RedisConfirmStorageMixin, RegistrationE2ETest):
+    pass
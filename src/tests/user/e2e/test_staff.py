@@ -0,0 +1,41 @@
+from django.urls import reverse
+from faker import Faker
+from rest_framework import status
+
+import exceptions
+from tests.utils import BaseE2ETest, create_base_user
+
+faker = Faker()
+
+
+class StaffUsersE2ETest(BaseE2ETest):
+    def setUp(self):
+        self.url = reverse('user:staff_users')
+        self.staff_user = create_base_user(email=faker.unique.email(), is_staff=True)
+        self.set_bearer_credentials(self.staff_user)
+
+    def test_success(self):
+        users = [create_base_user(email=faker.unique.email()) for _ in range(2)]
+
+        response_data = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(response_data.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['id'] for user in response_data.data['results']], [users[1].id, users[0].id])
+        self.assertNotIn('password', response_data.data['results'][0])
+
+        response_data = self.client.get(self.url, {'limit': 2, 'cursor': response_data.data['next']})
+        self.assertEqual(response_data.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['id'] for user in response_data.data['results']], [self.staff_user.id])
+        self.assertIsNone(response_data.data['next'])
+
+    def test_fail(self):
+        response_data = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(response_data.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_data.data['code'], exceptions.InvalidCursor().code)
+
+        response_data = self.client.get(self.url, {'limit': 0})
+        self.assertEqual(response_data.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Список доступен только персоналу
+        self.set_bearer_credentials(create_base_user(email=faker.unique.email()))
+        response_data = self.client.get(self.url)
+        self.assertEqual(response_data.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from faker import Faker
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tests.utils import BaseE2ETest, FakeTokenDenyListMixin, create_base_user
+from user.claims import revoke_user_tokens
+from user.utils import get_jwt_tokens
+
+faker = Faker()
+
+
+class VerifyTokenBatchE2ETest(BaseE2ETest):
+    def setUp(self):
+        self.url = reverse('verify_token_batch')
+
+    def test_success(self):
+        """
+        Результаты в порядке токенов, данные пользователя загружаются один раз
+        """
+
+        user = create_base_user(email=faker.email())
+        tokens = get_jwt_tokens(user)
+
+        expired = AccessToken.for_user(user)
+        expired.set_exp(lifetime=-timedelta(seconds=1))
+
+        request_data = {'tokens': [tokens['access'], 'invalid', str(expired), tokens['refresh'], tokens['access']]}
+        with self.assertNumQueries(2):
+            response_data = self.client.post(self.url, request_data, format='json')
+        self.assertEqual(response_data.status_code, status.HTTP_200_OK)
+
+        results = response_data.json()['results']
+        access = AccessToken(tokens['access'])
+        self.assertEqual(results[0], {'valid': True, 'exp': access['exp'], 'user_id': user.pk})
+        self.assertEqual(results[1], {'valid': False, 'exp': None, 'user_id': None})
+        self.assertFalse(results[2]['valid'])
+        self.assertTrue(results[3]['valid'])
+        self.assertEqual(results[4], results[0])
+
+    def test_fail(self):
+        response_data = self.client.post(self.url, {'tokens': []}, format='json')
+        self.assertEqual(response_data.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response_data = self.client.post(self.url, {'tokens': ['token'] * 101}, format='json')
+        self.assertEqual(response_data.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tokens', response_data.json()['validation_errors'])
+
+
+class RefreshAndLogoutE2ETest(FakeTokenDenyListMixin, BaseE2ETest):
+    def setUp(self):
+        super().setUp()
+        self.user = create_base_user(email=faker.email())
+        self.tokens = get_jwt_tokens(self.user)
+
+    def refresh(self, refresh: str):
+        return self.client.post(reverse('token_refresh'), {'refresh': refresh})
+
+    def assertTokensRevoked(self):
+        response_data = self.client.post(
+            reverse('verify_token_batch'), {'tokens': [self.tokens['access'], self.tokens['refresh']]}, format='json'
+        )
+        self.assertEqual(response_data.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['valid'] for result in response_data.json()['results']], [False, False])
+
+        for token in (self.tokens['access'], self.tokens['refresh']):
+            response_data = self.client.post(reverse('verify_token'), {'token': token})
+            self.assertEqual(response_data.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotation(self):
+        """
+        Refresh токен можно использовать один раз
+        """
+
+        response_data = self.refresh(self.tokens['refresh'])
+        self.assertEqual(response_data.status_code, status.HTTP_200_OK)
+        tokens = response_data.json()
+        self.assertNotEqual(tokens['refresh'], self.tokens['refresh'])
+
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.refresh(tokens['refresh']).status_code, status.HTTP_200_OK)
+
+    def test_revoked_user_tokens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            revoke_user_tokens(self.user.pk)
+
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTokensRevoked()
+
+    def test_logout(self):
+        """
+        Выход отзывает refresh токен и access токен запроса
+        """
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+        response_data = self.client.post(reverse('logout'), {'refresh': self.tokens['refresh']})
+        self.assertEqual(response_data.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response_data = self.client.post(reverse('user:change_password'), {})
+        self.assertEqual(response_data.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials()
+        self.assertTokensRevoked()
+
+    def test_logout_invalid_token(self):
+        response_data = self.client.post(reverse('logout'), {'refresh': self.tokens['access']})
+        self.assertEqual(response_data.status_code, status.HTTP_401_UNAUTHORIZED)
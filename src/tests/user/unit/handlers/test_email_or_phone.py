@@ -94,3 +94,25 @@ class ChangeEmailOrPhoneHandlerTest(TestCase):
         self.check_fail(confirm_obj.secret_code, user, ObjConfirm.PHONE, exceptions.UserAlreadyExist)
         confirm_obj = ConfirmPhone.objects.filter(id=confirm_obj.id)
         self.assertFalse(confirm_obj.exists())
+
+    def test_queries(self):
+        # Удаление объекта подтверждения и обновление email, плюс точка сохранения транзакции
+        confirm_obj = ConfirmEmailFactory(confirmed=True, type_confirm=TypeConfirm.CHANGE)
+        user = create_base_user(email=faker.email())
+        with self.assertNumQueries(4):
+            handlers.change_email_or_phone(confirm_obj.secret_code, user, ObjConfirm.EMAIL)
+
+        self.assertEqual(User.objects.get(id=user.id).email, confirm_obj.email)
+
+    def test_user_already_exist_keeps_user(self):
+        confirm_obj = ConfirmPhoneFactory(confirmed=True, type_confirm=TypeConfirm.CHANGE)
+        create_base_user(phone=confirm_obj.phone)
+        user = create_base_user(phone=rand_mobile_phone()['phone'])
+        old_phone = user.phone
+
+        with self.assertRaises(exceptions.UserAlreadyExist):
+            handlers.change_email_or_phone(confirm_obj.secret_code, user, ObjConfirm.PHONE)
+
+        self.assertEqual(user.phone, old_phone)
+        self.assertEqual(User.objects.get(id=user.id).phone, old_phone)
+        self.assertFalse(ConfirmPhone.objects.filter(id=confirm_obj.id).exists())
@@ -124,3 +124,20 @@ class ChangePasswordConfirmHandlerTest(TestCase):
         confirm_obj = ConfirmPhoneFactory(confirmed=True, type_confirm=TypeConfirm.RESET_PASS)
         self.check_fail(confirm_obj.secret_code, ObjConfirm.PHONE, exceptions.UserNotFound)
 
+    def test_queries(self):
+        # Удаление объекта подтверждения и обновление пароля, плюс точка сохранения транзакции
+        confirm_obj = ConfirmPhoneFactory(confirmed=True, type_confirm=TypeConfirm.RESET_PASS)
+        user = create_base_user(phone=confirm_obj.phone, password=faker.password())
+        new_password = faker.password()
+        with self.assertNumQueries(4):
+            handlers.change_password_by_confirm(confirm_obj.secret_code, new_password, new_password, ObjConfirm.PHONE)
+
+        user_db = User.objects.get(id=user.id)
+        self.assertTrue(check_password(new_password, user_db.password))
+        # Сброс пароля отзывает все выданные токены
+        self.assertEqual(user_db.token_version, user.token_version + 1)
+
+    def test_user_not_found_consumes_confirm_obj(self):
+        confirm_obj = ConfirmEmailFactory(confirmed=True, type_confirm=TypeConfirm.RESET_PASS)
+        self.check_fail(confirm_obj.secret_code, ObjConfirm.EMAIL, exceptions.UserNotFound)
+        self.assertFalse(ConfirmEmail.objects.filter(id=confirm_obj.id).exists())
@@ -2,16 +2,18 @@ import uuid
 
 from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import Group
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from faker import Faker
 
 import exceptions
 import user.handlers.registration as handlers
 from confirm.choices import TypeConfirm, ObjConfirm
 from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.storages import get_storage
 from tests.confirm.factories import ConfirmEmailFactory, ConfirmPhoneFactory
-from tests.utils import create_base_user
+from tests.utils import create_base_user, RedisConfirmStorageMixin
 from user.models import User, UserGroup
+from user.utils import base_group_id_cache
 from typing import Union
 
 faker = Faker()
@@ -139,3 +141,50 @@ class RegistrationHandlerTest(TestCase):
             handlers.registration(confirm_obj.secret_code, password, password, ObjConfirm.PHONE)
         confirm_obj = ConfirmPhone.objects.filter(phone=confirm_obj.phone)
         self.assertFalse(confirm_obj.exists())
+
+    def test_queries(self):
+        """
+        Подтверждение, сохранение пользователя, строка группы и удаление объекта подтверждения,
+        плюс точка сохранения транзакции теста
+        """
+
+        with self.captureOnCommitCallbacks(execute=True):
+            base_group_id_cache.get()
+        self.addCleanup(base_group_id_cache.reset)
+
+        password = faker.password()
+        confirm_obj = ConfirmEmailFactory(confirmed=True)
+        with self.assertNumQueries(6):
+            handlers.registration(confirm_obj.secret_code, password, password, ObjConfirm.EMAIL)
+        self.check_success(confirm_obj, password)
+
+
+class RegistrationStaleBaseGroupTest(TransactionTestCase):
+    def test_stale_base_group(self):
+        """
+        Группа удалена в другом процессе: внешний ключ проверяется при фиксации транзакции,
+        регистрация сбрасывает id группы и повторяется
+        """
+
+        base_group_id_cache.group_id = 0
+        self.addCleanup(base_group_id_cache.reset)
+
+        password = faker.password()
+        confirm_obj = self.confirm_obj = ConfirmEmailFactory(confirmed=True)
+        handlers.registration(confirm_obj.secret_code, password, password, ObjConfirm.EMAIL)
+
+        user = User.objects.get(email=confirm_obj.email)
+        self.assertTrue(user.groups.filter(name=UserGroup.BASE).exists())
+        self.assertEqual(base_group_id_cache.group_id, Group.objects.get(name=UserGroup.BASE).id)
+
+
+class RegistrationStaleBaseGroupRedisTest(RedisConfirmStorageMixin, RegistrationStaleBaseGroupTest):
+    """
+    Хранилище redis не откатывается с транзакцией: объект подтверждения удаляется только после фиксации
+    """
+
+    def test_stale_base_group(self):
+        super().test_stale_base_group()
+
+        with self.assertRaises(exceptions.ConfirmObjNotFound):
+            get_storage().get_confirmed(ConfirmEmail, self.confirm_obj.secret_code, TypeConfirm.REGISTRATION)
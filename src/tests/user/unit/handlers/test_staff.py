@@ -0,0 +1,47 @@
+from django.utils import timezone
+from django.test import TestCase
+from faker import Faker
+
+import exceptions
+import user.handlers.staff as handlers
+from tests.utils import create_base_user
+from user.models import User
+
+faker = Faker()
+
+
+class ListUsersHandlerTest(TestCase):
+    def test_pages(self):
+        created_at = timezone.now()
+        # У части пользователей одинаковый created_at, порядок между ними задает id
+        for number in range(7):
+            create_base_user(email=faker.unique.email(), created_at=created_at - timezone.timedelta(
+                seconds=number // 3
+            ))
+
+        expected = list(User.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        ids = []
+        cursor = None
+        pages = 0
+        while True:
+            with self.assertNumQueries(1):
+                users, cursor = handlers.list_users(cursor, 3)
+            ids += [user.id for user in users]
+            pages += 1
+            if cursor is None:
+                break
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_deferred_fields(self):
+        create_base_user(email=faker.email(), password=faker.password())
+        users, cursor = handlers.list_users(None, 10)
+        self.assertIsNone(cursor)
+        self.assertIn('password', users[0].get_deferred_fields())
+
+    def test_invalid_cursor(self):
+        for cursor in ['not-base64!', 'bm90LWpzb24', handlers.encode_cursor(User(id=1, created_at=timezone.now()))[:-3]]:
+            with self.assertRaises(exceptions.InvalidCursor):
+                handlers.list_users(cursor, 10)
@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from faker import Faker
+
+from tests.utils import create_base_user
+from user.admin import EstimatedCountPaginator
+from user.models import User
+
+faker = Faker()
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        for _ in range(3):
+            create_base_user(email=faker.unique.email())
+
+    def test_estimated_count(self):
+        estimate = settings.USER_ADMIN_ESTIMATED_COUNT_THRESHOLD
+        with patch('user.admin.estimated_count', return_value=estimate):
+            self.assertEqual(EstimatedCountPaginator(User.objects.all(), 10).count, estimate)
+            # Отфильтрованный список считается точно
+            self.assertEqual(EstimatedCountPaginator(User.objects.filter(is_staff=False), 10).count, 3)
+
+        # Небольшая таблица считается точно
+        with patch('user.admin.estimated_count', return_value=estimate - 1):
+            self.assertEqual(EstimatedCountPaginator(User.objects.all(), 10).count, 3)
+
+        # Нет статистики или БД не PostgreSQL
+        with patch('user.admin.estimated_count', return_value=None):
+            self.assertEqual(EstimatedCountPaginator(User.objects.all(), 10).count, 3)
+
+    def test_changelist(self):
+        admin_user = create_base_user(email=faker.unique.email(), is_staff=True, is_superuser=True)
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:user_user_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 4)
@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase, override_settings
+from faker import Faker
+
+import exceptions
+from user.attempts import get_login_attempt_limiter
+from tests.utils import FakeLoginAttemptLimiterMixin
+
+faker = Faker()
+
+
+@override_settings(
+    USER_LOGIN_ATTEMPTS_PER_IDENTIFIER=2,
+    USER_LOGIN_ATTEMPTS_PER_IP=3,
+    USER_LOGIN_LOCKOUT_SECONDS=10,
+    USER_LOGIN_LOCKOUT_MAX_SECONDS=25,
+)
+class LoginAttemptLimiterTest(FakeLoginAttemptLimiterMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.limiter = get_login_attempt_limiter()
+        self.limiter.redis.flushall()
+
+    def test_identifier_lockout(self):
+        """
+        После превышения лимита попыток идентификатор блокируется, каждая следующая блокировка вдвое длиннее
+        """
+
+        email = faker.email()
+        self.limiter.hit(email)
+        self.limiter.hit(email)
+
+        with self.assertRaises(exceptions.LoginAttemptsExceeded) as e:
+            self.limiter.hit(email)
+        self.assertEqual(e.exception.payload_data, {'wait_seconds': 10})
+
+        # Во время блокировки попытки отклоняются без учета
+        with self.assertRaises(exceptions.LoginAttemptsExceeded):
+            self.limiter.hit(email)
+
+        for expected in (20, 25):
+            self.limiter.redis.delete(self.limiter.keys('identifier', email)[1])
+            self.limiter.hit(email)
+            self.limiter.hit(email)
+            with self.assertRaises(exceptions.LoginAttemptsExceeded) as e:
+                self.limiter.hit(email)
+            self.assertEqual(e.exception.payload_data, {'wait_seconds': expected})
+
+        self.assertEqual(self.limiter.stats(), {'admitted': 6, 'rejected': 4})
+
+        # Сброс снимает блокировку и серию блокировок
+        self.limiter.reset(email)
+        self.limiter.hit(email)
+
+    def test_ip_lockout(self):
+        """
+        С одного IP блокируются попытки входа по любому идентификатору
+        """
+
+        ip = faker.ipv4()
+        for _ in range(3):
+            self.limiter.hit(faker.email(), ip)
+
+        with self.assertRaises(exceptions.LoginAttemptsExceeded):
+            self.limiter.hit(faker.email(), ip)
+
+        with self.assertRaises(exceptions.LoginAttemptsExceeded):
+            self.limiter.hit(faker.email(), ip)
+
+        self.limiter.hit(faker.email(), faker.ipv4())
@@ -0,0 +1,112 @@
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from faker import Faker
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from tests.utils import create_base_user, FakeClaimsCacheMixin
+from user.authentication import ClaimsJWTAuthentication, ClaimsUser
+from user.claims import get_user_claims, revoke_user_tokens
+from user.models import User, UserGroup
+from user.permissions import group_names_cache
+from user.utils import get_jwt_tokens
+
+faker = Faker()
+
+
+class ClaimsJWTAuthenticationTest(FakeClaimsCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_base_user(email=faker.email())
+
+    def authenticate(self, access_token: str):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        return ClaimsJWTAuthentication().authenticate(request)
+
+    def test_success(self):
+        """
+        Пользователь из claims токена без запроса к таблице user, модель загружается при обращении
+        """
+
+        access_token = get_jwt_tokens(self.user)['access']
+
+        with self.assertNumQueries(0):
+            user, token = self.authenticate(access_token)
+
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.is_active)
+        self.assertEqual(user.group_names, {UserGroup.BASE})
+        self.assertEqual(token['token_version'], 0)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, self.user.email)
+            self.assertFalse(user.is_staff)
+
+    def test_save(self):
+        """
+        Изменение атрибутов передается в модель
+        """
+
+        user, _ = self.authenticate(get_jwt_tokens(self.user)['access'])
+
+        user.first_name = 'name'
+        user.save()
+
+        self.assertEqual(User.objects.get(pk=self.user.pk).first_name, 'name')
+
+    def test_revoked(self):
+        access_token = get_jwt_tokens(self.user)['access']
+        self.authenticate(access_token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            revoke_user_tokens(self.user.pk)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access_token)
+
+        self.authenticate(get_jwt_tokens(self.user)['access'])
+
+    def test_inactive(self):
+        access_token = get_jwt_tokens(self.user)['access']
+        self.authenticate(access_token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access_token)
+
+    def test_groups_changed(self):
+        """
+        Изменение групп сбрасывает кеш claims, новые токены содержат новые группы
+        """
+
+        get_jwt_tokens(self.user)
+        group = Group.objects.create(name=faker.word())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(group)
+
+        user, _ = self.authenticate(get_jwt_tokens(self.user)['access'])
+        self.assertEqual(user.group_names, {UserGroup.BASE, group.name})
+
+    def test_group_cleared_or_deleted(self):
+        """
+        Очистка пользователей группы и удаление группы сбрасывают кеш claims и кеш названий групп
+        """
+
+        for remove in (lambda group: group.user_set.clear(), lambda group: group.delete()):
+            group = Group.objects.create(name=faker.unique.word())
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.groups.add(group)
+
+            self.assertIn(group.name, get_user_claims(self.user.pk).groups)
+            group_names_cache.set(self.user.pk, frozenset([UserGroup.BASE, group.name]))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                remove(group)
+
+            self.assertEqual(get_user_claims(self.user.pk).groups, [UserGroup.BASE])
+            self.assertIsNone(group_names_cache.get(self.user.pk))
@@ -0,0 +1,137 @@
+from unittest.mock import patch
+
+import redis
+from django.test import TestCase
+from faker import Faker
+
+from confirm import utils
+from confirm.choices import TypeConfirm
+from tests.utils import create_user, rand_mobile_phone, FakeUserBloomMixin
+from user.bloom import get_user_bloom, might_exist, user_exists
+from user.tasks import task_add_to_user_bloom, task_build_missing_user_bloom
+
+faker = Faker()
+
+
+class UserBloomFilterTest(FakeUserBloomMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_user(email=faker.email(), phone=rand_mobile_phone()['phone'])
+        self.bloom = get_user_bloom()
+
+    def test_not_built(self):
+        """
+        До построения фильтра наличие пользователя проверяется запросом к БД
+        """
+
+        self.assertIsNone(self.bloom.might_exist(faker.email()))
+
+        with self.assertNumQueries(1):
+            self.assertFalse(user_exists({'email': faker.email()}))
+
+    def test_rebuild(self):
+        """
+        После построения отсутствующее значение проверяется без запроса к БД,
+        имеющееся - фильтром и запросом к БД
+        """
+
+        metrics = self.bloom.rebuild()
+
+        self.assertEqual(metrics['items'], 1)
+        self.assertTrue(self.bloom.might_exist(self.user.email))
+        self.assertTrue(self.bloom.might_exist(str(self.user.phone)))
+
+        with self.assertNumQueries(0):
+            self.assertFalse(user_exists({'email': faker.email()}))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(user_exists({'phone': str(self.user.phone)}))
+
+    def test_add_on_save(self):
+        """
+        Новый пользователь попадает в фильтр по post_save, в том числе во время перестроения
+        """
+
+        self.bloom.rebuild()
+        user = create_user(email=faker.email())
+        self.assertTrue(self.bloom.might_exist(user.email))
+
+        self.bloom.redis.setbit(self.bloom.new_key, self.bloom.size - 1, 0)
+        user = create_user(email=faker.email())
+        self.assertEqual(self.bloom.redis.bitcount(self.bloom.new_key), self.bloom.hashes)
+
+        self.bloom.build()
+        self.assertTrue(self.bloom.might_exist(user.email))
+
+    def test_stats(self):
+        """
+        Ложноположительный ответ учитывается в метриках
+        """
+
+        self.bloom.rebuild()
+        email = faker.email()
+        self.bloom.add([email])
+
+        self.assertFalse(user_exists({'email': email}))
+        self.assertFalse(user_exists({'email': faker.email()}))
+
+        stats = self.bloom.stats()
+        self.assertEqual(stats['false_positives'], 1)
+        self.assertEqual(stats['negatives'], 1)
+        self.assertEqual(stats['false_positive_rate'], 0.5)
+        self.assertGreater(stats['fill_ratio'], 0)
+
+    def test_rebuild_locked(self):
+        """
+        Параллельное перестроение не выполняется
+        """
+
+        with self.bloom.redis.lock(self.bloom.lock_key):
+            self.assertEqual(self.bloom.rebuild(), {})
+
+    def test_redis_unavailable(self):
+        """
+        При недоступности redis наличие пользователя проверяется запросом к БД
+        """
+
+        self.bloom.rebuild()
+
+        with patch.object(self.bloom, 'might_exist', side_effect=redis.ConnectionError):
+            with self.assertNumQueries(1):
+                self.assertTrue(user_exists({'email': self.user.email}))
+
+    def test_add_unavailable(self):
+        """
+        Пользователь, не добавленный в фильтр, не получает отрицательного ответа до перестроения фильтра
+        """
+
+        self.bloom.rebuild()
+
+        # redis недоступен и при добавлении, и при отметке фильтра непостроенным: добавление повторит воркер
+        with patch.object(self.bloom, 'add', side_effect=redis.ConnectionError), \
+                patch.object(self.bloom.redis, 'delete', side_effect=redis.ConnectionError), \
+                patch('user.signals.task_add_to_user_bloom') as task:
+            user = create_user(email=faker.email())
+            self.assertTrue(self.bloom.dirty)
+            self.assertIsNone(might_exist(user.email))
+
+        task.delay.assert_called_once_with([user.email])
+        task_add_to_user_bloom(*task.delay.call_args.args)
+
+        self.assertIsNone(might_exist(user.email))
+        self.assertFalse(self.bloom.dirty)
+        self.assertFalse(self.bloom.is_built())
+
+        self.assertEqual(task_build_missing_user_bloom()['items'], 2)
+        self.assertTrue(might_exist(user.email))
+        self.assertEqual(task_build_missing_user_bloom(), {})
+
+    def test_type_confirm_is_available_for_user(self):
+        """
+        Код подтверждения регистрации для нового email не требует запроса к БД
+        """
+
+        self.bloom.rebuild()
+
+        with self.assertNumQueries(0):
+            utils.type_confirm_is_available_for_user(TypeConfirm.REGISTRATION, {'email': faker.email()})
@@ -0,0 +1,159 @@
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import redis
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from faker import Faker
+
+from confirm.choices import BulkFileFormat, PhoneRegion
+from tests.utils import FakeUserBloomMixin, create_base_user, rand_mobile_phone
+from user import bulk
+from user.bloom import get_user_bloom
+from user.models import User, UserGroup
+
+faker = Faker()
+
+
+class NormalizeRowTest(TestCase):
+    def test_success(self):
+        phone = rand_mobile_phone()
+        data = bulk.normalize_row({'email': ' User@Example.COM ', 'phone': phone['number']}, PhoneRegion.RUSSIAN)
+        self.assertEqual(data['email'], 'user@example.com')
+        self.assertEqual(data['phone'], phone['phone'])
+
+    def test_numeric_phone(self):
+        phone = rand_mobile_phone()
+        data = bulk.normalize_row({'phone': int(phone['phone'].lstrip('+'))})
+        self.assertEqual(data['phone'], phone['phone'])
+
+    def test_fail(self):
+        for row in [
+            'not json',
+            {},
+            {'email': 'not-email'},
+            {'phone': '123'},
+            {'email': faker.email(), 'password_hash': 'plain-password'},
+            {'email': 'a' * 250 + '@example.com'},
+            {'email': faker.email(), 'first_name': 'a' * 151},
+            {'email': faker.email(), 'last_name': ['Иванов']},
+        ]:
+            with self.assertRaises(ValueError):
+                bulk.normalize_row(row)
+
+
+class ImportUsersTest(FakeUserBloomMixin, TestCase):
+    def test_import(self):
+        get_user_bloom().rebuild()
+        existing_user = create_base_user(email=faker.unique.email())
+        password = faker.password()
+        phone = rand_mobile_phone()
+        rows = [
+            {'email': faker.unique.email().upper(), 'password': password},
+            {'phone': phone['number'], 'region': PhoneRegion.RUSSIAN},
+            {'email': faker.unique.email(), 'password_hash': make_password(password)},
+            {'email': existing_user.email, 'password': password},
+            {'email': 'not-email'},
+        ]
+
+        results = list(bulk.import_users(rows, chunk_size=2))
+
+        self.assertEqual([result['row'] for result in results], [2, 4, 5])
+        self.assertEqual(sum(result['created'] for result in results), 3)
+        self.assertEqual(sum(result['skipped'] for result in results), 1)
+        self.assertEqual(results[-1]['errors'], [{'row': 5, 'error': 'Некорректный email'}])
+
+        user = User.objects.get(email=rows[0]['email'].lower())
+        self.assertTrue(check_password(password, user.password))
+        self.assertTrue(check_password(password, User.objects.get(email=rows[2]['email']).password))
+        self.assertIsNone(User.objects.get(phone=phone['phone']).password)
+
+        # Группа BASE добавлена вставкой в промежуточную таблицу, без post_save добавлены в фильтр Блума
+        imported = User.objects.exclude(id=existing_user.id)
+        self.assertEqual(imported.filter(groups__name=UserGroup.BASE).count(), 3)
+        self.assertTrue(all(get_user_bloom().might_exist(user.email or str(user.phone)) for user in imported))
+
+    def test_import_invalid_values(self):
+        """
+        Значения неверного типа и длиннее полей модели попадают в ошибки строк, а не прерывают импорт
+        """
+
+        phone = rand_mobile_phone()
+        rows = [
+            {'phone': int(phone['phone'].lstrip('+'))},
+            {'email': faker.unique.email(), 'first_name': 'a' * 151},
+        ]
+
+        results = list(bulk.import_users(rows))
+
+        self.assertEqual(results[0]['created'], 1)
+        self.assertEqual(results[0]['errors'], [{'row': 2, 'error': 'Значение поля first_name длиннее 150 символов'}])
+        self.assertTrue(User.objects.filter(phone=phone['phone']).exists())
+
+    def test_command_checkpoint(self):
+        emails = [faker.unique.email() for _ in range(5)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'users.csv')
+            checkpoint_path = os.path.join(tmp_dir, 'checkpoint.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('email,password\n')
+                file.writelines(f'{email},{faker.password()}\n' for email in emails[:3])
+
+            call_command(
+                'import_users', path, format=BulkFileFormat.CSV, chunk_size=2, workers=0,
+                checkpoint=checkpoint_path, stdout=io.StringIO(), stderr=io.StringIO()
+            )
+            with open(checkpoint_path, encoding='utf-8') as file:
+                self.assertEqual(json.load(file), {'row': 3, 'created': 3, 'skipped': 0, 'errors': 0})
+
+            # Повторный запуск продолжает после последней импортированной строки
+            with open(path, 'a', encoding='utf-8') as file:
+                file.writelines(f'{email},{faker.password()}\n' for email in emails[3:])
+            stderr = io.StringIO()
+            call_command(
+                'import_users', path, format=BulkFileFormat.CSV, chunk_size=2, workers=0,
+                checkpoint=checkpoint_path, stdout=io.StringIO(), stderr=stderr
+            )
+            with open(checkpoint_path, encoding='utf-8') as file:
+                self.assertEqual(json.load(file), {'row': 5, 'created': 5, 'skipped': 0, 'errors': 0})
+
+        self.assertIn('после строки 3', stderr.getvalue())
+        self.assertEqual(User.objects.filter(email__in=emails).count(), 5)
+
+    def test_command_bloom_unavailable(self):
+        """
+        Если пачку не удалось ни добавить в фильтр Блума, ни отметить фильтр непостроенным,
+        импорт прерывается до записи состояния, повторный запуск добавляет пачку в фильтр
+        """
+
+        bloom = get_user_bloom()
+        bloom.rebuild()
+        emails = [faker.unique.email() for _ in range(2)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'users.csv')
+            checkpoint_path = os.path.join(tmp_dir, 'checkpoint.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('email\n')
+                file.writelines(f'{email}\n' for email in emails)
+            options = {
+                'format': BulkFileFormat.CSV, 'workers': 0, 'checkpoint': checkpoint_path,
+                'stdout': io.StringIO(), 'stderr': io.StringIO(),
+            }
+
+            with patch.object(bloom, 'add', side_effect=redis.ConnectionError), \
+                    patch.object(bloom.redis, 'delete', side_effect=redis.ConnectionError):
+                with self.assertRaises(CommandError):
+                    call_command('import_users', path, **options)
+            self.assertFalse(os.path.exists(checkpoint_path))
+
+            # Повторный запуск - новый процесс без отметки фильтра в памяти
+            bloom.dirty = False
+            call_command('import_users', path, **options)
+            with open(checkpoint_path, encoding='utf-8') as file:
+                self.assertEqual(json.load(file), {'row': 2, 'created': 0, 'skipped': 2, 'errors': 0})
+
+        self.assertTrue(all(bloom.might_exist(email) for email in emails))
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from faker import Faker
+
+from tests.utils import create_base_user, FakeClaimsCacheMixin
+from user import claims
+from user.claims import get_claims_cache, get_user_claims, invalidate_user_claims
+from user.models import User
+
+faker = Faker()
+
+
+class ClaimsCacheTest(FakeClaimsCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_base_user(email=faker.email())
+        self.cache = get_claims_cache()
+
+    def test_read_through(self):
+        with self.assertNumQueries(2):
+            user_claims = get_user_claims(self.user.pk)
+
+        self.assertTrue(user_claims.is_active)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_claims(self.user.pk), user_claims)
+
+    def test_invalidate_during_load(self):
+        """
+        Данные, загруженные до сброса, не записываются в кеш после него
+        """
+
+        load_user_claims = claims.load_user_claims
+
+        def load_and_deactivate(user_id):
+            user_claims = load_user_claims(user_id)
+            User.objects.filter(pk=user_id).update(is_active=False)
+            invalidate_user_claims(user_id)
+            return user_claims
+
+        with patch('user.claims.load_user_claims', side_effect=load_and_deactivate):
+            self.assertTrue(get_user_claims(self.user.pk).is_active)
+
+        self.assertIsNone(self.cache.redis.get(self.cache.key(self.user.pk)))
+        self.assertFalse(get_user_claims(self.user.pk).is_active)
+        self.assertFalse(get_user_claims(self.user.pk).is_active)
@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import check_password
+from django.test import TestCase, override_settings
+from faker import Faker
+
+import exceptions
+import user.handlers.email_or_phone as email_or_phone_handlers
+import user.handlers.login as login_handlers
+import user.handlers.password as password_handlers
+from confirm.choices import TypeConfirm, ObjConfirm
+from tests.confirm.factories import ConfirmEmailFactory
+from tests.utils import create_base_user, FakeClaimsCacheMixin, FakeCredentialsCacheMixin
+from user.credentials import get_credentials, get_credentials_cache
+
+faker = Faker()
+
+
+class CredentialsCacheTest(FakeCredentialsCacheMixin, FakeClaimsCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.password = faker.password()
+        self.user = create_base_user(email=faker.email(), password=self.password)
+        self.cache = get_credentials_cache()
+
+    def test_read_through(self):
+        """
+        Промах - один запрос к БД, затем данные из redis и локального кеша
+        """
+
+        with self.assertNumQueries(1):
+            credentials = get_credentials('email', self.user.email)
+
+        self.assertEqual(credentials, (self.user.id, self.user.password, True))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_credentials('email', self.user.email), credentials)
+
+        self.cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_credentials('email', self.user.email), credentials)
+
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_credentials('email', faker.email()))
+
+    @override_settings(USER_CREDENTIALS_LOCAL_TTL_SECONDS=-1)
+    def test_local_expired(self):
+        get_credentials('email', self.user.email)
+        cache = get_credentials_cache()
+
+        with patch.object(cache.redis, 'mget', wraps=cache.redis.mget) as redis_mget:
+            get_credentials('email', self.user.email)
+
+        redis_mget.assert_called_once()
+
+    def test_invalidate_during_load(self):
+        """
+        Учетные данные, загруженные до сброса, не записываются в кеш после него
+        """
+
+        set_if_generation_script = self.cache.set_if_generation_script
+        new_password = faker.password()
+
+        def change_password_and_set(keys, args):
+            with self.captureOnCommitCallbacks(execute=True):
+                password_handlers.change_password(self.user, new_password, new_password)
+            return set_if_generation_script(keys=keys, args=args)
+
+        with patch.object(self.cache, 'set_if_generation_script', side_effect=change_password_and_set):
+            self.assertTrue(check_password(self.password, get_credentials('email', self.user.email).password))
+
+        self.assertTrue(check_password(new_password, get_credentials('email', self.user.email).password))
+
+    def test_login(self):
+        """
+        Повторный вход без запросов к БД, неактивный пользователь не входит
+        """
+
+        login_handlers.login_by_email(self.user.email, self.password)
+
+        with self.assertNumQueries(0):
+            self.assertIn('access', login_handlers.login_by_email(self.user.email, self.password))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(exceptions.UserNotFound):
+            login_handlers.login_by_email(self.user.email, self.password)
+
+    def test_invalidate_change_password(self):
+        get_credentials('email', self.user.email)
+        new_password = faker.password()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            password_handlers.change_password(self.user, new_password, new_password)
+
+        self.assertTrue(check_password(new_password, get_credentials('email', self.user.email).password))
+
+    def test_invalidate_change_password_by_confirm(self):
+        get_credentials('email', self.user.email)
+        confirm_obj = ConfirmEmailFactory(email=self.user.email, type_confirm=TypeConfirm.RESET_PASS, confirmed=True)
+        new_password = faker.password()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            password_handlers.change_password_by_confirm(
+                confirm_obj.secret_code, new_password, new_password, ObjConfirm.EMAIL
+            )
+
+        self.assertTrue(check_password(new_password, get_credentials('email', self.user.email).password))
+
+    def test_invalidate_change_email(self):
+        """
+        После смены email по старому email учетных данных нет
+        """
+
+        old_email = self.user.email
+        get_credentials('email', old_email)
+        confirm_obj = ConfirmEmailFactory(type_confirm=TypeConfirm.CHANGE, confirmed=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            email_or_phone_handlers.change_email_or_phone(confirm_obj.secret_code, self.user, ObjConfirm.EMAIL)
+
+        self.assertIsNone(get_credentials('email', old_email))
+        self.assertEqual(get_credentials('email', confirm_obj.email).user_id, self.user.id)
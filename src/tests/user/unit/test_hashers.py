@@ -0,0 +1,73 @@
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.test import SimpleTestCase, TestCase, override_settings
+from faker import Faker
+
+from user import hashing
+from user.credentials import get_credentials
+from user.handlers.login import login_by_email
+from user.models import User
+from tests.utils import create_base_user
+
+faker = Faker()
+
+PROFILE_HASHERS = ['user.hashers.PBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@override_settings(
+    PASSWORD_HASHERS=PROFILE_HASHERS,
+    PASSWORD_HASHER_ALGORITHM='pbkdf2_sha256',
+    PASSWORD_HASHER_COST=1000,
+    PASSWORD_HASHING_WORKERS=0,
+)
+class ProfileHasherTest(SimpleTestCase):
+    def test_cost_from_profile(self):
+        encoded = make_password('password')
+
+        self.assertEqual(identify_hasher(encoded).safe_summary(encoded)['iterations'], 1000)
+
+    def test_must_update(self):
+        """
+        Хеш пересчитывается при смене алгоритма и при увеличении или уменьшении стоимости
+        """
+
+        encoded = make_password('password')
+        self.assertEqual(hashing.verify_password('password', encoded), (True, False))
+        self.assertEqual(hashing.verify_password('other', encoded), (False, False))
+
+        with override_settings(PASSWORD_HASHER_COST=2000):
+            self.assertEqual(hashing.verify_password('password', encoded), (True, True))
+
+        with override_settings(PASSWORD_HASHER_COST=500):
+            self.assertEqual(hashing.verify_password('password', encoded), (True, True))
+
+        md5 = get_hasher('md5').encode('password', 'salt')
+        self.assertEqual(hashing.verify_password('password', md5), (True, True))
+        self.assertEqual(hashing.verify_password('password', None), (False, False))
+
+
+@override_settings(
+    PASSWORD_HASHERS=PROFILE_HASHERS,
+    PASSWORD_HASHER_ALGORITHM='pbkdf2_sha256',
+    PASSWORD_HASHER_COST=1000,
+    PASSWORD_HASHING_WORKERS=0,
+)
+class RehashOnLoginTest(TestCase):
+    def test_rehash(self):
+        """
+        После входа хеш пароля пересчитывается по текущему профилю
+        """
+
+        email = faker.email()
+        password = faker.password()
+        user = create_base_user(email=email, password=password)
+        User.objects.filter(pk=user.pk).update(password=get_hasher('md5').encode(password, 'salt'))
+
+        login_by_email(email, password)
+
+        encoded = User.objects.get(pk=user.pk).password
+        self.assertEqual(identify_hasher(encoded).algorithm, 'pbkdf2_sha256')
+        self.assertEqual(get_credentials('email', email).password, encoded)
+
+        # Хеш по текущему профилю не пересчитывается
+        login_by_email(email, password)
+        self.assertEqual(User.objects.get(pk=user.pk).password, encoded)
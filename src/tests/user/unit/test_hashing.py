@@ -0,0 +1,83 @@
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.test import SimpleTestCase, override_settings
+
+import exceptions
+from user import hashing
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE_SIZE=0)
+class PasswordHashingPoolTest(SimpleTestCase):
+    def test_make_and_check_password(self):
+        """
+        Хеширование и проверка пароля в процессе пула
+        """
+
+        encoded = hashing.make_password('password')
+
+        self.assertIsNotNone(hashing.pool.executor)
+        self.assertEqual(identify_hasher(encoded).algorithm, identify_hasher(make_password('password')).algorithm)
+        self.assertTrue(hashing.check_password('password', encoded))
+        self.assertFalse(hashing.check_password('other', encoded))
+        self.assertFalse(hashing.check_password('password', None))
+
+    async def test_async(self):
+        encoded = await hashing.amake_password('password')
+
+        self.assertTrue(await hashing.acheck_password('password', encoded))
+
+    def test_busy(self):
+        """
+        При заполненной очереди задача не ставится в пул
+        """
+
+        future = hashing.pool.submit(time.sleep, 0.5)
+
+        with self.assertRaises(exceptions.PasswordHashingBusy):
+            hashing.make_password('password')
+
+        future.result()
+        self.assertTrue(hashing.make_password('password'))
+
+    def test_broken_pool(self):
+        """
+        После аварийного завершения процесса пула пул создается заново
+        """
+
+        hashing.make_password('password')
+        executor = hashing.pool.executor
+        for process in list(executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+
+        deadline = time.monotonic() + 10
+        while not executor._broken and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        encoded = hashing.make_password('password')
+
+        self.assertIsNot(hashing.pool.executor, executor)
+        self.assertTrue(hashing.check_password('password', encoded))
+
+    def test_broken_pool_retry_fail(self):
+        """
+        Если пул сломан и после пересоздания, вызывается PasswordHashingBusy
+        """
+
+        with mock.patch.object(ProcessPoolExecutor, 'submit', side_effect=BrokenProcessPool):
+            with self.assertRaises(exceptions.PasswordHashingBusy):
+                hashing.make_password('password')
+
+        self.assertTrue(hashing.make_password('password'))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=0)
+    def test_without_pool(self):
+        encoded = hashing.make_password('password')
+
+        self.assertIsNone(hashing.pool.executor)
+        self.assertTrue(hashing.check_password('password', encoded))
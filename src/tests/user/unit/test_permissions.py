@@ -0,0 +1,64 @@
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from faker import Faker
+from rest_framework.test import APIRequestFactory
+
+from tests.utils import create_base_user, FakeClaimsCacheMixin
+from user.authentication import ClaimsJWTAuthentication
+from user.models import UserGroup
+from user.permissions import group_names_cache, group_permission_stats, user_group_permission
+from user.utils import get_jwt_tokens
+
+faker = Faker()
+
+
+class UserGroupPermissionTest(FakeClaimsCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = create_base_user(email=faker.email())
+        self.request = APIRequestFactory().get('/')
+        group_names_cache.items.clear()
+
+    def has_permission(self, user, user_group) -> bool:
+        self.request.user = user
+        return user_group_permission(user_group)().has_permission(self.request, None)
+
+    def test_claims_user(self):
+        """
+        Группы ClaimsUser проверяются в памяти
+        """
+
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {get_jwt_tokens(self.user)["access"]}')
+        user, _ = ClaimsJWTAuthentication().authenticate(request)
+        db_avoided = group_permission_stats['db_avoided']
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.has_permission(user, [UserGroup.BASE]))
+            self.assertFalse(self.has_permission(user, ['other']))
+
+        self.assertEqual(group_permission_stats['db_avoided'], db_avoided + 2)
+
+    def test_model_user(self):
+        """
+        Группы пользователя модели запрашиваются один раз и сбрасываются по m2m_changed
+        """
+
+        checks = group_permission_stats['checks']
+        db_avoided = group_permission_stats['db_avoided']
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.has_permission(self.user, [UserGroup.BASE]))
+            self.assertFalse(self.has_permission(self.user, ['other']))
+
+        self.assertEqual(group_permission_stats['checks'], checks + 2)
+        self.assertEqual(group_permission_stats['db_avoided'], db_avoided + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(Group.objects.create(name='other'))
+
+        self.assertTrue(self.has_permission(self.user, ['other']))
+
+    def test_all_users(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(self.has_permission(self.user, None))
+            self.assertTrue(self.has_permission(self.user, []))
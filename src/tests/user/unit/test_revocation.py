@@ -0,0 +1,77 @@
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from tests.utils import FakeRedisTokenDenyList
+from user.revocation import get_token_deny_list
+
+
+@override_settings(USER_TOKEN_DENY_LIST='tests.utils.FakeRedisTokenDenyList', USER_TOKEN_DENY_LIST_LOCAL=1)
+class TokenDenyListTest(SimpleTestCase):
+    def setUp(self):
+        self.deny_list = get_token_deny_list()
+        self.deny_list.redis.flushall()
+        # Отзыв токенов в другом процессе
+        self.other_process = FakeRedisTokenDenyList()
+        self.exp = int(time.time()) + 60
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_local_copy(self):
+        """
+        Снимок при запуске и отзыв в другом процессе через pub/sub, проверка без обращения к redis
+        """
+
+        self.other_process.revoke('before', self.exp)
+        self.other_process.revoke('expired', int(time.time()) - 1)
+
+        self.assertTrue(self.deny_list.is_revoked('before'))
+        self.wait_for(self.deny_list.ready.is_set)
+
+        self.assertTrue(self.other_process.revoke('after', self.exp))
+        self.wait_for(lambda: 'after' in self.deny_list.local)
+
+        with patch.object(self.deny_list.redis, 'exists', side_effect=AssertionError):
+            self.assertTrue(self.deny_list.is_revoked('before'))
+            self.assertTrue(self.deny_list.is_revoked('after'))
+            self.assertFalse(self.deny_list.is_revoked('expired'))
+            self.assertFalse(self.deny_list.is_revoked('other'))
+
+    def test_revoke_once(self):
+        self.assertTrue(self.deny_list.revoke('jti', self.exp))
+        self.assertFalse(self.other_process.revoke('jti', self.exp))
+        self.assertLessEqual(self.deny_list.redis.ttl(self.deny_list.key('jti')), 61)
+
+    @override_settings(USER_TOKEN_DENY_LIST_LOCAL=0)
+    def test_without_local_copy(self):
+        self.other_process.revoke('jti', self.exp)
+
+        self.assertTrue(get_token_deny_list().is_revoked('jti'))
+        self.assertIsNone(get_token_deny_list().pid)
+
+    def test_revoke_without_broadcast(self):
+        """
+        Отзыв refresh токена не попадает в множество и локальные копии, проверяется в redis
+        """
+
+        self.assertFalse(self.deny_list.is_revoked('other'))
+        self.wait_for(self.deny_list.ready.is_set)
+
+        self.assertTrue(self.other_process.revoke('refresh', self.exp, broadcast=False))
+        self.assertFalse(self.other_process.revoke('refresh', self.exp, broadcast=False))
+
+        self.assertIsNone(self.deny_list.redis.zscore(self.deny_list.set_key, 'refresh'))
+        self.assertNotIn('refresh', self.deny_list.local)
+        self.assertTrue(self.deny_list.is_revoked('refresh', local=False))
+
+    def test_prune(self):
+        self.deny_list.redis.zadd(self.deny_list.set_key, {'expired': int(time.time()) - 1})
+
+        self.other_process.revoke('jti', self.exp)
+
+        self.assertEqual(self.deny_list.redis.zrange(self.deny_list.set_key, 0, -1), ['jti'])
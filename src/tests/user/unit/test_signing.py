@@ -0,0 +1,97 @@
+import tempfile
+from pathlib import Path
+
+import jwt
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from faker import Faker
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from tests.utils import create_base_user
+from user.management.commands.generate_jwt_key import generate_private_key
+from user.signing import get_signing_key_set
+from user.utils import get_jwt_tokens
+
+faker = Faker()
+
+
+class SigningKeySetTest(TestCase):
+    def setUp(self):
+        keys_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(keys_dir.cleanup)
+        self.keys_dir = Path(keys_dir.name)
+        self.add_key('first')
+
+        key_settings = override_settings(JWT_ALGORITHM='EdDSA', JWT_KEYS_DIR=keys_dir.name, JWT_SIGNING_KEY_ID='first')
+        key_settings.enable()
+        self.addCleanup(key_settings.disable)
+
+        self.user = create_base_user(email=faker.email())
+
+    def add_key(self, kid: str):
+        from cryptography.hazmat.primitives import serialization
+
+        (self.keys_dir / f'{kid}.pem').write_bytes(generate_private_key('EdDSA').private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+
+    def test_sign_and_verify(self):
+        tokens = get_jwt_tokens(self.user)
+
+        header = jwt.get_unverified_header(tokens['access'])
+        self.assertEqual((header['alg'], header['kid']), ('EdDSA', 'first'))
+        self.assertEqual(AccessToken(tokens['access'])['user_id'], self.user.pk)
+        self.assertEqual(RefreshToken(tokens['refresh'])['user_id'], self.user.pk)
+
+        # Закрытый ключ загружается один раз
+        self.assertIs(get_signing_key_set().signing_key, get_signing_key_set().signing_key)
+
+        # Первый символ подписи кодирует 6 бит целиком, последние символы могут не менять подпись
+        signing_input, signature = tokens['access'].rsplit('.', 1)
+        tampered_signature = ('B' if signature[0] == 'A' else 'A') + signature[1:]
+        with self.assertRaises(TokenError):
+            AccessToken(f'{signing_input}.{tampered_signature}')
+
+    def test_rotation(self):
+        """
+        Токены старого ключа принимаются, пока файл ключа не удален
+        """
+
+        old_access = get_jwt_tokens(self.user)['access']
+
+        self.add_key('second')
+        with override_settings(JWT_SIGNING_KEY_ID='second'):
+            access = get_jwt_tokens(self.user)['access']
+            self.assertEqual(jwt.get_unverified_header(access)['kid'], 'second')
+            AccessToken(old_access)
+
+            (self.keys_dir / 'first.pem').unlink()
+            get_signing_key_set.cache_clear()
+            with self.assertRaises(TokenError):
+                AccessToken(old_access)
+            AccessToken(access)
+
+    def test_jwks(self):
+        self.add_key('second')
+        get_signing_key_set.cache_clear()
+
+        response = self.client.get(reverse('jwks'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        self.assertEqual([key['kid'] for key in response.json()['keys']], ['first', 'second'])
+
+        # Downstream сервис проверяет токен по jwks без обращения к API
+        access = get_jwt_tokens(self.user)['access']
+        jwk = jwt.PyJWKSet.from_dict(response.json())['first']
+        self.assertEqual(jwt.decode(access, jwk.key, algorithms=['EdDSA'])['user_id'], self.user.pk)
+
+        response = self.client.get(reverse('jwks'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(JWT_ALGORITHM='HS256')
+    def test_symmetric(self):
+        self.assertIsNone(get_signing_key_set())
+        self.assertEqual(self.client.get(reverse('jwks')).json(), {'keys': []})
+        self.assertNotIn('kid', jwt.get_unverified_header(get_jwt_tokens(self.user)['access']))
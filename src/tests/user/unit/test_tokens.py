@@ -0,0 +1,91 @@
+import json
+from unittest.mock import patch
+
+import jwt
+from django.test import TestCase
+from django.urls import reverse
+from faker import Faker
+from rest_framework import status
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from tests.utils import create_base_user
+from user.tokens import TokenMinter, get_token_minter
+from user.utils import get_jwt_tokens
+
+faker = Faker()
+
+
+def decode_segments(token: str):
+    header, payload, _ = token.split('.')
+    return [json.loads(jwt.utils.base64url_decode(segment)) for segment in (header, payload)]
+
+
+class TokenMinterTest(TestCase):
+    def setUp(self):
+        self.user = create_base_user(email=faker.email())
+        self.claims = {'is_active': True, 'token_version': 3, 'groups': ['base']}
+
+    def simplejwt_tokens(self) -> dict:
+        refresh = RefreshToken.for_user(self.user)
+        for claim, value in self.claims.items():
+            refresh[claim] = value
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+    def test_same_claims_as_simplejwt(self):
+        """
+        Заголовок, claims и порядок claims совпадают с токенами RefreshToken simplejwt
+        """
+
+        tokens = get_token_minter().mint(self.user.pk, self.claims)
+        expected = self.simplejwt_tokens()
+
+        for name in ('refresh', 'access'):
+            header, payload = decode_segments(tokens[name])
+            expected_header, expected_payload = decode_segments(expected[name])
+
+            self.assertEqual(tokens[name].split('.')[0], expected[name].split('.')[0])
+            self.assertEqual(header, expected_header)
+            self.assertEqual(list(payload), list(expected_payload))
+            for claim in ('jti', 'exp', 'iat'):
+                payload.pop(claim), expected_payload.pop(claim)
+            self.assertEqual(payload, expected_payload)
+
+    def test_signature(self):
+        """
+        Подпись совпадает с подписью PyJWT для того же payload
+        """
+
+        tokens = get_token_minter().mint(self.user.pk, self.claims)
+        for token in tokens.values():
+            payload = jwt.decode(token, api_settings.SIGNING_KEY, algorithms=['HS256'])
+            self.assertEqual(token, jwt.encode(payload, api_settings.SIGNING_KEY, algorithm='HS256'))
+
+    def test_simplejwt_accepts(self):
+        tokens = get_jwt_tokens(self.user)
+
+        access = AccessToken(tokens['access'])
+        refresh = RefreshToken(tokens['refresh'])
+        self.assertEqual(access['user_id'], self.user.pk)
+        self.assertEqual(access['iat'], refresh['iat'])
+        self.assertNotEqual(access['jti'], refresh['jti'])
+
+        response = self.client.post(reverse('verify_token'), {'token': tokens['access']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.json()['access'])['groups'], ['base'])
+
+    def test_algorithms(self):
+        for algorithm in ('HS384', 'HS512'):
+            token = TokenMinter(algorithm, 'key').mint(self.user.pk)['access']
+
+            payload = jwt.decode(token, 'key', algorithms=[algorithm])
+            self.assertEqual(token, jwt.encode(payload, 'key', algorithm=algorithm))
+
+    @patch('user.utils.get_token_minter', return_value=None)
+    def test_fallback(self, minter):
+        tokens = get_jwt_tokens(self.user)
+
+        self.assertEqual(AccessToken(tokens['access'])['token_version'], self.user.token_version)
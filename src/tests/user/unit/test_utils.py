@@ -1,6 +1,6 @@
 import jwt
 from django.conf import settings
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from faker import Faker
 
 import exceptions
@@ -28,3 +28,22 @@ class UserUtilsTest(TestCase):
         with self.assertRaises(exceptions.PasswordNotEqual):
             utils.passwd_is_equal(password, confirm_password)
 
+
+    def test_get_client_ip(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2, 10.0.0.1')
+
+        # По умолчанию заголовок не учитывается
+        self.assertEqual(utils.get_client_ip(request), '10.0.0.2')
+
+        with override_settings(USER_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR', USER_TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(utils.get_client_ip(request), '10.0.0.1')
+
+        with override_settings(USER_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR', USER_TRUSTED_PROXY_COUNT=2):
+            self.assertEqual(utils.get_client_ip(request), '2.2.2.2')
+
+        # Адресов меньше, чем доверенных прокси, или заголовка нет
+        with override_settings(USER_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR', USER_TRUSTED_PROXY_COUNT=4):
+            self.assertEqual(utils.get_client_ip(request), '10.0.0.2')
+
+        with override_settings(USER_CLIENT_IP_HEADER='HTTP_X_REAL_IP', USER_TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(utils.get_client_ip(request), '10.0.0.2')
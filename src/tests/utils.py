@@ -1,15 +1,25 @@
 import random
 
+import fakeredis
 import jwt
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Group
+from django.test import override_settings
 from faker import Faker
 from rest_framework import status
 from rest_framework.exceptions import NotAuthenticated
 from rest_framework.test import APITestCase
 
+from confirm.models import ConfirmPhone
+from confirm.storages.redis import RedisConfirmStorage
+from confirm.throttle import PhoneSendThrottle
 from tests.user.factories import UserFactory
+from user.attempts import LoginAttemptLimiter
+from user.bloom import UserBloomFilter
+from user.claims import ClaimsCache
+from user.credentials import CredentialsCache
+from user.revocation import TokenDenyList
 from user.models import UserGroup, User
 from user.utils import get_jwt_tokens
 
@@ -38,6 +48,106 @@ class BaseE2ETest(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {jwt_token}')
 
 
+class FakeRedisMixin:
+    """
+    Компонент на fakeredis вместо redis из настроек.
+    server - общий FakeServer для всех экземпляров класса, None - у каждого экземпляра свой redis
+    """
+
+    server = None
+
+    def get_client(self):
+        return fakeredis.FakeRedis(server=self.server, decode_responses=True)
+
+
+class FakeRedisSettingsMixin:
+    """
+    Запуск тестов с компонентами на fakeredis: fake_settings всех классов в MRO
+    включаются перед setUp теста, поэтому миксины разных компонентов можно сочетать
+    """
+
+    fake_settings = {}
+
+    def setUp(self):
+        fake_settings = {}
+        for cls in reversed(type(self).__mro__):
+            fake_settings.update(cls.__dict__.get('fake_settings', {}))
+
+        fake_settings = override_settings(**fake_settings)
+        fake_settings.enable()
+        self.addCleanup(fake_settings.disable)
+        super().setUp()
+
+
+class FakeRedisConfirmStorage(FakeRedisMixin, RedisConfirmStorage):
+    pass
+
+
+class FakeRedisPhoneSendThrottle(FakeRedisMixin, PhoneSendThrottle):
+    def sync(self, confirm_phone: ConfirmPhone):
+        """
+        Установка счетчика отправок по объекту подтверждения, созданному в тесте напрямую
+        """
+
+        self.redis.hset(self.key(str(confirm_phone.phone)), mapping={
+            'count_send': confirm_phone.count_send,
+            'sent_at': repr(confirm_phone.created_at.timestamp()),
+        })
+
+
+class FakeRedisUserBloomFilter(FakeRedisMixin, UserBloomFilter):
+    pass
+
+
+class FakeRedisCredentialsCache(FakeRedisMixin, CredentialsCache):
+    pass
+
+
+class FakeRedisClaimsCache(FakeRedisMixin, ClaimsCache):
+    pass
+
+
+class FakeRedisLoginAttemptLimiter(FakeRedisMixin, LoginAttemptLimiter):
+    pass
+
+
+class FakeRedisTokenDenyList(FakeRedisMixin, TokenDenyList):
+    # Общий сервер для экземпляров, что бы имитировать несколько процессов с одним redis
+    server = fakeredis.FakeServer()
+
+
+class RedisConfirmStorageMixin(FakeRedisSettingsMixin):
+    fake_settings = {'CONFIRM_STORAGE': 'tests.utils.FakeRedisConfirmStorage'}
+
+
+class FakePhoneSendThrottleMixin(FakeRedisSettingsMixin):
+    fake_settings = {'CONFIRM_PHONE_THROTTLE': 'tests.utils.FakeRedisPhoneSendThrottle'}
+
+
+class FakeUserBloomMixin(FakeRedisSettingsMixin):
+    fake_settings = {'USER_BLOOM_FILTER': 'tests.utils.FakeRedisUserBloomFilter', 'USER_BLOOM_CAPACITY': 1000}
+
+
+class FakeCredentialsCacheMixin(FakeRedisSettingsMixin):
+    fake_settings = {'USER_CREDENTIALS_CACHE': 'tests.utils.FakeRedisCredentialsCache'}
+
+
+class FakeClaimsCacheMixin(FakeRedisSettingsMixin):
+    fake_settings = {'USER_CLAIMS_CACHE': 'tests.utils.FakeRedisClaimsCache'}
+
+
+class FakeLoginAttemptLimiterMixin(FakeRedisSettingsMixin):
+    fake_settings = {'USER_LOGIN_LIMITER': 'tests.utils.FakeRedisLoginAttemptLimiter'}
+
+
+class FakeTokenDenyListMixin(FakeRedisSettingsMixin):
+    # Без локальной копии списка, проверка отзыва запросом к redis
+    fake_settings = {
+        'USER_TOKEN_DENY_LIST': 'tests.utils.FakeRedisTokenDenyList',
+        'USER_TOKEN_DENY_LIST_LOCAL': 0,
+    }
+
+
 def jwt_decode(access_token: str):
     return jwt.decode(
         access_token,
@@ -1,12 +1,63 @@
+from typing import Optional
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from user.models import User
 from django.utils.translation import gettext_lazy as _
 
 
+def estimated_count(model, using: str) -> Optional[int]:
+    """
+    Оценка количества строк таблицы из статистики планировщика PostgreSQL pg_class.reltuples
+
+    :return: Оценка или None, если БД не PostgreSQL или статистика таблицы еще не собрана
+    """
+
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+
+    if row is None or row[0] < 0:
+        return None
+
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор changelist без COUNT(*) по всей таблице: для списка без фильтров и поиска количество
+    берется из оценки pg_class, если она не меньше USER_ADMIN_ESTIMATED_COUNT_THRESHOLD.
+    Отфильтрованный список и небольшая таблица считаются точно
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.USER_ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+
+        return super().count
+
+
 # Register your models here.
 @admin.register(User)
 class UserAdmin(UserAdmin):
+    # Порядок индекса user_created_at_id_idx вместо username из UserAdmin Django
+    ordering = ('-created_at', '-id')
+    paginator = EstimatedCountPaginator
+    # Без второго COUNT(*) по всей таблице для надписи "всего" при поиске и фильтрах
+    show_full_result_count = False
+
     fieldsets = (
         (None, {
             'fields': (
@@ -0,0 +1,166 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import redis
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+import exceptions
+
+logger = logging.getLogger(__name__)
+
+# KEYS - тройки (счетчик попыток, блокировка, серия блокировок) для идентификатора и IP, затем ключ статистики
+# ARGV[1] - USER_LOGIN_ATTEMPTS_WINDOW_SECONDS, ARGV[2] - USER_LOGIN_LOCKOUT_SECONDS,
+# ARGV[3] - USER_LOGIN_LOCKOUT_MAX_SECONDS, ARGV[4...] - лимит попыток для каждой тройки ключей
+# Возвращает 0 если попытка допущена, иначе сколько секунд ждать до следующей попытки.
+# Каждая следующая блокировка в серии вдвое длиннее предыдущей
+ATTEMPT_SCRIPT = """
+local window = tonumber(ARGV[1])
+local lockout = tonumber(ARGV[2])
+local max_lockout = tonumber(ARGV[3])
+local stats_key = KEYS[#KEYS]
+
+local wait = 0
+for i = 1, #KEYS - 1, 3 do
+    wait = math.max(wait, redis.call('TTL', KEYS[i + 1]))
+end
+if wait > 0 then
+    redis.call('HINCRBY', stats_key, 'rejected', 1)
+    return wait
+end
+
+local limit_index = 4
+for i = 1, #KEYS - 1, 3 do
+    local limit = tonumber(ARGV[limit_index])
+    limit_index = limit_index + 1
+    local count = redis.call('INCR', KEYS[i])
+    if count == 1 then
+        redis.call('EXPIRE', KEYS[i], window)
+    end
+
+    if count > limit then
+        local strikes = redis.call('INCR', KEYS[i + 2])
+        redis.call('EXPIRE', KEYS[i + 2], max_lockout * 2)
+        local seconds = math.floor(math.min(lockout * 2 ^ (strikes - 1), max_lockout))
+        redis.call('SET', KEYS[i + 1], 1, 'EX', seconds)
+        redis.call('DEL', KEYS[i])
+        wait = math.max(wait, seconds)
+    end
+end
+
+redis.call('HINCRBY', stats_key, wait > 0 and 'rejected' or 'admitted', 1)
+return wait
+"""
+
+
+class LoginAttemptLimiter:
+    """
+    Ограничение попыток входа по идентификатору (email или телефон) и по IP.
+    Проверка и учет попытки выполняются одним скриптом redis до обращения к БД и проверки пароля,
+    заблокированные попытки не увеличивают счетчики. Успешный вход сбрасывает счетчики идентификатора
+    """
+
+    stats_key = 'user:login_attempts:stats'
+
+    def __init__(self):
+        self.redis = self.get_client()
+        self.attempt_script = self.redis.register_script(ATTEMPT_SCRIPT)
+
+    def get_client(self) -> redis.Redis:
+        return redis.Redis.from_url(settings.USER_REDIS_URL, decode_responses=True)
+
+    @staticmethod
+    def keys(scope: str, value: str) -> list:
+        key = f'user:login_attempts:{scope}:{value}'
+        return [key, f'{key}:lock', f'{key}:strikes']
+
+    def hit(self, identifier: str, ip: Optional[str] = None):
+        """
+        Учет попытки входа
+
+        :param identifier: Email в нижнем регистре или номер телефона в формате E164
+        :param ip: IP адрес клиента, None - ограничение только по идентификатору
+        :raise exceptions.LoginAttemptsExceeded: Попытка отклонена
+        """
+
+        keys = self.keys('identifier', identifier)
+        limits = [settings.USER_LOGIN_ATTEMPTS_PER_IDENTIFIER]
+        if ip:
+            keys += self.keys('ip', ip)
+            limits.append(settings.USER_LOGIN_ATTEMPTS_PER_IP)
+
+        wait_seconds = self.attempt_script(
+            keys=[*keys, self.stats_key],
+            args=[
+                settings.USER_LOGIN_ATTEMPTS_WINDOW_SECONDS,
+                settings.USER_LOGIN_LOCKOUT_SECONDS,
+                settings.USER_LOGIN_LOCKOUT_MAX_SECONDS,
+                *limits,
+            ]
+        )
+        if wait_seconds:
+            raise exceptions.LoginAttemptsExceeded(int(wait_seconds))
+
+    def reset(self, identifier: str):
+        """
+        Сброс счетчиков и блокировки идентификатора
+        """
+
+        self.redis.delete(*self.keys('identifier', identifier))
+
+    def reset_ip(self, ip: str):
+        self.redis.delete(*self.keys('ip', ip))
+
+    def stats(self) -> dict:
+        """
+        Количество допущенных и отклоненных попыток входа
+        """
+
+        counters = self.redis.hgetall(self.stats_key)
+        return {name: int(counters.get(name, 0)) for name in ('admitted', 'rejected')}
+
+
+@lru_cache(maxsize=None)
+def get_login_attempt_limiter() -> Optional[LoginAttemptLimiter]:
+    """
+    Ограничитель, заданный в settings.USER_LOGIN_LIMITER, None если ограничение отключено
+    """
+
+    return import_string(settings.USER_LOGIN_LIMITER)() if settings.USER_LOGIN_LIMITER else None
+
+
+@receiver(setting_changed)
+def reset_login_attempt_limiter(setting, **kwargs):
+    if setting.startswith('USER_LOGIN_') or setting == 'USER_REDIS_URL':
+        get_login_attempt_limiter.cache_clear()
+
+
+def hit_login_attempt(identifier: str, ip: Optional[str] = None):
+    """
+    Учет попытки входа, при недоступном redis попытка допускается
+
+    :raise exceptions.LoginAttemptsExceeded: Попытка отклонена
+    """
+
+    limiter = get_login_attempt_limiter()
+    if limiter is None:
+        return
+
+    try:
+        limiter.hit(identifier, ip)
+    except redis.RedisError as e:
+        logger.warning(f'Ограничитель попыток входа недоступен: {e}')
+
+
+def reset_login_attempts(identifier: str):
+    limiter = get_login_attempt_limiter()
+    if limiter is None:
+        return
+
+    try:
+        limiter.reset(identifier)
+    except redis.RedisError as e:
+        logger.warning(f'Не удалось сбросить счетчик попыток входа: {e}')
@@ -0,0 +1,83 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from user.claims import UserClaims, get_user_claims
+from user.models import User
+from user.revocation import is_token_revoked
+
+
+class ClaimsUser:
+    """
+    Пользователь из подписанных claims access токена.
+    Модель User загружается одним запросом при первом обращении к атрибуту, которого нет в claims,
+    присвоение атрибутов тоже передается в модель
+    """
+
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, token, claims: UserClaims):
+        self.__dict__.update(
+            token=token,
+            id=token[api_settings.USER_ID_CLAIM],
+            is_active=claims.is_active,
+            token_version=claims.token_version,
+            group_names=frozenset(claims.groups),
+            user=None,
+        )
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_user(self) -> User:
+        if self.user is None:
+            self.__dict__['user'] = User.objects.get(pk=self.id)
+        return self.user
+
+    def __getattr__(self, name):
+        return getattr(self.get_user(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get_user(), name, value)
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return f'ClaimsUser {self.pk}'
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по access токену без запроса к таблице user:
+    is_active и версия токенов проверяются по кешу claims пользователя.
+    Группы тоже берутся из кеша claims, что бы изменение групп действовало до истечения токена.
+    Отзыв токена при выходе проверяется по локальной копии списка отозванных токенов
+    """
+
+    def get_user(self, validated_token) -> ClaimsUser:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        claims = get_user_claims(user_id)
+        if claims is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not claims.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if validated_token.get('token_version', 0) != claims.token_version:
+            raise AuthenticationFailed(_('Token is invalid or expired'), code='token_not_valid')
+
+        if is_token_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise AuthenticationFailed(_('Token is invalid or expired'), code='token_not_valid')
+
+        return ClaimsUser(validated_token, claims)
@@ -0,0 +1,328 @@
+import hashlib
+import logging
+import math
+import time
+from datetime import timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+import redis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+# KEYS - битовые массивы фильтра, первый записывается всегда, остальные только если уже существуют
+# (во время перестроения в новый фильтр попадают пользователи, созданные после начала перестроения)
+# ARGV - номера битов
+ADD_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if i == 1 or redis.call('EXISTS', key) == 1 then
+        for _, offset in ipairs(ARGV) do
+            redis.call('SETBIT', key, offset, 1)
+        end
+    end
+end
+return 1
+"""
+
+# KEYS[1] - битовый массив фильтра, KEYS[2] - параметры фильтра, KEYS[3] - счетчики проверок
+# ARGV[1] - размер фильтра в битах, ARGV[2] - количество хеш-функций, ARGV[3..] - номера битов
+# Возвращает -1 если фильтр не построен с такими параметрами, 0 если значения точно нет, 1 если значение возможно есть
+CHECK_SCRIPT = """
+local params = redis.call('HMGET', KEYS[2], 'size', 'hashes')
+if params[1] ~= ARGV[1] or params[2] ~= ARGV[2] then
+    return -1
+end
+
+for i = 3, #ARGV do
+    if redis.call('GETBIT', KEYS[1], ARGV[i]) == 0 then
+        redis.call('HINCRBY', KEYS[3], 'negatives', 1)
+        return 0
+    end
+end
+
+redis.call('HINCRBY', KEYS[3], 'positives', 1)
+return 1
+"""
+
+
+class UserBloomFilter:
+    """
+    Фильтр Блума email и телефонов пользователей в redis, общий для всех процессов.
+    Отрицательный ответ точный - пользователя нет, положительный нужно проверить запросом к БД.
+
+    Фильтр пополняется по post_save пользователя, удаленные пользователи и старые email/телефоны
+    остаются в фильтре до перестроения и дают только ложноположительные ответы.
+    Изменения в обход save (bulk_create, update) нужно добавлять через add.
+    Если значение не удалось добавить, фильтр отмечается непостроенным до следующего перестроения,
+    иначе он дал бы ложноотрицательный ответ. Если не удалась и отметка, ее повторяет вызывающий код
+    """
+
+    key = 'user:bloom'
+    new_key = 'user:bloom:new'
+    meta_key = 'user:bloom:meta'
+    stats_key = 'user:bloom:stats'
+    lock_key = 'user:bloom:lock'
+
+    def __init__(self):
+        self.redis = self.get_client()
+        self.add_script = self.redis.register_script(ADD_SCRIPT)
+        self.check_script = self.redis.register_script(CHECK_SCRIPT)
+        # Добавление не удалось, а отметить фильтр непостроенным еще не получилось
+        self.dirty = False
+
+        capacity = settings.USER_BLOOM_CAPACITY
+        error_rate = settings.USER_BLOOM_ERROR_RATE
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+
+    def get_client(self) -> redis.Redis:
+        return redis.Redis.from_url(settings.USER_REDIS_URL, decode_responses=True)
+
+    def offsets(self, value: str) -> List[int]:
+        """
+        Номера битов значения, двойное хеширование по blake2b
+        """
+
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, values: Iterable[str], keys: List[str] = None, client: redis.Redis = None):
+        """
+        Добавление email и телефонов в фильтр
+
+        :param values: Email и номера телефонов в формате E164, None пропускаются
+        :param keys: Битовые массивы, по умолчанию текущий и перестраиваемый фильтр
+        :param client: Клиент redis, например pipeline
+        """
+
+        offsets = sorted({offset for value in values if value for offset in self.offsets(str(value))})
+        if offsets:
+            self.add_script(keys=keys or [self.key, self.new_key], args=offsets, client=client)
+
+    def might_exist(self, value: str) -> Optional[bool]:
+        """
+        Проверка значения по фильтру
+
+        :return: False если значения точно нет, True если возможно есть, None если фильтр не построен
+        """
+
+        if self.dirty:
+            self.mark_dirty()
+            return None
+
+        result = self.check_script(
+            keys=[self.key, self.meta_key, self.stats_key],
+            args=[self.size, self.hashes, *self.offsets(str(value))]
+        )
+        return None if result == -1 else bool(result)
+
+    def mark_dirty(self):
+        """
+        Отметка фильтра непостроенным: после удаления параметров фильтра проверки во всех процессах
+        отвечают None до следующего перестроения. Если удалить параметры не удалось, None отвечают только
+        проверки этого процесса, каждая из них повторяет отметку
+
+        :raise redis.RedisError: Параметры фильтра не удалены
+        """
+
+        self.dirty = True
+        self.redis.delete(self.meta_key)
+        self.dirty = False
+
+    def is_built(self) -> bool:
+        return bool(self.redis.exists(self.meta_key))
+
+    def record_false_positive(self):
+        self.redis.hincrby(self.stats_key, 'false_positives', 1)
+
+    def rebuild(self, batch_size: int = None) -> dict:
+        """
+        Построение нового фильтра потоковым чтением пользователей и замена им текущего.
+        Пользователи, созданные во время чтения, попадают в новый фильтр по post_save и
+        повторным чтением созданных за USER_BLOOM_REBUILD_CATCHUP_SECONDS до начала перестроения
+
+        :param batch_size: Количество пользователей в одной пачке, по умолчанию USER_BLOOM_REBUILD_BATCH_SIZE
+        :return: Метрики перестроения, пустой словарь если перестроение уже выполняется
+        """
+
+        lock = self.redis.lock(self.lock_key, timeout=settings.USER_BLOOM_REBUILD_LOCK_SECONDS)
+        if not lock.acquire(blocking=False):
+            return {}
+
+        try:
+            return self.build(batch_size)
+        finally:
+            lock.release()
+
+    def build(self, batch_size: int = None) -> dict:
+        batch_size = batch_size or settings.USER_BLOOM_REBUILD_BATCH_SIZE
+        started_at = time.monotonic()
+        catchup_from = timezone.now() - timedelta(seconds=settings.USER_BLOOM_REBUILD_CATCHUP_SECONDS)
+
+        self.redis.delete(self.new_key)
+        self.redis.setbit(self.new_key, self.size - 1, 0)
+
+        items = self.add_users(User.objects.all(), batch_size)
+        self.add_users(User.objects.filter(created_at__gte=catchup_from), batch_size)
+
+        metrics = {
+            'items': items,
+            'size': self.size,
+            'hashes': self.hashes,
+            'built_at': timezone.now().isoformat(),
+            'seconds': round(time.monotonic() - started_at, 3),
+        }
+
+        pipeline = self.redis.pipeline()
+        pipeline.rename(self.new_key, self.key)
+        pipeline.delete(self.meta_key, self.stats_key)
+        pipeline.hset(self.meta_key, mapping=metrics)
+        pipeline.execute()
+
+        logger.info(f'Фильтр Блума пользователей перестроен: {metrics}')
+
+        return metrics
+
+    def add_users(self, queryset, batch_size: int) -> int:
+        """
+        Потоковое добавление пользователей в перестраиваемый фильтр, по пачке на запрос к redis
+
+        :return: Количество пользователей
+        """
+
+        users = queryset.order_by().values_list('email', 'phone').iterator(chunk_size=batch_size)
+
+        count = 0
+        pipeline = self.redis.pipeline(transaction=False)
+        for count, (email, phone) in enumerate(users, start=1):
+            self.add([email, phone], keys=[self.new_key], client=pipeline)
+            if count % batch_size == 0:
+                pipeline.execute()
+        pipeline.execute()
+
+        return count
+
+    def stats(self) -> dict:
+        """
+        Параметры последнего перестроения и счетчики проверок с момента перестроения.
+        false_positive_rate - доля ложноположительных ответов среди значений, которых нет в БД
+        """
+
+        meta = self.redis.hgetall(self.meta_key)
+        counters = {name: int(value) for name, value in self.redis.hgetall(self.stats_key).items()}
+        negatives, false_positives = counters.get('negatives', 0), counters.get('false_positives', 0)
+
+        fill_ratio = self.redis.bitcount(self.key) / self.size if meta else 0
+        return {
+            **meta,
+            'positives': counters.get('positives', 0),
+            'negatives': negatives,
+            'false_positives': false_positives,
+            'fill_ratio': round(fill_ratio, 6),
+            'expected_false_positive_rate': round(fill_ratio ** self.hashes, 6),
+            'false_positive_rate': round(false_positives / (negatives + false_positives), 6)
+            if negatives + false_positives else 0,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_user_bloom() -> Optional[UserBloomFilter]:
+    """
+    Фильтр Блума, заданный в settings.USER_BLOOM_FILTER, None если фильтр отключен
+    """
+
+    return import_string(settings.USER_BLOOM_FILTER)() if settings.USER_BLOOM_FILTER else None
+
+
+@receiver(setting_changed)
+def reset_user_bloom(setting, **kwargs):
+    if setting.startswith('USER_BLOOM_') or setting == 'USER_REDIS_URL':
+        get_user_bloom.cache_clear()
+
+
+def add_to_user_bloom(values: List[str]):
+    """
+    Добавление email и телефонов в фильтр Блума. Если значения не удалось добавить, фильтр отмечается
+    непостроенным, его перестроит task_build_missing_user_bloom
+
+    :param values: Email и номера телефонов в формате E164, None пропускаются
+    :raise redis.RedisError: Не удалось ни добавить значения, ни отметить фильтр непостроенным,
+        другие процессы могут дать ложноотрицательный ответ
+    """
+
+    bloom = get_user_bloom()
+    if bloom is None:
+        return
+
+    try:
+        bloom.add(values)
+    except redis.RedisError as e:
+        logger.error(f'Не удалось добавить значения в фильтр Блума, фильтр отключен до перестроения: {e}')
+        bloom.mark_dirty()
+
+
+def might_exist(value: str) -> Optional[bool]:
+    """
+    Проверка по фильтру Блума, при недоступности redis ответ как у непостроенного фильтра
+    """
+
+    bloom = get_user_bloom()
+    if bloom is None:
+        return None
+
+    try:
+        return bloom.might_exist(value)
+    except redis.RedisError as e:
+        logger.warning(f'Фильтр Блума пользователей недоступен: {e}')
+        return None
+
+
+def record_false_positive():
+    try:
+        get_user_bloom().record_false_positive()
+    except redis.RedisError as e:
+        logger.warning(f'Фильтр Блума пользователей недоступен: {e}')
+
+
+def user_exists(user_filter_data: dict) -> bool:
+    """
+    Есть ли пользователь с email или телефоном. Если фильтр Блума отвечает, что значения нет,
+    запрос к БД не выполняется
+
+    :param user_filter_data: {'email': example@mail.ru} или {'phone': '+7xxxxxxxxxx'}
+    """
+
+    maybe_exists = might_exist(*user_filter_data.values())
+    if maybe_exists is False:
+        return False
+
+    exists = User.objects.filter(**user_filter_data).exists()
+    if maybe_exists and not exists:
+        record_false_positive()
+
+    return exists
+
+
+async def auser_exists(user_filter_data: dict) -> bool:
+    """
+    Асинхронная версия user_exists
+    """
+
+    maybe_exists = await sync_to_async(might_exist, thread_sensitive=False)(*user_filter_data.values())
+    if maybe_exists is False:
+        return False
+
+    exists = await User.objects.filter(**user_filter_data).aexists()
+    if maybe_exists and not exists:
+        await sync_to_async(record_false_positive, thread_sensitive=False)()
+
+    return exists
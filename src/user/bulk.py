@@ -0,0 +1,237 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+import exceptions
+from confirm.choices import PhoneRegion
+from confirm.utils import normalization_phone_number
+from user.bloom import add_to_user_bloom
+from user.hashing import WORKER_SETTINGS, init_worker
+from user.models import User
+from user.utils import base_group_id_cache
+
+
+def get_value(row: dict, name: str, field: Optional[str] = None) -> str:
+    """
+    Значение поля строки импорта строкой: числа (например, телефон в JSON без кавычек) приводятся к строке
+
+    :param row: Данные строки
+    :param name: Имя поля в строке
+    :param field: Поле User, по max_length которого проверяется длина значения
+    :raise ValueError: Значение не строка и не число или длиннее поля модели
+    """
+
+    value = row.get(name)
+    if value is None:
+        return ''
+
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f'Некорректное значение поля {name}')
+
+    value = str(value)
+    if field is not None:
+        max_length = User._meta.get_field(field).max_length
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(f'Значение поля {name} длиннее {max_length} символов')
+
+    return value
+
+
+def normalize_row(row: Union[dict, str], region: str = PhoneRegion.RUSSIAN) -> dict:
+    """
+    Данные пользователя из строки импорта: email в нижнем регистре, телефон в формате E164.
+    Пароль передается в открытом виде в password или готовым хешем в формате поля User.password в password_hash
+
+    :param row: Данные строки
+    :param region: Регион для номеров телефонов без кода страны, если в строке не указан region
+    :raise ValueError: Строка не распознана или содержит некорректные данные
+    """
+
+    if not isinstance(row, dict):
+        raise ValueError('Строка не распознана')
+
+    email = get_value(row, 'email').strip().lower() or None
+    if email is not None:
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValueError('Некорректный email')
+        if len(email) > User._meta.get_field('email').max_length:
+            raise ValueError('Некорректный email')
+
+    phone = get_value(row, 'phone').strip() or None
+    if phone is not None:
+        try:
+            phone = normalization_phone_number(phone, get_value(row, 'region') or region)
+        except exceptions.IncorrectPhone:
+            raise ValueError('Некорректный номер телефона')
+
+    if email is None and phone is None:
+        raise ValueError('Не указан email или номер телефона')
+
+    password_hash = get_value(row, 'password_hash', 'password') or None
+    if password_hash is not None:
+        try:
+            hashers.identify_hasher(password_hash)
+        except ValueError:
+            raise ValueError('Неизвестный формат хеша пароля')
+
+    return {
+        'email': email,
+        'phone': phone,
+        'password': get_value(row, 'password') or None,
+        'password_hash': password_hash,
+        'first_name': get_value(row, 'first_name', 'first_name'),
+        'last_name': get_value(row, 'last_name', 'last_name'),
+    }
+
+
+class UserImporter:
+    """
+    Массовое создание пользователей в обход регистрации.
+    Пароли пачки хешируются параллельно в отдельном пуле процессов, пул хеширования запросов не занимается.
+    Пачка вставляется одним bulk_create, существующие email и телефоны пропускаются по уникальным индексам,
+    членство в группе UserGroup.BASE добавляется одной вставкой в промежуточную таблицу.
+    Сигналы post_save не вызываются, поэтому email и телефоны добавляются в фильтр Блума явно,
+    в том числе пропущенных пользователей: при повторе пачки после ошибки фильтра они уже созданы
+    """
+
+    def __init__(self, workers: int = 0, region: str = PhoneRegion.RUSSIAN):
+        self.region = region
+        self.workers = workers
+        self.executor = None
+        if workers:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=({name: getattr(settings, name) for name in WORKER_SETTINGS},)
+            )
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def hash_passwords(self, passwords: List[str]) -> List[str]:
+        if self.executor is None or not passwords:
+            return [hashers.make_password(password) for password in passwords]
+
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self.executor.map(hashers.make_password, passwords, chunksize=chunksize))
+
+    def import_chunk(self, chunk: List[Tuple[int, Union[dict, str]]]) -> dict:
+        """
+        Создание пользователей из пачки строк
+
+        :param chunk: Список пар (номер строки, данные строки)
+        :return: Количество созданных и пропущенных пользователей, ошибки по строкам
+        :raise redis.RedisError: Пачка зафиксирована, но не добавлена в фильтр Блума и фильтр не отмечен
+            непостроенным, пачку нужно импортировать повторно
+        """
+
+        errors = []
+        rows = []
+        for number, row in chunk:
+            try:
+                rows.append(normalize_row(row, self.region))
+            except ValueError as e:
+                errors.append({'row': number, 'error': str(e)})
+
+        plain_rows = [data for data in rows if data['password'] and not data['password_hash']]
+        for data, encoded in zip(plain_rows, self.hash_passwords([data['password'] for data in plain_rows])):
+            data['password_hash'] = encoded
+
+        users = [
+            User(
+                email=data['email'],
+                phone=data['phone'],
+                password=data['password_hash'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+            )
+            for data in rows
+        ]
+
+        created = []
+        if users:
+            with transaction.atomic():
+                User.objects.bulk_create(users, ignore_conflicts=True)
+                # При ignore_conflicts id не возвращаются, созданных пользователей находим по сгенерированному username
+                created = list(
+                    User.objects.filter(username__in=[user.username for user in users])
+                    .values_list('id', 'email', 'phone')
+                )
+
+                group_id = base_group_id_cache.get()
+                through = User.groups.through
+                through.objects.bulk_create(
+                    [through(user_id=user_id, group_id=group_id) for user_id, _, _ in created],
+                    ignore_conflicts=True
+                )
+
+        add_to_user_bloom([value for user in users for value in (user.email, user.phone)])
+
+        return {
+            'created': len(created),
+            'skipped': len(users) - len(created),
+            'errors': errors,
+        }
+
+
+def import_users(
+        rows: Iterable[Union[dict, str]], chunk_size: int = None, start_row: int = 0,
+        workers: int = 0, region: str = PhoneRegion.RUSSIAN
+) -> Iterator[dict]:
+    """
+    Потоковый импорт пользователей по пачкам, каждая пачка фиксируется отдельной транзакцией
+
+    :param rows: Данные строк
+    :param chunk_size: Размер пачки, по умолчанию USER_IMPORT_CHUNK_SIZE
+    :param start_row: Номер последней строки, импортированной ранее, строки до него включительно пропускаются
+    :param workers: Количество процессов хеширования паролей, 0 - хеширование в текущем процессе
+    :param region: Регион для номеров телефонов без кода страны
+    :return: Результат по каждой пачке с номером ее последней строки, по мере фиксации пачек
+    :raise redis.RedisError: Пачка не добавлена в фильтр Блума, см. UserImporter.import_chunk
+    """
+
+    chunk_size = chunk_size or settings.USER_IMPORT_CHUNK_SIZE
+    rows = islice(enumerate(rows, start=1), start_row, None)
+
+    importer = UserImporter(workers, region)
+    try:
+        while chunk := list(islice(rows, chunk_size)):
+            yield {'row': chunk[-1][0], 'rows': len(chunk), **importer.import_chunk(chunk)}
+    finally:
+        importer.close()
+
+
+def read_checkpoint(path: str) -> Optional[dict]:
+    """
+    Состояние прерванного импорта, None если импорт начинается с начала
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def write_checkpoint(path: str, checkpoint: dict):
+    """
+    Запись состояния импорта через временный файл, что бы прерывание не оставило файл записанным наполовину
+    """
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(checkpoint, file)
+    os.replace(tmp_path, path)
@@ -0,0 +1,145 @@
+import json
+import logging
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+import redis
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] - поколение кеша пользователя, KEYS[2] - данные пользователя
+# ARGV[1] - поколение, прочитанное до загрузки из БД, ARGV[2] - данные, ARGV[3] - время жизни в секундах
+# Записывает данные, только если с момента чтения поколения кеш пользователя не сбрасывался
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class UserClaims(NamedTuple):
+    is_active: bool
+    token_version: int
+    groups: List[str]
+
+
+def load_user_claims(user_id: int) -> Optional[UserClaims]:
+    """
+    Данные пользователя для claims токена из БД
+
+    :return: Данные пользователя, None если пользователя нет
+    """
+
+    user = User.objects.filter(pk=user_id).values_list('is_active', 'token_version').first()
+    if user is None:
+        return None
+
+    groups = list(Group.objects.filter(user__id=user_id).values_list('name', flat=True))
+    return UserClaims(*user, groups)
+
+
+class ClaimsCache:
+    """
+    Кеш данных пользователя для claims токена в redis: is_active, версия токенов и группы.
+    Проверка токена при аутентификации читает этот кеш, а не таблицу user.
+    Сброс увеличивает поколение кеша пользователя, промах записывает загруженные из БД данные,
+    только если поколение не изменилось, поэтому данные, прочитанные до сброса, в кеш не попадают
+    """
+
+    def __init__(self):
+        self.redis = self.get_client()
+        self.set_if_generation_script = self.redis.register_script(SET_IF_GENERATION_SCRIPT)
+
+    def get_client(self) -> redis.Redis:
+        return redis.Redis.from_url(settings.USER_REDIS_URL, decode_responses=True)
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f'user:claims:{user_id}'
+
+    @staticmethod
+    def generation_key(user_id: int) -> str:
+        return f'user:claims:generation:{user_id}'
+
+    def get(self, user_id: int) -> Optional[UserClaims]:
+        data, generation = self.redis.mget(self.key(user_id), self.generation_key(user_id))
+        if data is not None:
+            return UserClaims(*json.loads(data))
+
+        claims = load_user_claims(user_id)
+        if claims is not None:
+            self.set_if_generation_script(
+                keys=[self.generation_key(user_id), self.key(user_id)],
+                args=[generation or '0', json.dumps(claims), settings.USER_CLAIMS_TTL_SECONDS]
+            )
+
+        return claims
+
+    def invalidate(self, user_id: int):
+        # Поколение живет столько же, сколько данные, сброс во время загрузки из БД не теряется с его истечением
+        pipeline = self.redis.pipeline()
+        pipeline.incr(self.generation_key(user_id))
+        pipeline.expire(self.generation_key(user_id), settings.USER_CLAIMS_TTL_SECONDS)
+        pipeline.delete(self.key(user_id))
+        pipeline.execute()
+
+
+@lru_cache(maxsize=None)
+def get_claims_cache() -> Optional[ClaimsCache]:
+    """
+    Кеш, заданный в settings.USER_CLAIMS_CACHE, None если кеш отключен
+    """
+
+    return import_string(settings.USER_CLAIMS_CACHE)() if settings.USER_CLAIMS_CACHE else None
+
+
+@receiver(setting_changed)
+def reset_claims_cache(setting, **kwargs):
+    if setting.startswith('USER_CLAIMS_') or setting == 'USER_REDIS_URL':
+        get_claims_cache.cache_clear()
+
+
+def get_user_claims(user_id: int) -> Optional[UserClaims]:
+    """
+    Данные пользователя для claims токена, при отключенном или недоступном кеше - из БД
+    """
+
+    cache = get_claims_cache()
+    if cache is not None:
+        try:
+            return cache.get(user_id)
+        except redis.RedisError as e:
+            logger.warning(f'Кеш claims пользователей недоступен: {e}')
+
+    return load_user_claims(user_id)
+
+
+def invalidate_user_claims(user_id: int):
+    cache = get_claims_cache()
+    if cache is None:
+        return
+
+    try:
+        cache.invalidate(user_id)
+    except redis.RedisError as e:
+        logger.error(f'Не удалось сбросить кеш claims пользователя {user_id}: {e}')
+
+
+def revoke_user_tokens(user_id: int):
+    """
+    Отзыв всех выданных пользователю токенов увеличением версии токенов
+    """
+
+    User.objects.filter(pk=user_id).update(token_version=F('token_version') + 1)
+    transaction.on_commit(lambda: invalidate_user_claims(user_id))
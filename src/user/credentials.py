@@ -0,0 +1,195 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import redis
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] - множество ключей учетных данных пользователя, KEYS[2] - поколение кеша
+# Удаляет все ключи, по которым кешировались учетные данные пользователя, в том числе по старым email и телефону,
+# и увеличивает поколение кеша
+INVALIDATE_SCRIPT = """
+local keys = redis.call('SMEMBERS', KEYS[1])
+for _, key in ipairs(keys) do
+    redis.call('DEL', key)
+end
+redis.call('DEL', KEYS[1])
+redis.call('INCR', KEYS[2])
+return #keys
+"""
+
+# KEYS[1] - поколение кеша, KEYS[2] - учетные данные, KEYS[3] - множество ключей учетных данных пользователя
+# ARGV[1] - поколение, прочитанное до загрузки из БД, ARGV[2] - учетные данные, ARGV[3] - время жизни в секундах
+# Записывает учетные данные, только если с момента чтения поколения кеш не сбрасывался
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('SADD', KEYS[3], KEYS[2])
+redis.call('EXPIRE', KEYS[3], ARGV[3])
+return 1
+"""
+
+
+class Credentials(NamedTuple):
+    user_id: int
+    password: Optional[str]
+    is_active: bool
+
+
+class CredentialsCache:
+    """
+    Кеш учетных данных для входа по email или номеру телефона: redis и локальный кеш процесса.
+    Сброс по пользователю удаляет данные в redis и в локальном кеше текущего процесса,
+    в других процессах локальные данные живут не дольше USER_CREDENTIALS_LOCAL_TTL_SECONDS.
+    Промах записывает загруженные из БД данные, только если с момента чтения поколения кеша не было сброса.
+    Пользователь неизвестен до запроса к БД, поэтому поколение общее для всех пользователей:
+    сброс, совпавший с загрузкой, только пропускает запись в кеш, а сбросы редки
+    """
+
+    def __init__(self):
+        self.redis = self.get_client()
+        self.invalidate_script = self.redis.register_script(INVALIDATE_SCRIPT)
+        self.set_if_generation_script = self.redis.register_script(SET_IF_GENERATION_SCRIPT)
+        self.lock = threading.Lock()
+        self.local = OrderedDict()
+
+    def get_client(self) -> redis.Redis:
+        return redis.Redis.from_url(settings.USER_REDIS_URL, decode_responses=True)
+
+    @staticmethod
+    def key(field: str, value: str) -> str:
+        return f'user:credentials:{field}:{value}'
+
+    @staticmethod
+    def user_key(user_id: int) -> str:
+        return f'user:credentials:user:{user_id}'
+
+    generation_key = 'user:credentials:generation'
+
+    def get(self, field: str, value: str) -> Optional[Credentials]:
+        """
+        Учетные данные пользователя, при промахе одним запросом к БД
+
+        :param field: email или phone
+        :param value: Email в нижнем регистре или номер телефона в формате E164
+        :return: Учетные данные, None если пользователя нет
+        """
+
+        key = self.key(field, value)
+
+        credentials = self.get_local(key)
+        if credentials is not None:
+            return credentials
+
+        data, generation = self.redis.mget(key, self.generation_key)
+        if data is not None:
+            credentials = Credentials(*json.loads(data))
+            self.set_local(key, credentials)
+            return credentials
+
+        credentials = User.objects.filter(**{field: value}).values_list('id', 'password', 'is_active').first()
+        if credentials is None:
+            return None
+
+        credentials = Credentials(*credentials)
+        is_set = self.set_if_generation_script(
+            keys=[self.generation_key, key, self.user_key(credentials.user_id)],
+            args=[generation or '0', json.dumps(credentials), settings.USER_CREDENTIALS_TTL_SECONDS]
+        )
+        if is_set:
+            self.set_local(key, credentials)
+
+        return credentials
+
+    def get_local(self, key: str) -> Optional[Credentials]:
+        with self.lock:
+            item = self.local.get(key)
+            if item is None:
+                return None
+
+            expires_at, credentials = item
+            if expires_at < time.monotonic():
+                del self.local[key]
+                return None
+
+            return credentials
+
+    def set_local(self, key: str, credentials: Credentials):
+        with self.lock:
+            self.local[key] = (time.monotonic() + settings.USER_CREDENTIALS_LOCAL_TTL_SECONDS, credentials)
+            self.local.move_to_end(key)
+            while len(self.local) > settings.USER_CREDENTIALS_LOCAL_MAX_SIZE:
+                self.local.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """
+        Сброс всех закешированных учетных данных пользователя
+        """
+
+        with self.lock:
+            for key in [key for key, (_, credentials) in self.local.items() if credentials.user_id == user_id]:
+                del self.local[key]
+
+        self.invalidate_script(keys=[self.user_key(user_id), self.generation_key])
+
+
+@lru_cache(maxsize=None)
+def get_credentials_cache() -> Optional[CredentialsCache]:
+    """
+    Кеш, заданный в settings.USER_CREDENTIALS_CACHE, None если кеш отключен
+    """
+
+    return import_string(settings.USER_CREDENTIALS_CACHE)() if settings.USER_CREDENTIALS_CACHE else None
+
+
+@receiver(setting_changed)
+def reset_credentials_cache(setting, **kwargs):
+    if setting.startswith('USER_CREDENTIALS_') or setting == 'USER_REDIS_URL':
+        get_credentials_cache.cache_clear()
+
+
+def get_credentials(field: str, value: str) -> Optional[Credentials]:
+    """
+    Учетные данные для входа, при отключенном или недоступном кеше - запросом к БД
+
+    :param field: email или phone
+    :param value: Email в нижнем регистре или номер телефона в формате E164
+    """
+
+    cache = get_credentials_cache()
+    if cache is not None:
+        try:
+            return cache.get(field, value)
+        except redis.RedisError as e:
+            logger.warning(f'Кеш учетных данных недоступен: {e}')
+
+    credentials = User.objects.filter(**{field: value}).values_list('id', 'password', 'is_active').first()
+    return Credentials(*credentials) if credentials is not None else None
+
+
+def invalidate_credentials(user_id: int):
+    """
+    Сброс закешированных учетных данных пользователя
+    """
+
+    cache = get_credentials_cache()
+    if cache is None:
+        return
+
+    try:
+        cache.invalidate(user_id)
+    except redis.RedisError as e:
+        logger.error(f'Не удалось сбросить кеш учетных данных пользователя {user_id}: {e}')
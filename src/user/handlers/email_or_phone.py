@@ -1,37 +1,43 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
 import exceptions
 from confirm.choices import TypeConfirm, ObjConfirm
 from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.storages import get_storage
 from user.models import User
 from uuid import UUID
 
 
 def change_email_or_phone(secret_code: UUID, user_change: User, object_confirm: ObjConfirm):
     """
-    Изменение у пользователя email или номера телефона после подтверждения
+    Изменение у пользователя email или номера телефона после подтверждения.
+    Объект подтверждения удаляется и пользователь обновляется в одной транзакции,
+    занятый email или номер определяет уникальный индекс, без отдельной проверки
 
     :param secret_code: Секретный код объекта подтверждения
     :param user_change: Пользователь, который выполняет запрос на смену
     :param object_confirm: Тип объекта подтверждения
     """
 
-    if object_confirm == ObjConfirm.EMAIL:
-        confirm_obj = ConfirmEmail.objects.get_confirmed(secret_code, TypeConfirm.CHANGE)
-        user_filter_data = {'email': confirm_obj.email}
-    else:
-        confirm_obj = ConfirmPhone.objects.get_confirmed(secret_code, TypeConfirm.CHANGE)
-        user_filter_data = {'phone': confirm_obj.phone}
-
-    if User.objects.filter(**user_filter_data).exists():
-        confirm_obj.delete()
+    model = ConfirmEmail if object_confirm == ObjConfirm.EMAIL else ConfirmPhone
+    field = model.identifier_field
+    old_values = getattr(user_change, field), user_change.updated_at
+
+    storage = get_storage()
+    try:
+        with transaction.atomic():
+            confirm_obj = storage.consume_confirmed(model, secret_code, TypeConfirm.CHANGE)
+            if getattr(confirm_obj, field) == old_values[0]:
+                # Уникальный индекс не отличает текущее значение пользователя от нового
+                raise exceptions.UserAlreadyExist
+
+            setattr(user_change, field, getattr(confirm_obj, field))
+            user_change.updated_at = timezone.now()
+            user_change.save(update_fields=[field, 'updated_at'])
+    except (IntegrityError, exceptions.UserAlreadyExist):
+        setattr(user_change, field, old_values[0])
+        user_change.updated_at = old_values[1]
+        # Удаление объекта подтверждения откатилось вместе с транзакцией
+        storage.delete(confirm_obj)
         raise exceptions.UserAlreadyExist
-
-    with transaction.atomic():
-        if isinstance(confirm_obj, ConfirmEmail):
-            user_change.email = confirm_obj.email
-        else:
-            user_change.phone = confirm_obj.phone
-
-        user_change.save()
-        confirm_obj.delete()
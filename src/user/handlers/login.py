@@ -1,49 +1,89 @@
-from user.models import User
+import logging
+from typing import Optional
+
 import exceptions
-from django.contrib.auth.hashers import check_password
-from user.utils import get_jwt_tokens
-from confirm.utils import normalization_phone_number
 from confirm.choices import PhoneRegion
+from confirm.utils import normalization_phone_number
+from user.attempts import hit_login_attempt, reset_login_attempts
+from user.credentials import Credentials, get_credentials, invalidate_credentials
+from user.hashing import make_password, verify_password
+from user.models import User
+from user.utils import get_jwt_tokens
 
+logger = logging.getLogger(__name__)
 
-def login_by_email(email: str, password: str) -> dict:
+
+def rehash_password(credentials: Credentials, password: str):
     """
-    Логин пользователя по email
-    :param email: Email пользователя
+    Пересчет хеша пароля по текущему профилю хеширования.
+    Хеш обновляется только если он не изменился с момента чтения учетных данных,
+    при занятом пуле хеширования пересчет откладывается до следующего входа
+    """
+
+    try:
+        encoded = make_password(password)
+    except exceptions.PasswordHashingBusy:
+        logger.info(f'Пересчет хеша пароля пользователя {credentials.user_id} отложен: пул хеширования занят')
+        return
+
+    updated = User.objects.filter(pk=credentials.user_id, password=credentials.password).update(password=encoded)
+    if updated:
+        invalidate_credentials(credentials.user_id)
+
+
+def login(field: str, value: str, password: str, ip: Optional[str] = None) -> dict:
+    """
+    Проверка пароля по учетным данным и выпуск jwt токенов без загрузки пользователя.
+    Попытка входа учитывается до обращения к БД и проверки пароля.
+    Хеш другого алгоритма или стоимости после успешной проверки пересчитывается по текущему профилю
+
+    :param field: email или phone
+    :param value: Email в нижнем регистре или номер телефона в формате E164
     :param password: Пароль пользователя
-    :return: Словарь содержащий jwt токены
+    :param ip: IP адрес клиента
     """
 
-    email = email.lower()
+    hit_login_attempt(value, ip)
 
-    user = User.objects.filter(email=email)
-    if not user.exists():
+    credentials = get_credentials(field, value)
+    if credentials is None or not credentials.is_active:
         raise exceptions.UserNotFound
-    user = user.get()
 
-    if not check_password(password, user.password):
+    is_correct, must_update = verify_password(password, credentials.password)
+    if not is_correct:
         raise exceptions.UserNotFound
 
-    return get_jwt_tokens(user)
+    if must_update:
+        rehash_password(credentials, password)
+
+    reset_login_attempts(value)
+    return get_jwt_tokens(User(id=credentials.user_id, is_active=credentials.is_active))
 
 
-def login_by_phone(phone: str, region: PhoneRegion, password: str) -> dict:
+def login_by_email(email: str, password: str, ip: Optional[str] = None) -> dict:
+    """
+    Логин пользователя по email
+    :param email: Email пользователя
+    :param password: Пароль пользователя
+    :param ip: IP адрес клиента
+    :return: Словарь содержащий jwt токены
+    """
+
+    email = email.lower()
+
+    return login('email', email, password, ip)
+
+
+def login_by_phone(phone: str, region: PhoneRegion, password: str, ip: Optional[str] = None) -> dict:
     """
     Логин пользователя по email
     :param phone: Номер телефона пользователя без кода страны
     :param region: Регион номера телефона ISO 3166-1 Alpha-2
     :param password: Пароль пользователя
+    :param ip: IP адрес клиента
     :return: Словарь содержащий jwt токены
     """
 
     phone = normalization_phone_number(phone, region)
 
-    user = User.objects.filter(phone=phone)
-    if not user.exists():
-        raise exceptions.UserNotFound
-    user = user.get()
-
-    if not check_password(password, user.password):
-        raise exceptions.UserNotFound
-
-    return get_jwt_tokens(user)
+    return login('phone', phone, password, ip)
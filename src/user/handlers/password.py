@@ -1,11 +1,14 @@
 from uuid import UUID
 
-from django.contrib.auth.hashers import make_password
 from django.db import transaction
 
 import exceptions
 from confirm.choices import TypeConfirm, ObjConfirm
 from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.storages import get_storage
+from user.claims import invalidate_user_claims
+from user.credentials import invalidate_credentials
+from user.hashing import make_password
 from user.models import User
 from user.utils import passwd_is_equal
 
@@ -26,7 +29,9 @@ def change_password(user: User, password: str, confirm_password: str):
 
 def change_password_by_confirm(secret_code: UUID, password: str, confirm_password: str, object_confirm: ObjConfirm):
     """
-    Изменение пароля, через объект подтверждения
+    Изменение пароля, через объект подтверждения.
+    Хеш вычисляется до запросов к БД, в транзакции только удаление объекта подтверждения
+    и обновление пароля, поэтому блокировка строки пользователя не ждет хеширования
 
     :param secret_code: Секретный код объекта подтверждения
     :param password: Пароль
@@ -35,19 +40,22 @@ def change_password_by_confirm(secret_code: UUID, password: str, confirm_passwor
     """
 
     passwd_is_equal(password, confirm_password)
+    encoded_password = make_password(password)
 
-    if object_confirm == ObjConfirm.EMAIL:
-        confirm_obj = ConfirmEmail.objects.get_confirmed(secret_code, TypeConfirm.RESET_PASS)
-        user_fiter_data = {'email': confirm_obj.email}
-    else:
-        confirm_obj = ConfirmPhone.objects.get_confirmed(secret_code, TypeConfirm.RESET_PASS)
-        user_fiter_data = {'phone': confirm_obj.phone}
-
-    user = User.objects.filter(**user_fiter_data)
-    if not user.exists():
-        confirm_obj.delete()
-        raise exceptions.UserNotFound
+    model = ConfirmEmail if object_confirm == ObjConfirm.EMAIL else ConfirmPhone
+    field = model.identifier_field
 
+    storage = get_storage()
     with transaction.atomic():
-        user.update(password=make_password(password))
-        confirm_obj.delete()
+        confirm_obj = storage.consume_confirmed(model, secret_code, TypeConfirm.RESET_PASS)
+        # Сброс пароля отзывает все выданные токены
+        user_id = User.objects.reset_password(field, getattr(confirm_obj, field), encoded_password)
+
+        if user_id is not None:
+            # UPDATE не вызывает post_save
+            transaction.on_commit(lambda: invalidate_credentials(user_id))
+            transaction.on_commit(lambda: invalidate_user_claims(user_id))
+
+    # Объект подтверждения удален и для ненайденного пользователя
+    if user_id is None:
+        raise exceptions.UserNotFound
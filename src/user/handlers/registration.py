@@ -1,14 +1,30 @@
 from uuid import UUID
 
-from django.contrib.auth.hashers import make_password
-from django.contrib.auth.models import Group
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 import exceptions
 from confirm.models import ConfirmEmail, ConfirmPhone
+from confirm.storages import get_storage
+from confirm.storages.base import BaseConfirmStorage
 from confirm.choices import TypeConfirm, ObjConfirm
-from user.models import User, UserGroup
-from user.utils import passwd_is_equal
+from user.hashing import make_password
+from user.models import User
+from user.utils import base_group_id_cache, passwd_is_equal
+
+
+def get_confirm_obj(storage: BaseConfirmStorage, secret_code: UUID, object_confirm: ObjConfirm) -> tuple:
+    """
+    Подтвержденный объект регистрации и данные пользователя из него
+
+    :return: (объект подтверждения, {'email': ...} или {'phone': ...})
+    """
+
+    if object_confirm == ObjConfirm.PHONE:
+        confirm_obj = storage.get_confirmed(ConfirmPhone, secret_code, TypeConfirm.REGISTRATION)
+        return confirm_obj, {'phone': confirm_obj.phone}
+
+    confirm_obj = storage.get_confirmed(ConfirmEmail, secret_code, TypeConfirm.REGISTRATION)
+    return confirm_obj, {'email': confirm_obj.email}
 
 
 def registration(secret_code: UUID, password: str, confirm_password: str, object_confirm: ObjConfirm):
@@ -20,27 +36,32 @@ def registration(secret_code: UUID, password: str, confirm_password: str, object
     :param confirm_password: Подтверждение пароля
     :param object_confirm: Тип объекта подтверждения
     """
+
     passwd_is_equal(password, confirm_password)
 
-    if object_confirm == ObjConfirm.PHONE:
-        confirm_obj = ConfirmPhone.objects.get_confirmed(secret_code, TypeConfirm.REGISTRATION)
-        user_data = {'phone': confirm_obj.phone}
-    else:
-        confirm_obj = ConfirmEmail.objects.get_confirmed(secret_code, TypeConfirm.REGISTRATION)
-        user_data = {'email': confirm_obj.email}
-
-    user = User.objects.filter(**user_data)
-    if user.exists():
-        confirm_obj.delete()
-        raise exceptions.UserAlreadyExist
-
-    base_group = Group.objects.get_or_create(name=UserGroup.BASE)[0]
-
-    with transaction.atomic():
-        user = User.objects.create(
-            password=make_password(password),
-            is_superuser=False,
-            **user_data
-        )
-        user.groups.add(base_group)
-        confirm_obj.delete()
+    storage = get_storage()
+    confirm_obj, user_data = get_confirm_obj(storage, secret_code, object_confirm)
+    password = make_password(password)
+
+    # Вторая попытка только если id группы устарел: группа удалена в другом процессе
+    for attempt in range(2):
+        base_group_id = base_group_id_cache.get()
+        try:
+            with transaction.atomic():
+                # Существование пользователя проверяет уникальный индекс email и phone
+                user = User.objects.create(password=password, is_superuser=False, **user_data)
+                User.groups.through.objects.create(user_id=user.id, group_id=base_group_id)
+                # Хранилище вне БД удаляет объект только после фиксации, при откате он остается для повтора
+                storage.delete_on_commit(confirm_obj)
+            return
+        except IntegrityError:
+            if User.objects.filter(**user_data).exists():
+                storage.delete(confirm_obj)
+                raise exceptions.UserAlreadyExist
+
+            base_group_id_cache.reset()
+            if attempt:
+                raise
+
+            # Удаление в откаченной транзакции сбросило pk объекта подтверждения
+            confirm_obj = get_confirm_obj(storage, secret_code, object_confirm)[0]
@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Q
+
+import exceptions
+from user.models import User
+
+# Поля списка пользователей, хеш пароля и прочие поля не читаются
+LIST_FIELDS = ('id', 'email', 'phone', 'first_name', 'last_name', 'is_active', 'is_staff', 'created_at')
+
+
+def encode_cursor(user: User) -> str:
+    """
+    Курсор позиции в списке пользователей: created_at и id последнего пользователя страницы
+    """
+
+    position = json.dumps([user.created_at.isoformat(), user.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Позиция из курсора encode_cursor
+
+    :raise exceptions.InvalidCursor: Курсор поврежден или создан не encode_cursor
+    """
+
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise exceptions.InvalidCursor
+
+    if not isinstance(user_id, int) or created_at.tzinfo is None:
+        raise exceptions.InvalidCursor
+
+    return created_at, user_id
+
+
+def list_users(cursor: Optional[str], limit: int) -> Tuple[List[User], Optional[str]]:
+    """
+    Страница списка пользователей от новых к старым с пагинацией по ключу (created_at, id).
+    Страница читается диапазоном индекса user_created_at_id_idx, без OFFSET и COUNT(*),
+    поэтому стоимость не зависит от номера страницы и размера таблицы
+
+    :param cursor: Курсор предыдущей страницы, None для первой страницы
+    :param limit: Размер страницы
+    :return: Пользователи страницы и курсор следующей страницы, None если страница последняя
+    """
+
+    users = User.objects.only(*LIST_FIELDS).order_by('-created_at', '-id')
+    if cursor is not None:
+        created_at, user_id = decode_cursor(cursor)
+        # created_at__lte задает границу диапазона индекса, условие с id отсекает уже показанных
+        users = users.filter(Q(created_at__lte=created_at), Q(created_at__lt=created_at) | Q(id__lt=user_id))
+
+    users = list(users[:limit + 1])
+    if len(users) <= limit:
+        return users, None
+
+    users = users[:limit]
+    return users, encode_cursor(users[-1])
@@ -0,0 +1,135 @@
+import logging
+from typing import List, Optional
+
+import redis
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token, UntypedToken
+
+import exceptions
+from user.claims import UserClaims, get_user_claims
+from user.models import User
+from user.revocation import is_token_revoked, revoke_token
+from user.utils import get_jwt_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def is_token_current(payload: dict, claims: Optional[UserClaims]) -> bool:
+    """
+    Токен с проверенной подписью не отозван при выходе и выпущен после последнего отзыва всех токенов
+    активного пользователя
+
+    :param payload: Claims токена
+    :param claims: Текущие данные пользователя из get_user_claims
+    """
+
+    if claims is None or not claims.is_active or payload.get('token_version', 0) != claims.token_version:
+        return False
+
+    # Отзыв refresh токенов не рассылается в локальную копию списка
+    local = payload.get(api_settings.TOKEN_TYPE_CLAIM) == AccessToken.token_type
+    return not is_token_revoked(payload.get(api_settings.JTI_CLAIM), local)
+
+
+def verify_token(token: str, user_claims: Optional[dict] = None) -> dict:
+    """
+    Проверка токена как при аутентификации: подпись, срок действия, отзыв при выходе,
+    активность пользователя и версия токенов. Данные пользователя читаются из кеша claims
+
+    :param token: jwt токен
+    :param user_claims: Уже загруженные данные пользователей по id, дополняется загруженными
+    :return: Словарь с результатом проверки
+        - valid bool - токен действителен
+        - exp int - время истечения токена (timestamp), None если токен недействителен
+        - user_id int - id пользователя из токена, None если токен недействителен
+    """
+
+    invalid = {'valid': False, 'exp': None, 'user_id': None}
+    try:
+        payload = UntypedToken(token).payload
+    except TokenError:
+        return invalid
+
+    user_id = payload.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        return invalid
+
+    if user_claims is None:
+        user_claims = {}
+    if user_id not in user_claims:
+        user_claims[user_id] = get_user_claims(user_id)
+
+    if not is_token_current(payload, user_claims[user_id]):
+        return invalid
+
+    return {'valid': True, 'exp': payload['exp'], 'user_id': user_id}
+
+
+def verify_tokens(tokens: List[str]) -> List[dict]:
+    """
+    Проверка пачки токенов, повторяющиеся токены проверяются один раз,
+    данные каждого пользователя загружаются один раз
+
+    :param tokens: Список jwt токенов
+    :return: Результаты проверки в порядке токенов
+    """
+
+    results = {}
+    user_claims = {}
+    for token in tokens:
+        if token not in results:
+            results[token] = verify_token(token, user_claims)
+
+    return [results[token] for token in tokens]
+
+
+def refresh_tokens(refresh: str) -> dict:
+    """
+    Ротация refresh токена: переданный токен отзывается, выпускается новая пара токенов.
+    Повторное использование отозванного токена отклоняется, отзыв и проверка выполняются атомарно в redis.
+    При недоступном redis токены выпускаются без отзыва старого
+
+    :param refresh: refresh токен
+    :return: Словарь с jwt токенами refresh и access
+    :raise TokenError: Токен недействителен, отозван или выпущен до отзыва всех токенов пользователя
+    """
+
+    token = RefreshToken(refresh)
+    user_id = token[api_settings.USER_ID_CLAIM]
+
+    claims = get_user_claims(user_id)
+    if claims is None or not claims.is_active or token.get('token_version', 0) != claims.token_version:
+        raise TokenError(_('Token is invalid or expired'))
+
+    try:
+        if not revoke_token(token[api_settings.JTI_CLAIM], token['exp'], broadcast=False):
+            raise TokenError(_('Token is invalid or expired'))
+    except redis.RedisError as e:
+        logger.error(f'refresh токен пользователя {user_id} не отозван при ротации: {e}')
+
+    return get_jwt_tokens(User(id=user_id, is_active=claims.is_active))
+
+
+def logout(refresh: str, access: Optional[Token] = None):
+    """
+    Выход: отзыв refresh токена и, если передан, access токена текущего запроса
+
+    :param refresh: refresh токен
+    :param access: Проверенный access токен из заголовка Authorization
+    :raise TokenError: refresh токен недействителен
+    :raise exceptions.TokenRevocationUnavailable: redis недоступен, токены не отозваны
+    """
+
+    # Локальным копиям списка рассылается только отзыв access токена, refresh токены проверяются в redis
+    tokens = [(RefreshToken(refresh), False)]
+    if access is not None:
+        tokens.append((access, True))
+
+    for token, broadcast in tokens:
+        try:
+            revoke_token(token[api_settings.JTI_CLAIM], token['exp'], broadcast)
+        except redis.RedisError as e:
+            logger.error(f'Не удалось отозвать токен: {e}')
+            raise exceptions.TokenRevocationUnavailable
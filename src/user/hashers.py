@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class ProfileHasherMixin:
+    """
+    Хешер со стоимостью из профиля PASSWORD_HASHER_ALGORITHM / PASSWORD_HASHER_COST.
+    Стоимость задается только хешеру алгоритма профиля, 0 - значение Django по умолчанию.
+    must_update Django сравнивает стоимость хеша с текущей, поэтому хеши пересчитываются
+    при входе и при увеличении, и при уменьшении стоимости
+    """
+
+    cost_attribute = None
+
+    def __init__(self, cost: int = None):
+        if cost is None and self.algorithm == settings.PASSWORD_HASHER_ALGORITHM:
+            cost = settings.PASSWORD_HASHER_COST
+
+        if cost:
+            setattr(self, self.cost_attribute, cost)
+
+
+class PBKDF2PasswordHasher(ProfileHasherMixin, hashers.PBKDF2PasswordHasher):
+    cost_attribute = 'iterations'
+
+
+class ScryptPasswordHasher(ProfileHasherMixin, hashers.ScryptPasswordHasher):
+    cost_attribute = 'work_factor'
+
+
+class Argon2PasswordHasher(ProfileHasherMixin, hashers.Argon2PasswordHasher):
+    cost_attribute = 'time_cost'
+
+
+class BCryptSHA256PasswordHasher(ProfileHasherMixin, hashers.BCryptSHA256PasswordHasher):
+    cost_attribute = 'rounds'
+
+
+PROFILE_HASHERS = {
+    hasher.algorithm: hasher
+    for hasher in (PBKDF2PasswordHasher, ScryptPasswordHasher, Argon2PasswordHasher, BCryptSHA256PasswordHasher)
+}
@@ -0,0 +1,225 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+import exceptions
+
+
+WORKER_SETTINGS = ('PASSWORD_HASHERS', 'PASSWORD_HASHER_ALGORITHM', 'PASSWORD_HASHER_COST')
+
+
+def init_worker(worker_settings: dict):
+    """
+    Настройка процесса пула: для хеширования нужны только настройки хешеров, приложения Django не загружаются
+    """
+
+    settings.configure(**worker_settings)
+
+
+def verify(password: str, encoded: str) -> Tuple[bool, bool]:
+    """
+    Проверка пароля как в django.contrib.auth.hashers.check_password, но вместо вызова setter
+    возвращается признак того, что хеш нужно пересчитать по текущему профилю
+
+    :return: (пароль верный, хеш нужно пересчитать)
+    """
+
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = hasher.verify(password, encoded)
+
+    if not is_correct and not hasher_changed and must_update:
+        hasher.harden_runtime(password, encoded)
+
+    return is_correct, is_correct and must_update
+
+
+class PasswordHashingPool:
+    """
+    Хеширование и проверка паролей в пуле процессов, что бы PBKDF2 не занимал поток запроса и GIL.
+    Одновременно в пуле не больше PASSWORD_HASHING_WORKERS + PASSWORD_HASHING_QUEUE_SIZE задач,
+    при заполненной очереди сразу вызывается PasswordHashingBusy.
+    При PASSWORD_HASHING_WORKERS = 0 хеширование выполняется в вызывающем потоке
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.executor = None
+        self.slots = None
+
+    def get_executor(self) -> Tuple[Optional[ProcessPoolExecutor], Optional[threading.BoundedSemaphore]]:
+        """
+        Пул создается при первом обращении, заново после fork и после аварийного завершения процесса пула
+
+        :return: (пул, слоты очереди пула)
+        """
+
+        workers = settings.PASSWORD_HASHING_WORKERS
+        if not workers:
+            return None, None
+
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=({name: getattr(settings, name) for name in WORKER_SETTINGS},)
+                )
+                self.slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASHING_QUEUE_SIZE)
+
+            return self.executor, self.slots
+
+    def discard(self, executor: ProcessPoolExecutor):
+        """
+        Сброс сломанного пула (процесс пула завершился аварийно), следующий get_executor создаст новый
+        """
+
+        with self.lock:
+            if self.executor is executor:
+                executor.shutdown(wait=False)
+                self.pid = self.executor = self.slots = None
+
+    def submit(self, fn, *args) -> Future:
+        # Сломанный пул пересоздается и задача ставится еще раз, повторный отказ считается перегрузкой
+        for _ in range(2):
+            executor, slots = self.get_executor()
+
+            if executor is None:
+                future = Future()
+                future.set_result(fn(*args))
+                return future
+
+            if not slots.acquire(blocking=False):
+                raise exceptions.PasswordHashingBusy
+
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                slots.release()
+                self.discard(executor)
+                continue
+            except BaseException:
+                slots.release()
+                raise
+
+            future.add_done_callback(lambda _: slots.release())
+            return future
+
+        raise exceptions.PasswordHashingBusy
+
+    def run(self, fn, *args):
+        """
+        Результат задачи пула. Задача, процесс которой завершился аварийно, считается отказом из-за перегрузки
+        """
+
+        try:
+            return self.submit(fn, *args).result()
+        except BrokenProcessPool:
+            raise exceptions.PasswordHashingBusy
+
+    async def arun(self, fn, *args):
+        """
+        Асинхронная версия run
+        """
+
+        try:
+            return await asyncio.wrap_future(self.submit(fn, *args))
+        except BrokenProcessPool:
+            raise exceptions.PasswordHashingBusy
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None and self.pid == os.getpid():
+                self.executor.shutdown()
+            self.pid = self.executor = self.slots = None
+
+
+pool = PasswordHashingPool()
+
+
+@receiver(setting_changed)
+def reset_pool(setting, **kwargs):
+    if setting.startswith('PASSWORD_HASH'):
+        pool.shutdown()
+
+    if setting in ('PASSWORD_HASHER_ALGORITHM', 'PASSWORD_HASHER_COST'):
+        # Стоимость задается при создании хешера, а хешеры Django кеширует
+        hashers.get_hashers.cache_clear()
+        hashers.get_hashers_by_algorithm.cache_clear()
+
+
+def make_password(password: str) -> str:
+    """
+    Хеш пароля, вычисляется в пуле процессов
+
+    :param password: Пароль
+    :return: Хеш пароля в формате поля User.password
+    """
+
+    return pool.run(hashers.make_password, password)
+
+
+def check_password(password: str, encoded: Optional[str]) -> bool:
+    """
+    Проверка пароля по хешу, вычисляется в пуле процессов
+
+    :param password: Пароль
+    :param encoded: Хеш пароля из User.password
+    """
+
+    if not encoded:
+        return False
+
+    return pool.run(hashers.check_password, password, encoded)
+
+
+async def amake_password(password: str) -> str:
+    """
+    Асинхронная версия make_password, ожидание результата не блокирует цикл событий
+    """
+
+    return await pool.arun(hashers.make_password, password)
+
+
+async def acheck_password(password: str, encoded: Optional[str]) -> bool:
+    """
+    Асинхронная версия check_password
+    """
+
+    if not encoded:
+        return False
+
+    return await pool.arun(hashers.check_password, password, encoded)
+
+
+def verify_password(password: str, encoded: Optional[str]) -> Tuple[bool, bool]:
+    """
+    Проверка пароля по хешу в пуле процессов
+
+    :param password: Пароль
+    :param encoded: Хеш пароля из User.password
+    :return: (пароль верный, хеш нужно пересчитать по текущему профилю)
+    """
+
+    if not encoded:
+        return False, False
+
+    return pool.run(verify, password, encoded)
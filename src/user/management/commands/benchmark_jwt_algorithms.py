@@ -0,0 +1,40 @@
+import time
+
+import jwt
+from django.core.management.base import BaseCommand
+
+from user.management.commands.generate_jwt_key import generate_private_key
+
+
+class Command(BaseCommand):
+    help = 'Стоимость подписи и проверки jwt для HS256 и асимметричных алгоритмов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('algorithms', nargs='*', default=['HS256', 'RS256', 'ES256', 'EdDSA'])
+        parser.add_argument('--count', type=int, default=1000, help='Количество подписей и проверок')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        payload = {'token_type': 'access', 'exp': int(time.time()) + 3600, 'jti': '0' * 32, 'user_id': 1}
+
+        for algorithm in options['algorithms']:
+            if algorithm.startswith('HS'):
+                signing_key = verifying_key = 'benchmark-signing-key-' * 2
+            else:
+                signing_key = generate_private_key(algorithm)
+                verifying_key = signing_key.public_key()
+
+            started_at = time.perf_counter()
+            for _ in range(count):
+                token = jwt.encode(payload, signing_key, algorithm=algorithm)
+            sign_seconds = (time.perf_counter() - started_at) / count
+
+            started_at = time.perf_counter()
+            for _ in range(count):
+                jwt.decode(token, verifying_key, algorithms=[algorithm])
+            verify_seconds = (time.perf_counter() - started_at) / count
+
+            self.stdout.write(
+                f'{algorithm}: подпись {sign_seconds * 1e6:.1f} us ({1 / sign_seconds:,.0f}/с), '
+                f'проверка {verify_seconds * 1e6:.1f} us ({1 / verify_seconds:,.0f}/с), длина токена {len(token)}'
+            )
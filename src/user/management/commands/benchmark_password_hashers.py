@@ -0,0 +1,53 @@
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.hashers import PROFILE_HASHERS
+
+
+class Command(BaseCommand):
+    help = (
+        'Задержка проверки пароля и пропускная способность для профилей хеширования, '
+        'например: benchmark_password_hashers pbkdf2_sha256:600000 scrypt:16384 argon2:2'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profiles', nargs='*',
+            help='Профили алгоритм[:стоимость], по умолчанию текущий профиль из настроек'
+        )
+        parser.add_argument('--count', type=int, default=20, help='Количество проверок на профиль')
+
+    def handle(self, *args, **options):
+        profiles = options['profiles'] or [f'{settings.PASSWORD_HASHER_ALGORITHM}:{settings.PASSWORD_HASHER_COST}']
+        cores = os.cpu_count() or 1
+
+        self.stdout.write(f'Ядер: {cores}, рабочих процессов хеширования: {settings.PASSWORD_HASHING_WORKERS}')
+        for profile in profiles:
+            algorithm, _, cost = profile.partition(':')
+            if algorithm not in PROFILE_HASHERS:
+                raise CommandError(f'Неизвестный алгоритм {algorithm}, доступны: {", ".join(PROFILE_HASHERS)}')
+
+            hasher = PROFILE_HASHERS[algorithm](cost=int(cost or 0))
+            try:
+                encoded = hasher.encode('benchmark-password', hasher.salt())
+            except ValueError as e:
+                self.stdout.write(f'{profile}: недоступен ({e})')
+                continue
+
+            timings = []
+            for _ in range(options['count']):
+                started_at = time.perf_counter()
+                hasher.verify('benchmark-password', encoded)
+                timings.append(time.perf_counter() - started_at)
+
+            p50 = statistics.median(timings)
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else p50
+            per_core = 1 / statistics.mean(timings)
+            self.stdout.write(
+                f'{profile}: p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, '
+                f'{per_core:,.1f} проверок/с на ядро, до {per_core * cores:,.0f} проверок/с на {cores} ядрах'
+            )
@@ -0,0 +1,39 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.models import User
+from user.tokens import get_token_minter
+
+
+class Command(BaseCommand):
+    help = 'Сравнение выпуска пары jwt токенов через RefreshToken simplejwt и TokenMinter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10_000, help='Количество пар токенов в одном замере')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество замеров, берется лучший')
+
+    def handle(self, *args, **options):
+        minter = get_token_minter()
+        if minter is None:
+            raise CommandError('TokenMinter не используется: токены подписываются асимметричным ключом')
+
+        count = options['count']
+        user = User(id=1, is_active=True)
+        claims = {'is_active': True, 'token_version': 0, 'groups': ['base']}
+
+        def simplejwt_tokens():
+            refresh = RefreshToken.for_user(user)
+            for claim, value in claims.items():
+                refresh[claim] = value
+            return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+        cases = {
+            'RefreshToken simplejwt': simplejwt_tokens,
+            'TokenMinter': lambda: minter.mint(user.id, claims),
+        }
+
+        for name, case in cases.items():
+            seconds = min(timeit.repeat(case, number=count, repeat=options['repeat']))
+            self.stdout.write(f'{name}: {seconds / count * 1e6:.1f} us на пару, {count / seconds:,.0f} пар/с')
@@ -0,0 +1,51 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.views import TokenVerifyView
+
+from user.views.token import verify_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение проверки токенов по одному через TokenVerifyView и одним запросом к пакетной проверке. '
+        'Запросы вызываются напрямую, без сети, поэтому экономия на сетевых обращениях не учитывается'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Количество токенов')
+        parser.add_argument('--batch-size', type=int, default=100, help='Токенов в одном запросе пакетной проверки')
+
+    def handle(self, *args, **options):
+        count, batch_size = options['count'], options['batch_size']
+        factory = RequestFactory()
+
+        tokens = []
+        for user_id in range(1, count + 1):
+            token = AccessToken()
+            token['user_id'] = user_id
+            tokens.append(str(token))
+
+        verify_view = TokenVerifyView.as_view()
+        started_at = time.perf_counter()
+        for token in tokens:
+            response = verify_view(factory.post('/token/verify/', {'token': token}, content_type='application/json'))
+            assert response.status_code == 200, response.data
+        single_seconds = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for i in range(0, count, batch_size):
+            body = json.dumps({'tokens': tokens[i:i + batch_size]})
+            response = verify_batch(factory.post('/token/verify/batch/', body, content_type='application/json'))
+            assert response.status_code == 200, response.data
+        batch_seconds = time.perf_counter() - started_at
+
+        requests = -(-count // batch_size)
+        self.stdout.write(f'По одному: {count} запросов, {single_seconds:.3f} s, {count / single_seconds:,.0f} токенов/с')
+        self.stdout.write(
+            f'Пакетами по {batch_size}: {requests} запросов, {batch_seconds:.3f} s, '
+            f'{count / batch_seconds:,.0f} токенов/с'
+        )
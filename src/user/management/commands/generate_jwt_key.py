@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.signing import ASYMMETRIC_ALGORITHMS
+
+
+def generate_private_key(algorithm: str):
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    if algorithm.startswith('RS'):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    if algorithm.startswith('ES'):
+        curves = {'ES256': ec.SECP256R1, 'ES384': ec.SECP384R1, 'ES512': ec.SECP521R1}
+        return ec.generate_private_key(curves[algorithm]())
+
+    return ed25519.Ed25519PrivateKey.generate()
+
+
+class Command(BaseCommand):
+    help = (
+        'Создание закрытого ключа подписи jwt <kid>.pem в JWT_KEYS_DIR. '
+        'Ключ публикуется в jwks сразу, подписывать им токены начинают после смены JWT_SIGNING_KEY_ID'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kid', help='Идентификатор ключа, имя файла')
+        parser.add_argument('--algorithm', default=None, help='По умолчанию JWT_ALGORITHM')
+
+    def handle(self, *args, **options):
+        from cryptography.hazmat.primitives import serialization
+
+        algorithm = options['algorithm'] or settings.JWT_ALGORITHM
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise CommandError(f'Алгоритм {algorithm} не асимметричный, доступны: {", ".join(sorted(ASYMMETRIC_ALGORITHMS))}')
+
+        path = Path(settings.JWT_KEYS_DIR) / f'{options["kid"]}.pem'
+        if path.exists():
+            raise CommandError(f'Ключ {path} уже существует')
+
+        private_key = generate_private_key(algorithm)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+        path.chmod(0o600)
+
+        self.stdout.write(f'Ключ {algorithm} сохранен в {path}')
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import time
+
+import redis
+from django.core.management.base import BaseCommand, CommandError
+
+from confirm import bulk as confirm_bulk
+from confirm.choices import BulkFileFormat, PhoneRegion
+from user import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        'Импорт пользователей из JSON Lines или CSV с полями email, phone, region, password или password_hash, '
+        'first_name, last_name. Ошибки по строкам выводятся в формате JSON Lines, прогресс - в stderr'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу, - для чтения из stdin')
+        parser.add_argument('--format', choices=BulkFileFormat.values, default=BulkFileFormat.JSONL)
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Процессы хеширования паролей, 0 - хеширование в текущем процессе'
+        )
+        parser.add_argument(
+            '--region', choices=PhoneRegion.values, default=PhoneRegion.RUSSIAN,
+            help='Регион для номеров телефонов без кода страны, если в строке не указан region'
+        )
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help='Файл состояния: после каждой пачки записывается номер последней строки, '
+                 'повторный запуск продолжает импорт с нее'
+        )
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.import_users(sys.stdin, options)
+            return
+
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            self.import_users(file, options)
+
+    def import_users(self, lines, options):
+        checkpoint = {'row': 0, 'created': 0, 'skipped': 0, 'errors': 0}
+        if options['checkpoint']:
+            checkpoint = bulk.read_checkpoint(options['checkpoint']) or checkpoint
+            if checkpoint['row']:
+                self.stderr.write(f'Продолжение импорта после строки {checkpoint["row"]}')
+
+        started_at = time.monotonic()
+        rows = 0
+        results = bulk.import_users(
+            confirm_bulk.read_rows(lines, options['format']),
+            chunk_size=options['chunk_size'],
+            start_row=checkpoint['row'],
+            workers=options['workers'],
+            region=options['region'],
+        )
+        try:
+            for result in results:
+                for error in result['errors']:
+                    self.stdout.write(json.dumps(error, ensure_ascii=False))
+
+                rows += result['rows']
+                checkpoint = {
+                    'row': result['row'],
+                    'created': checkpoint['created'] + result['created'],
+                    'skipped': checkpoint['skipped'] + result['skipped'],
+                    'errors': checkpoint['errors'] + len(result['errors']),
+                }
+                if options['checkpoint']:
+                    bulk.write_checkpoint(options['checkpoint'], checkpoint)
+
+                seconds = time.monotonic() - started_at
+                self.stderr.write(
+                    f'Строк: {checkpoint["row"]}, создано: {checkpoint["created"]}, '
+                    f'пропущено: {checkpoint["skipped"]}, ошибок: {checkpoint["errors"]}, '
+                    f'{rows / max(seconds, 0.001):,.0f} строк/с'
+                )
+        except redis.RedisError as e:
+            # Пачка зафиксирована, но не попала в фильтр Блума, состояние импорта остается перед ней
+            raise CommandError(
+                f'Пачка после строки {checkpoint["row"]} не добавлена в фильтр Блума пользователей: {e}. '
+                f'Запустите импорт повторно с тем же --checkpoint'
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from user.attempts import get_login_attempt_limiter
+
+
+class Command(BaseCommand):
+    help = 'Счетчики допущенных и отклоненных попыток входа, снятие блокировки с идентификатора или IP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset-identifier', help='Email в нижнем регистре или номер телефона в формате E164')
+        parser.add_argument('--reset-ip', help='IP адрес')
+
+    def handle(self, *args, **options):
+        limiter = get_login_attempt_limiter()
+        if limiter is None:
+            raise CommandError('Ограничение попыток входа отключено, USER_LOGIN_LIMITER не задан')
+
+        if options['reset_identifier']:
+            limiter.reset(options['reset_identifier'])
+
+        if options['reset_ip']:
+            limiter.reset_ip(options['reset_ip'])
+
+        for name, value in limiter.stats().items():
+            self.stdout.write(f'{name}: {value}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from user.bloom import get_user_bloom
+
+
+class Command(BaseCommand):
+    help = 'Метрики фильтра Блума email и телефонов пользователей, с --rebuild - перестроение фильтра'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Перестроить фильтр')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        bloom = get_user_bloom()
+        if bloom is None:
+            raise CommandError('Фильтр Блума отключен, USER_BLOOM_FILTER не задан')
+
+        if options['rebuild'] and not bloom.rebuild(options['batch_size']):
+            raise CommandError('Перестроение фильтра уже выполняется')
+
+        for name, value in bloom.stats().items():
+            self.stdout.write(f'{name}: {value}')
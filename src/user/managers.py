@@ -0,0 +1,37 @@
+from typing import Optional
+
+from django.contrib.auth.models import UserManager as DjangoUserManager
+from django.db import connections
+
+
+class UserManager(DjangoUserManager):
+    def reset_password(self, field: str, value: str, encoded_password: str) -> Optional[int]:
+        """
+        Установка нового хеша пароля и отзыв всех выданных токенов одним запросом UPDATE ... RETURNING
+
+        :param field: Поле для поиска пользователя, email или phone
+        :param value: Email или номер телефона
+        :param encoded_password: Хеш пароля
+        :return: id пользователя или None, если пользователь не найден
+        """
+
+        connection = connections[self.db]
+        opts = self.model._meta
+        quote_name = connection.ops.quote_name
+
+        def column(name):
+            return quote_name(opts.get_field(name).column)
+
+        sql = (
+            f'UPDATE {quote_name(opts.db_table)} '
+            f'SET {column("password")} = %s, {column("token_version")} = {column("token_version")} + 1 '
+            f'WHERE {column(field)} = %s '
+            f'RETURNING {column("id")}'
+        )
+        params = [encoded_password, opts.get_field(field).get_db_prep_value(value, connection)]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        return None if row is None else row[0]
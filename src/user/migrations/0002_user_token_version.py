@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Токены с другой версией не принимаются, увеличение отзывает все выданные токены', verbose_name='Версия токенов'),
+        ),
+    ]
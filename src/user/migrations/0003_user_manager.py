@@ -0,0 +1,20 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:24
+
+from django.db import migrations
+import user.managers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', user.managers.UserManager()),
+            ],
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 
+from user.managers import UserManager
+
 
 class UserGroup(models.TextChoices):
     BASE = 'base'
@@ -19,8 +21,18 @@ class User(AbstractUser):
 
     created_at = models.DateTimeField(verbose_name=_('Дата создания'), default=timezone.now)
     updated_at = models.DateTimeField(verbose_name=_('Дата обновления'), default=timezone.now)
+    token_version = models.PositiveIntegerField(
+        verbose_name=_('Версия токенов'), default=0,
+        help_text=_('Токены с другой версией не принимаются, увеличение отзывает все выданные токены')
+    )
+
+    objects = UserManager()
 
     class Meta:
         verbose_name = _('Пользователь')
         verbose_name_plural = _('Пользователи')
-        ordering = ['-created_at']
+        # id - тай-брейкер для одинаковых created_at, порядок совпадает с индексом user_created_at_id_idx
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='user_created_at_id_idx'),
+        ]
@@ -1,8 +1,76 @@
+import threading
+import time
+from collections import Counter
+from typing import FrozenSet, List, Optional
+
+from django.conf import settings
 from rest_framework import permissions
-from typing import List, Optional
+
 from user.models import UserGroup
 
 
+class GroupNamesCache:
+    """
+    Названия групп пользователей в памяти процесса на USER_GROUPS_CACHE_TTL_SECONDS.
+    Сбрасывается по m2m_changed групп, в других процессах данные живут не дольше TTL
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = {}
+
+    def get(self, user_id: int) -> Optional[FrozenSet[str]]:
+        with self.lock:
+            item = self.items.get(user_id)
+
+        if item is None or item[0] < time.monotonic():
+            return None
+
+        return item[1]
+
+    def set(self, user_id: int, group_names: FrozenSet[str]):
+        with self.lock:
+            if len(self.items) >= settings.USER_GROUPS_CACHE_MAX_SIZE:
+                self.items.clear()
+            self.items[user_id] = (time.monotonic() + settings.USER_GROUPS_CACHE_TTL_SECONDS, group_names)
+
+    def invalidate(self, user_id: int):
+        with self.lock:
+            self.items.pop(user_id, None)
+
+
+group_names_cache = GroupNamesCache()
+
+# checks - проверки групп, db_avoided - проверки без запроса к БД
+group_permission_stats = Counter()
+stats_lock = threading.Lock()
+
+
+def count_check(db_avoided: bool):
+    with stats_lock:
+        group_permission_stats['checks'] += 1
+        group_permission_stats['db_avoided'] += db_avoided
+
+
+def get_group_names(user) -> FrozenSet[str]:
+    """
+    Названия групп пользователя: из claims токена у ClaimsUser, иначе из кеша процесса или запросом к БД
+    """
+
+    group_names = getattr(user, 'group_names', None)
+    if group_names is None:
+        group_names = group_names_cache.get(user.pk)
+
+    if group_names is not None:
+        count_check(db_avoided=True)
+        return group_names
+
+    group_names = frozenset(user.groups.values_list('name', flat=True))
+    group_names_cache.set(user.pk, group_names)
+    count_check(db_avoided=False)
+    return group_names
+
+
 def user_group_permission(user_group: Optional[List[UserGroup]]):
     """
     :param user_group: Список групп пользователей, для разрешения участвовать в
@@ -17,6 +85,6 @@ def user_group_permission(user_group: Optional[List[UserGroup]]):
             if user_group in [[], None]:
                 return True
 
-            return request.user.groups.filter(name__in=user_group).exists()
+            return not get_group_names(request.user).isdisjoint(user_group)
 
     return Permission
@@ -0,0 +1,213 @@
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+import redis
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] - ключ отозванного jti, KEYS[2] - множество отозванных access токенов по времени истечения
+# ARGV[1] - jti, ARGV[2] - время истечения токена (timestamp), ARGV[3] - секунд до истечения, ARGV[4] - канал,
+# ARGV[5] - текущее время (timestamp), ARGV[6] - 1 если отзыв рассылается локальным копиям списка
+# Возвращает 1 если токен отозван этим вызовом, 0 если он уже был отозван.
+# Множество хранит только рассылаемые токены и при каждом добавлении очищается от истекших
+REVOKE_SCRIPT = """
+if not redis.call('SET', KEYS[1], ARGV[2], 'NX', 'EX', ARGV[3]) then
+    return 0
+end
+
+if ARGV[6] == '1' then
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. ARGV[5])
+    redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+    redis.call('PUBLISH', ARGV[4], ARGV[1] .. ':' .. ARGV[2])
+end
+return 1
+"""
+
+
+class TokenDenyList:
+    """
+    Отозванные jti токенов в redis, каждый хранится до истечения токена.
+    С USER_TOKEN_DENY_LIST_LOCAL процесс держит копию списка отозванных access токенов: при запуске загружает
+    снимок и дополняет его сообщениями pub/sub, поэтому аутентификация не обращается к redis.
+    Refresh токены, отозванные при ротации и выходе, в копию не рассылаются, их отзыв проверяется в redis:
+    refresh токен проверяется только при ротации и выходе, а отзывов при ротации на порядки больше, чем выходов.
+    Пока подписка не установлена, проверка выполняется запросом к redis
+    """
+
+    set_key = 'user:revoked'
+    channel = 'user:revoked'
+
+    def __init__(self):
+        self.redis = self.get_client()
+        self.revoke_script = self.redis.register_script(REVOKE_SCRIPT)
+        self.lock = threading.Lock()
+        self.local = {}
+        self.ready = threading.Event()
+        self.pid = None
+        self.prune_at = 0
+
+    def get_client(self) -> redis.Redis:
+        # Проверка соединения подписки PING и таймаут чтения, что бы разорванное соединение не ждало вечно
+        return redis.Redis.from_url(
+            settings.USER_REDIS_URL,
+            decode_responses=True,
+            health_check_interval=settings.USER_TOKEN_DENY_LIST_HEALTH_CHECK_SECONDS,
+            socket_timeout=settings.USER_TOKEN_DENY_LIST_SOCKET_TIMEOUT_SECONDS,
+        )
+
+    @staticmethod
+    def key(jti: str) -> str:
+        return f'user:revoked:{jti}'
+
+    def revoke(self, jti: str, exp: int, broadcast: bool = True) -> bool:
+        """
+        Отзыв токена до времени его истечения
+
+        :param jti: jti токена
+        :param exp: Время истечения токена (timestamp)
+        :param broadcast: Разослать отзыв локальным копиям списка, True для access токенов
+        :return: False если токен уже был отозван
+        """
+
+        now = int(time.time())
+        ttl = exp - now + 1
+        if ttl <= 0:
+            return False
+
+        revoked = bool(self.revoke_script(
+            keys=[self.key(jti), self.set_key],
+            args=[jti, exp, ttl, self.channel, now, int(broadcast)]
+        ))
+        if revoked and broadcast:
+            self.add_local(jti, exp)
+        return revoked
+
+    def is_revoked(self, jti: str, local: bool = True) -> bool:
+        """
+        :param jti: jti токена
+        :param local: Допустима проверка по локальной копии списка, False для refresh токенов
+        """
+
+        if local and settings.USER_TOKEN_DENY_LIST_LOCAL:
+            self.start()
+            if self.ready.is_set():
+                with self.lock:
+                    return jti in self.local
+
+        return bool(self.redis.exists(self.key(jti)))
+
+    def add_local(self, jti: str, exp: int):
+        now = time.time()
+        with self.lock:
+            self.local[jti] = exp
+            if now >= self.prune_at:
+                self.local = {jti: exp for jti, exp in self.local.items() if exp >= now}
+                self.prune_at = now + 60
+
+    def load_snapshot(self):
+        now = int(time.time())
+        self.redis.zremrangebyscore(self.set_key, '-inf', now - 1)
+        snapshot = {jti: int(exp) for jti, exp in self.redis.zrangebyscore(self.set_key, now, '+inf', withscores=True)}
+        with self.lock:
+            self.local = snapshot
+
+    def start(self):
+        """
+        Запуск потока подписки при первой проверке в процессе, в том числе после fork
+        """
+
+        if self.pid == os.getpid():
+            return
+
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.ready.clear()
+
+        threading.Thread(target=self.listen, name='token-deny-list', daemon=True).start()
+
+    def listen(self):
+        pid = os.getpid()
+        while self.pid == pid:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Подписка до загрузки снимка, что бы не пропустить токены, отозванные во время загрузки
+                pubsub.subscribe(self.channel)
+                self.load_snapshot()
+                self.ready.set()
+
+                # Ожидание с таймаутом, а не listen(): на каждой итерации проверяется соединение
+                # и то, что подписка этого процесса не остановлена
+                while self.pid == pid:
+                    message = pubsub.get_message(timeout=settings.USER_TOKEN_DENY_LIST_HEALTH_CHECK_SECONDS)
+                    if message is not None:
+                        jti, _, exp = message['data'].rpartition(':')
+                        self.add_local(jti, int(exp))
+            except (redis.RedisError, ValueError) as e:
+                self.ready.clear()
+                logger.warning(f'Подписка на отозванные токены прервана: {e}')
+                time.sleep(settings.USER_TOKEN_DENY_LIST_RETRY_SECONDS)
+            finally:
+                pubsub.close()
+
+
+@lru_cache(maxsize=None)
+def get_token_deny_list() -> Optional[TokenDenyList]:
+    """
+    Список отозванных токенов, заданный в settings.USER_TOKEN_DENY_LIST, None если отзыв отключен
+    """
+
+    return import_string(settings.USER_TOKEN_DENY_LIST)() if settings.USER_TOKEN_DENY_LIST else None
+
+
+@receiver(setting_changed)
+def reset_token_deny_list(setting, **kwargs):
+    if setting.startswith('USER_TOKEN_DENY_LIST') or setting == 'USER_REDIS_URL':
+        deny_list = get_token_deny_list() if get_token_deny_list.cache_info().currsize else None
+        if deny_list is not None:
+            # Поток подписки завершается не позже USER_TOKEN_DENY_LIST_HEALTH_CHECK_SECONDS
+            deny_list.pid = None
+        get_token_deny_list.cache_clear()
+
+
+def revoke_token(jti: str, exp: int, broadcast: bool = True) -> bool:
+    """
+    Отзыв токена, при отключенном отзыве токены не отзываются
+
+    :param broadcast: Разослать отзыв локальным копиям списка, False для refresh токенов
+    :return: False если токен уже был отозван
+    :raise redis.RedisError: redis недоступен
+    """
+
+    deny_list = get_token_deny_list()
+    if deny_list is None:
+        return True
+
+    return deny_list.revoke(jti, exp, broadcast)
+
+
+def is_token_revoked(jti: Optional[str], local: bool = True) -> bool:
+    """
+    Проверка отзыва токена, при недоступном redis токен считается не отозванным
+
+    :param local: Допустима проверка по локальной копии списка, False для refresh токенов
+    """
+
+    deny_list = get_token_deny_list()
+    if deny_list is None or jti is None:
+        return False
+
+    try:
+        return deny_list.is_revoked(jti, local)
+    except redis.RedisError as e:
+        logger.warning(f'Список отозванных токенов недоступен: {e}')
+        return False
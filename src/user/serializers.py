@@ -30,6 +30,33 @@ class LoginResponseSerializer(serializers.Serializer):
     refresh = serializers.CharField(label='Токен обновления')
 
 
+class TokenVerifySerializer(serializers.Serializer):
+    token = serializers.CharField(label='jwt токен')
+
+
+class TokenVerifyBatchSerializer(serializers.Serializer):
+    tokens = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.USER_TOKEN_VERIFY_BATCH_MAX_SIZE,
+        help_text='jwt токены'
+    )
+
+
+class TokenVerifyResultSerializer(serializers.Serializer):
+    valid = serializers.BooleanField(label='Токен действителен')
+    exp = serializers.IntegerField(label='Время истечения токена', allow_null=True)
+    user_id = serializers.IntegerField(label='id пользователя', allow_null=True)
+
+
+class TokenVerifyBatchResponseSerializer(serializers.Serializer):
+    results = TokenVerifyResultSerializer(many=True, label='Результаты в порядке токенов')
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField(label='Токен обновления')
+
+
 class RegistraionSerializer(PasswordSerializer, BaseObjConfirmSerializer):
     secret_code = serializers.UUIDField()
 
@@ -44,3 +71,29 @@ class ChangePasswordByConfirmSerializer(PasswordSerializer, BaseObjConfirmSerial
 
 class ChangeEmailPhoneSerializer(BaseObjConfirmSerializer):
     secret_code = serializers.UUIDField()
+
+
+class StaffUserListQuerySerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False, help_text='Курсор следующей страницы из поля next')
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.USER_LIST_MAX_PAGE_SIZE,
+        default=settings.USER_LIST_PAGE_SIZE,
+        help_text='Размер страницы'
+    )
+
+
+class StaffUserSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    email = serializers.EmailField(allow_null=True)
+    phone = serializers.CharField(allow_null=True)
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    is_active = serializers.BooleanField()
+    is_staff = serializers.BooleanField()
+    created_at = serializers.DateTimeField()
+
+
+class StaffUserListResponseSerializer(serializers.Serializer):
+    results = StaffUserSerializer(many=True, label='Пользователи от новых к старым')
+    next = serializers.CharField(label='Курсор следующей страницы', allow_null=True)
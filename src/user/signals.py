@@ -0,0 +1,110 @@
+import logging
+from typing import List
+
+import redis
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from kombu.exceptions import OperationalError
+
+from user.bloom import add_to_user_bloom
+from user.claims import invalidate_user_claims
+from user.credentials import invalidate_credentials
+from user.models import User
+from user.permissions import group_names_cache
+from user.tasks import task_add_to_user_bloom
+from user.utils import base_group_id_cache
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=User)
+def add_user_to_bloom(sender, instance: User, **kwargs):
+    """
+    Добавление email и телефона пользователя в фильтр Блума сразу, до фиксации транзакции:
+    лишнее значение дает только ложноположительный ответ.
+    Если redis недоступен и фильтр не удалось отметить непостроенным, добавление повторяет воркер:
+    отметка в памяти процесса не защищает проверки в других процессах
+    """
+
+    values = [str(value) for value in (instance.email, instance.phone) if value]
+    try:
+        add_to_user_bloom(values)
+    except redis.RedisError:
+        try:
+            task_add_to_user_bloom.delay(values)
+        except OperationalError as e:
+            logger.error(f'Не удалось поставить повторное добавление в фильтр Блума {values}: {e}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_caches(sender, instance: User, created: bool = False, **kwargs):
+    """
+    Сброс кешей учетных данных и claims после фиксации транзакции, в том числе при сохранении из админки.
+    Для нового пользователя сброс сразу: в кеше могут остаться данные пользователя с тем же id
+    из восстановленной или пересозданной БД
+    """
+
+    def invalidate():
+        invalidate_credentials(instance.pk)
+        invalidate_user_claims(instance.pk)
+
+    if created:
+        invalidate()
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_users_groups_on_commit(user_ids: List[int]):
+    """
+    Сброс кеша claims и кеша названий групп пользователей после фиксации транзакции
+    """
+
+    def invalidate():
+        for user_id in user_ids:
+            invalidate_user_claims(user_id)
+            group_names_cache.invalidate(user_id)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_user_groups_claims(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Сброс кеша claims при изменении групп пользователя, со стороны пользователя или группы.
+    group.user_set.clear() не передает pk_set, а после очистки пользователей группы уже не найти,
+    поэтому их id запоминаются на pre_clear
+    """
+
+    if reverse and action == 'pre_clear':
+        instance._cleared_user_ids = list(User.objects.filter(groups=instance).values_list('pk', flat=True))
+        return
+
+    if not action.startswith('post_'):
+        return
+
+    if not reverse:
+        user_ids = [instance.pk]
+    elif pk_set is not None:
+        user_ids = list(pk_set)
+    else:
+        user_ids = instance.__dict__.pop('_cleared_user_ids', [])
+
+    invalidate_users_groups_on_commit(user_ids)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_group_users_claims(sender, instance: Group, **kwargs):
+    """
+    Удаление группы удаляет членство каскадом без m2m_changed, пользователи группы запоминаются до удаления
+    """
+
+    invalidate_users_groups_on_commit(list(User.objects.filter(groups=instance).values_list('pk', flat=True)))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def reset_base_group_id(sender, **kwargs):
+    base_group_id_cache.reset()
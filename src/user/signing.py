@@ -0,0 +1,160 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import jwt
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import get_default_algorithms
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+
+# Алгоритмы подписи закрытым ключом, токены проверяются по открытым ключам из jwks
+ASYMMETRIC_ALGORITHMS = {'RS256', 'RS384', 'RS512', 'ES256', 'ES384', 'ES512', 'EdDSA'}
+
+
+class SigningKeySet:
+    """
+    Ключи подписи jwt из каталога JWT_KEYS_DIR, файл <kid>.pem содержит закрытый или открытый ключ.
+    Токены подписываются закрытым ключом JWT_SIGNING_KEY_ID, проверяются открытым ключом из заголовка kid.
+    Ключи загружаются один раз на процесс, объект закрытого ключа переиспользуется при каждой подписи
+    """
+
+    def __init__(self, algorithm: str, keys_dir: str, signing_key_id: str):
+        from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+        self.algorithm = algorithm
+        self.signing_key_id = signing_key_id
+        self.signing_key = None
+        self.public_keys = {}
+
+        for path in sorted(Path(keys_dir).glob('*.pem')):
+            data = path.read_bytes()
+            try:
+                private_key = load_pem_private_key(data, password=None)
+            except ValueError:
+                self.public_keys[path.stem] = load_pem_public_key(data)
+                continue
+
+            self.public_keys[path.stem] = private_key.public_key()
+            if path.stem == signing_key_id:
+                self.signing_key = private_key
+
+        if self.signing_key is None:
+            raise ImproperlyConfigured(f'Закрытый ключ {signing_key_id}.pem не найден в {keys_dir}')
+
+        algorithm_obj = get_default_algorithms()[algorithm]
+        self.jwks = {
+            'keys': [
+                {**json.loads(algorithm_obj.to_jwk(key)), 'kid': kid, 'alg': algorithm, 'use': 'sig'}
+                for kid, key in self.public_keys.items()
+            ]
+        }
+        self.jwks_etag = hashlib.sha256(json.dumps(self.jwks, sort_keys=True).encode()).hexdigest()
+
+    def get_public_key(self, token: str):
+        """
+        Открытый ключ для проверки токена по kid из заголовка
+        """
+
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError:
+            raise TokenBackendError(_('Token is invalid or expired'))
+
+        try:
+            return self.public_keys[kid]
+        except KeyError:
+            raise TokenBackendError(_('Token is invalid or expired'))
+
+
+@lru_cache(maxsize=None)
+def get_signing_key_set() -> Optional[SigningKeySet]:
+    """
+    Ключи подписи для асимметричного JWT_ALGORITHM, None если токены подписываются SIMPLE_JWT['SIGNING_KEY']
+    """
+
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None
+
+    return SigningKeySet(settings.JWT_ALGORITHM, settings.JWT_KEYS_DIR, settings.JWT_SIGNING_KEY_ID)
+
+
+@receiver(setting_changed)
+def reset_signing_key_set(setting, **kwargs):
+    if setting.startswith('JWT_'):
+        get_signing_key_set.cache_clear()
+
+
+class SigningTokenBackend(TokenBackend):
+    """
+    Backend simplejwt, который при асимметричном JWT_ALGORITHM подписывает токены ключом из SigningKeySet
+    и указывает kid в заголовке, иначе работает как TokenBackend с SIMPLE_JWT['SIGNING_KEY']
+    """
+
+    def encode(self, payload):
+        key_set = get_signing_key_set()
+        if key_set is None:
+            return super().encode(payload)
+
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            key_set.signing_key,
+            algorithm=key_set.algorithm,
+            headers={'kid': key_set.signing_key_id},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        key_set = get_signing_key_set()
+        if key_set is None:
+            return super().decode(token, verify)
+
+        try:
+            return jwt.decode(
+                token,
+                key_set.get_public_key(token) if verify else None,
+                algorithms=[key_set.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    'verify_aud': self.audience is not None,
+                    'verify_signature': verify,
+                },
+            )
+        except jwt.InvalidAlgorithmError as e:
+            raise TokenBackendError(_('Invalid algorithm specified')) from e
+        except jwt.InvalidTokenError as e:
+            raise TokenBackendError(_('Token is invalid or expired')) from e
+
+
+def install_token_backend():
+    """
+    Замена token_backend simplejwt, в версии 5.2.2 класс backend не настраивается
+    """
+
+    from rest_framework_simplejwt import state
+
+    state.token_backend = SigningTokenBackend(
+        api_settings.ALGORITHM,
+        api_settings.SIGNING_KEY,
+        api_settings.VERIFYING_KEY,
+        api_settings.AUDIENCE,
+        api_settings.ISSUER,
+        api_settings.JWK_URL,
+        api_settings.LEEWAY,
+        api_settings.JSON_ENCODER,
+    )
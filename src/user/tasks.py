@@ -0,0 +1,54 @@
+from typing import List
+
+import redis
+from celery.signals import worker_ready
+
+from app.celery import app
+from user.bloom import add_to_user_bloom, get_user_bloom
+
+
+@app.task
+def task_rebuild_user_bloom() -> dict:
+    """
+    Перестроение фильтра Блума email и телефонов пользователей
+    """
+
+    bloom = get_user_bloom()
+    return bloom.rebuild() if bloom is not None else {}
+
+
+@app.task(autoretry_for=(redis.RedisError,), retry_backoff=True, max_retries=None)
+def task_add_to_user_bloom(values: List[str]):
+    """
+    Повторное добавление email и телефонов, которые не удалось ни добавить в фильтр, ни отметить фильтр
+    непостроенным при сохранении пользователя. Повторяется, пока redis не станет доступен
+    """
+
+    add_to_user_bloom(values)
+
+
+@app.task
+def task_build_missing_user_bloom() -> dict:
+    """
+    Построение фильтра, если его еще нет или он отмечен непостроенным после ошибки добавления
+    """
+
+    bloom = get_user_bloom()
+    if bloom is None or bloom.is_built():
+        return {}
+
+    return bloom.rebuild()
+
+
+@worker_ready.connect
+def build_user_bloom_on_startup(**kwargs):
+    """
+    Построение фильтра при запуске воркера, если фильтра еще нет
+    """
+
+    bloom = get_user_bloom()
+    try:
+        if bloom is not None and not bloom.is_built():
+            task_rebuild_user_bloom.delay()
+    except redis.RedisError:
+        pass
@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Union
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.encoding import force_bytes
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_to_epoch
+
+from user.signing import get_signing_key_set
+
+HMAC_DIGESTS = {
+    'HS256': hashlib.sha256,
+    'HS384': hashlib.sha384,
+    'HS512': hashlib.sha512,
+}
+
+
+def base64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+class TokenMinter:
+    """
+    Выпуск пары refresh и access токенов с подписью HMAC без RefreshToken simplejwt.
+    Сегмент заголовка вычисляется один раз, ключ HMAC задается один раз и копируется для каждой подписи.
+    Claims и порядок claims совпадают с RefreshToken.for_user и RefreshToken.access_token,
+    поэтому токены принимают TokenRefreshView, TokenVerifyView и аутентификация
+    """
+
+    def __init__(self, algorithm: str, signing_key: Union[str, bytes]):
+        # Заголовок как у PyJWT: ключи отсортированы, без пробелов
+        header = json.dumps({'alg': algorithm, 'typ': 'JWT'}, separators=(',', ':'), sort_keys=True)
+        self.header_segment = base64url(header.encode()) + b'.'
+        self.hmac = hmac.new(force_bytes(signing_key), digestmod=HMAC_DIGESTS[algorithm])
+        self.json_encoder = api_settings.JSON_ENCODER
+
+        # Claims, которые TokenBackend.encode добавляет к каждому токену
+        self.backend_claims = {}
+        if api_settings.AUDIENCE is not None:
+            self.backend_claims['aud'] = api_settings.AUDIENCE
+        if api_settings.ISSUER is not None:
+            self.backend_claims['iss'] = api_settings.ISSUER
+
+    def sign(self, payload: dict) -> str:
+        segment = json.dumps(payload, separators=(',', ':'), cls=self.json_encoder).encode()
+        signing_input = self.header_segment + base64url(segment)
+
+        signature = self.hmac.copy()
+        signature.update(signing_input)
+        return (signing_input + b'.' + base64url(signature.digest())).decode()
+
+    def mint(self, user_id: Union[int, str], claims: Optional[dict] = None) -> dict:
+        """
+        Пара токенов для пользователя
+
+        :param user_id: Значение SIMPLE_JWT['USER_ID_FIELD'] пользователя
+        :param claims: Дополнительные claims, копируются в оба токена
+        :return: Словарь с jwt токенами refresh и access
+        """
+
+        if not isinstance(user_id, int):
+            user_id = str(user_id)
+
+        now = datetime.now(tz=timezone.utc)
+        iat = datetime_to_epoch(now)
+        copied_claims = {
+            api_settings.USER_ID_CLAIM: user_id,
+            **(claims or {}),
+            **self.backend_claims,
+        }
+
+        refresh = {
+            api_settings.TOKEN_TYPE_CLAIM: 'refresh',
+            'exp': datetime_to_epoch(now + api_settings.REFRESH_TOKEN_LIFETIME),
+            'iat': iat,
+            api_settings.JTI_CLAIM: uuid4().hex,
+            **copied_claims,
+        }
+        access = {
+            api_settings.TOKEN_TYPE_CLAIM: 'access',
+            'exp': datetime_to_epoch(now + api_settings.ACCESS_TOKEN_LIFETIME),
+            'iat': iat,
+            api_settings.JTI_CLAIM: uuid4().hex,
+            **copied_claims,
+        }
+
+        return {
+            'refresh': self.sign(refresh),
+            'access': self.sign(access),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_token_minter() -> Optional[TokenMinter]:
+    """
+    Выпуск токенов без simplejwt для подписи HMAC, None если токены подписываются асимметричным ключом
+    или refresh токены учитываются в token_blacklist
+    """
+
+    if get_signing_key_set() is not None or api_settings.ALGORITHM not in HMAC_DIGESTS:
+        return None
+
+    if 'rest_framework_simplejwt.token_blacklist' in settings.INSTALLED_APPS:
+        return None
+
+    return TokenMinter(api_settings.ALGORITHM, api_settings.SIGNING_KEY)
+
+
+@receiver(setting_changed)
+def reset_token_minter(setting, **kwargs):
+    if setting == 'INSTALLED_APPS' or setting.startswith('JWT_'):
+        get_token_minter.cache_clear()
@@ -1,7 +1,7 @@
 from django.urls import path, include
 
 from user.views import (
-    registration, login, password, email_or_phone
+    registration, login, password, email_or_phone, staff
 )
 
 app_name = 'user'
@@ -17,4 +17,5 @@ urlpatterns = [
         path('confirm/', password.change_by_confirm, name='change_password_by_confirm'),
     ])),
     path('email_or_phone/', email_or_phone.change, name='change_email_or_phone'),
+    path('staff/users/', staff.users, name='staff_users'),
 ]
@@ -1,5 +1,13 @@
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from user.models import User
+from user.claims import get_user_claims
+from user.models import User, UserGroup
+from user.tokens import get_token_minter
 import exceptions
 
 
@@ -12,13 +20,56 @@ def get_jwt_tokens(user: User) -> dict:
         - refresh str - jwt токен обновления
     """
 
+    # Claims для ClaimsJWTAuthentication, access токен копирует их из refresh токена
+    claims = get_user_claims(user.pk)
+    extra_claims = {}
+    if claims is not None:
+        extra_claims = {
+            'is_active': claims.is_active,
+            'token_version': claims.token_version,
+            'groups': claims.groups,
+        }
+
+    minter = get_token_minter()
+    if minter is not None:
+        return minter.mint(getattr(user, api_settings.USER_ID_FIELD), extra_claims)
+
     refresh = RefreshToken.for_user(user)
+    for claim, value in extra_claims.items():
+        refresh[claim] = value
+
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
     }
 
 
+class BaseGroupIdCache:
+    """
+    id группы UserGroup.BASE, запрашивается один раз на процесс.
+    id запоминается после фиксации транзакции, в которой группа прочитана или создана,
+    сбрасывается при изменении или удалении группы в этом процессе.
+    В других процессах устаревший id сбрасывает регистрация, получившая IntegrityError
+    """
+
+    def __init__(self):
+        self.group_id = None
+
+    def get(self) -> int:
+        if self.group_id is not None:
+            return self.group_id
+
+        group_id = Group.objects.get_or_create(name=UserGroup.BASE)[0].id
+        transaction.on_commit(lambda: setattr(self, 'group_id', group_id))
+        return group_id
+
+    def reset(self):
+        self.group_id = None
+
+
+base_group_id_cache = BaseGroupIdCache()
+
+
 def passwd_is_equal(password: str, confirm_password: str):
     """
     Проверка незашифрованных паролей
@@ -26,3 +77,20 @@ def passwd_is_equal(password: str, confirm_password: str):
 
     if password != confirm_password:
         raise exceptions.PasswordNotEqual
+
+
+def get_client_ip(request) -> Optional[str]:
+    """
+    IP клиента с учетом settings.USER_CLIENT_IP_HEADER и USER_TRUSTED_PROXY_COUNT.
+    Если заголовка нет или в нем меньше адресов, чем доверенных прокси, используется REMOTE_ADDR
+    """
+
+    if not settings.USER_CLIENT_IP_HEADER:
+        return request.META.get('REMOTE_ADDR')
+
+    addresses = [address.strip() for address in request.META.get(settings.USER_CLIENT_IP_HEADER, '').split(',')]
+    addresses = [address for address in addresses if address]
+    if len(addresses) < settings.USER_TRUSTED_PROXY_COUNT or settings.USER_TRUSTED_PROXY_COUNT < 1:
+        return request.META.get('REMOTE_ADDR')
+
+    return addresses[-settings.USER_TRUSTED_PROXY_COUNT]
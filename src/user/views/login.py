@@ -7,6 +7,7 @@ import exceptions
 import http_exceptions
 import user.handlers.login as handlers
 from user import serializers
+from user.utils import get_client_ip
 
 
 @swagger_auto_schema(
@@ -29,10 +30,15 @@ def login_by_email(request):
     try:
         jwt_token_data = handlers.login_by_email(
             serializer.validated_data['email'],
-            serializer.validated_data['password']
+            serializer.validated_data['password'],
+            get_client_ip(request)
         )
     except exceptions.UserNotFound as e:
         raise http_exceptions.Conflict(detail=e.message, code=e.code)
+    except exceptions.LoginAttemptsExceeded as e:
+        raise http_exceptions.Conflict(detail=e.message, code=e.code, payload_data=e.payload_data)
+    except exceptions.PasswordHashingBusy as e:
+        raise http_exceptions.ServiceUnavailable(detail=e.message, code=e.code)
 
     return Response(
         serializers.LoginResponseSerializer(jwt_token_data).data,
@@ -61,10 +67,15 @@ def login_by_phone(request):
         jwt_token_data = handlers.login_by_phone(
             serializer.validated_data['phone'],
             serializer.validated_data['region'],
-            serializer.validated_data['password']
+            serializer.validated_data['password'],
+            get_client_ip(request)
         )
     except (exceptions.UserNotFound, exceptions.IncorrectPhone) as e:
         raise http_exceptions.Conflict(detail=e.message, code=e.code)
+    except exceptions.LoginAttemptsExceeded as e:
+        raise http_exceptions.Conflict(detail=e.message, code=e.code, payload_data=e.payload_data)
+    except exceptions.PasswordHashingBusy as e:
+        raise http_exceptions.ServiceUnavailable(detail=e.message, code=e.code)
 
     return Response(
         serializers.LoginResponseSerializer(jwt_token_data).data,
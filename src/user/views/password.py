@@ -33,6 +33,8 @@ def change(request):
         )
     except exceptions.PasswordNotEqual as e:
         raise http_exceptions.Conflict(detail=e.message, code=e.code)
+    except exceptions.PasswordHashingBusy as e:
+        raise http_exceptions.ServiceUnavailable(detail=e.message, code=e.code)
 
     return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -66,5 +68,7 @@ def change_by_confirm(request):
             exceptions.ConfirmObjNotConfirmed
     ) as e:
         raise http_exceptions.Conflict(detail=e.message, code=e.code)
+    except exceptions.PasswordHashingBusy as e:
+        raise http_exceptions.ServiceUnavailable(detail=e.message, code=e.code)
 
     return Response(status=status.HTTP_204_NO_CONTENT)
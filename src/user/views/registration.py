@@ -40,5 +40,7 @@ def registration(request):
             exceptions.ConfirmObjNotConfirmed
     ) as e:
         raise http_exceptions.Conflict(detail=e.message, code=e.code)
+    except exceptions.PasswordHashingBusy as e:
+        raise http_exceptions.ServiceUnavailable(detail=e.message, code=e.code)
 
     return Response(status=status.HTTP_204_NO_CONTENT)
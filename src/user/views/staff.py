@@ -0,0 +1,41 @@
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+import exceptions
+import http_exceptions
+import user.handlers.staff as handlers
+from user import serializers
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_id='staff_users',
+    operation_summary='Список пользователей для персонала с пагинацией по курсору.',
+    operation_description='Bearer AUTH',
+    query_serializer=serializers.StaffUserListQuerySerializer,
+    responses={
+        status.HTTP_200_OK: serializers.StaffUserListResponseSerializer()
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def users(request):
+    serializer = serializers.StaffUserListQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+    try:
+        users_page, next_cursor = handlers.list_users(
+            serializer.validated_data.get('cursor'),
+            serializer.validated_data['limit'],
+        )
+    except exceptions.InvalidCursor as e:
+        raise http_exceptions.Validate(detail=e.message, code=e.code)
+
+    return Response(
+        serializers.StaffUserListResponseSerializer({'results': users_page, 'next': next_cursor}).data,
+        status=status.HTTP_200_OK
+    )
@@ -0,0 +1,146 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import condition, require_GET
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.views import TokenViewBase
+
+import exceptions
+import http_exceptions
+import user.handlers.token as handlers
+from user import serializers
+from user.signing import get_signing_key_set
+
+
+@method_decorator(name='post', decorator=swagger_auto_schema(
+    operation_id='verify_token',
+    operation_summary='Проверка jwt токена с учетом выхода и отзыва всех токенов пользователя.',
+    request_body=serializers.TokenVerifySerializer,
+    responses={
+        status.HTTP_200_OK: ''
+    }
+))
+class VerifyView(TokenViewBase):
+    """
+    Замена TokenVerifyView: кроме подписи и срока действия проверяются отзыв токена,
+    активность пользователя и версия токенов. На недействительный токен ответ 401, как у TokenVerifyView
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = serializers.TokenVerifySerializer(data=request.data)
+        if not serializer.is_valid():
+            raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+        if not handlers.verify_token(serializer.validated_data['token'])['valid']:
+            raise InvalidToken(_('Token is invalid or expired'))
+
+        return Response({}, status=status.HTTP_200_OK)
+
+
+verify = VerifyView.as_view()
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_id='verify_token_batch',
+    operation_summary='Пакетная проверка jwt токенов.',
+    request_body=serializers.TokenVerifyBatchSerializer,
+    responses={
+        status.HTTP_200_OK: serializers.TokenVerifyBatchResponseSerializer()
+    }
+)
+@api_view(['POST'])
+@permission_classes([])
+@authentication_classes([])
+def verify_batch(request):
+    serializer = serializers.TokenVerifyBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+    # Результаты уже в формате TokenVerifyBatchResponseSerializer, повторная сериализация пачки не нужна
+    return Response(
+        {'results': handlers.verify_tokens(serializer.validated_data['tokens'])},
+        status=status.HTTP_200_OK
+    )
+
+
+@method_decorator(name='post', decorator=swagger_auto_schema(
+    operation_id='token_refresh',
+    operation_summary='Обновление jwt токенов с ротацией refresh токена.',
+    request_body=serializers.RefreshTokenSerializer,
+    responses={
+        status.HTTP_200_OK: serializers.LoginResponseSerializer()
+    }
+))
+class RefreshView(TokenViewBase):
+    """
+    TokenViewBase отвечает 401 с заголовком WWW-Authenticate на недействительный токен, как TokenRefreshView
+    """
+
+    def post(self, request, *args, **kwargs):
+        serializer = serializers.RefreshTokenSerializer(data=request.data)
+        if not serializer.is_valid():
+            raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+        try:
+            jwt_token_data = handlers.refresh_tokens(serializer.validated_data['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        return Response(
+            serializers.LoginResponseSerializer(jwt_token_data).data,
+            status=status.HTTP_200_OK
+        )
+
+
+refresh = RefreshView.as_view()
+
+
+@swagger_auto_schema(
+    method='post',
+    operation_id='logout',
+    operation_summary='Выход: отзыв refresh токена и access токена из заголовка Authorization.',
+    request_body=serializers.RefreshTokenSerializer,
+    responses={
+        status.HTTP_204_NO_CONTENT: ''
+    }
+)
+@api_view(['POST'])
+@permission_classes([])
+def logout(request):
+    serializer = serializers.RefreshTokenSerializer(data=request.data)
+    if not serializer.is_valid():
+        raise http_exceptions.Validate(validation_errors=serializer.errors)
+
+    try:
+        handlers.logout(serializer.validated_data['refresh'], request.auth)
+    except TokenError as e:
+        raise InvalidToken(e.args[0])
+    except exceptions.TokenRevocationUnavailable as e:
+        raise http_exceptions.ServiceUnavailable(detail=e.message, code=e.code)
+
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def jwks_etag(request) -> str:
+    key_set = get_signing_key_set()
+    return key_set.jwks_etag if key_set is not None else 'empty'
+
+
+@require_GET
+@condition(etag_func=jwks_etag)
+def jwks(request):
+    """
+    Открытые ключи проверки jwt в формате JWK Set, при подписи HS256 список ключей пуст
+    """
+
+    key_set = get_signing_key_set()
+    response = JsonResponse(key_set.jwks if key_set is not None else {'keys': []})
+    patch_cache_control(response, public=True, max_age=settings.JWKS_CACHE_SECONDS)
+    return response